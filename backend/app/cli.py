@@ -4,6 +4,8 @@ Usage:
     python -m app.cli migrate   # apply Alembic migrations up to head
     python -m app.cli seed       # create the bootstrap admin from env config
     python -m app.cli create-all # build schema from models (dev/test convenience)
+    python -m app.cli rebuild-analytics  # recompute analytics rollups from raw tables
+    python -m app.cli archive-jobs       # move old finished jobs to the archive table
 
 Migration and seeding are intentionally separate so production deploys run
 `migrate` once (via the container entrypoint) and seed independently.
@@ -40,10 +42,33 @@ def _create_all() -> None:
     logger.info("Schema created.")
 
 
+def _rebuild_analytics() -> None:
+    from app.extensions.db import SessionLocal
+    from app.services.analytics import rebuild_rollups
+
+    logger.info("Rebuilding analytics rollups...")
+    with SessionLocal() as db:
+        rebuild_rollups(db)
+        db.commit()
+    logger.info("Analytics rollups rebuilt.")
+
+
+def _archive_jobs() -> None:
+    from app.extensions.db import SessionLocal
+    from app.services.job_queue import archive_jobs
+
+    logger.info("Archiving finished background jobs...")
+    with SessionLocal() as db:
+        result = archive_jobs(db)
+    logger.info("Archived %s jobs in %s batches.", result["archived"], result["batches"])
+
+
 COMMANDS = {
     "migrate": _migrate,
     "seed": _seed,
     "create-all": _create_all,
+    "rebuild-analytics": _rebuild_analytics,
+    "archive-jobs": _archive_jobs,
 }
 
 
@@ -3,6 +3,7 @@ from collections.abc import Generator
 from pathlib import Path
 
 from sqlalchemy import create_engine, select
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import DeclarativeBase, Session, sessionmaker
 
@@ -30,6 +31,17 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
+def upsert_insert(db: Session, model):
+    """Return an INSERT for ``model`` that supports ``on_conflict_do_*``.
+
+    PostgreSQL and SQLite share the ``ON CONFLICT`` API in SQLAlchemy, but each
+    dialect exposes it on its own ``insert`` construct.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        return postgresql.insert(model)
+    return sqlite.insert(model)
+
+
 def create_all() -> None:
     """Create the full schema directly from the ORM metadata.
 
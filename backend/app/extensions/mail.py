@@ -1,17 +1,39 @@
+"""Outgoing email over long-lived SMTP sessions, one per sending thread.
+
+Connecting, STARTTLS and AUTH cost several round trips, so ``smtp_session``
+keeps each thread's connection open between messages and jobs. It reconnects
+when the server has dropped it (idle timeouts, restarts) and retries the
+message once; ``send_batch`` delivers many messages over the same connection
+and returns a ``BatchReport`` with the outcome of each, which the worker uses
+to drain queued email jobs together.
+
+Without SMTP settings, messages are logged instead of sent so local
+development and tests keep working.
+"""
+
 import logging
 import smtplib
+from dataclasses import dataclass, field
 from email.message import EmailMessage
+from threading import Lock, local
+from time import monotonic, perf_counter
 
 from app.config.base import get_settings
 
 logger = logging.getLogger(__name__)
 
+# SMTP errors meaning the connection itself is unusable. Any other SMTPException
+# (a refused recipient, a rejected message) is specific to the message; other
+# OSErrors (resets, timeouts) are connection failures too.
+LOST_CONNECTION_ERRORS = (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError)
 
-def send_assignment_email(
-    recipient_email: str,
-    student_name: str,
-    exam_title: str,
-) -> None:
+
+def smtp_configured() -> bool:
+    settings = get_settings()
+    return bool(settings.smtp_host and settings.smtp_username and settings.smtp_password)
+
+
+def build_assignment_email(recipient_email: str, student_name: str, exam_title: str) -> EmailMessage:
     settings = get_settings()
     exam_url = f"{settings.frontend_base_url}/login"
 
@@ -30,22 +52,12 @@ Regards,
 Secure Exam Portal
 """
     )
+    return message
 
-    if not settings.smtp_host or not settings.smtp_username or not settings.smtp_password:
-        logger.info(
-            "Email notification skipped SMTP send. To=%s Exam=%s Login=%s",
-            recipient_email,
-            exam_title,
-            exam_url,
-        )
-        return
-
-    _send(message)
 
-
-def send_password_reset_email(recipient_email: str, reset_token: str) -> None:
+def build_password_reset_email(recipient_email: str, reset_token: str) -> EmailMessage:
+    reset_url = f"{_reset_url_prefix()}{reset_token}"
     settings = get_settings()
-    reset_url = f"{settings.frontend_base_url}/reset-password?token={reset_token}"
 
     message = EmailMessage()
     message["Subject"] = "Reset your Secure Exam Portal password"
@@ -64,23 +76,207 @@ Regards,
 Secure Exam Portal
 """
     )
+    return message
+
+
+def _reset_url_prefix() -> str:
+    return f"{get_settings().frontend_base_url}/reset-password?token="
+
+
+def _reset_url(message: EmailMessage) -> str | None:
+    """The reset link in a password reset email, ``None`` for any other message."""
+    prefix = _reset_url_prefix()
+    return next((word for word in message.get_content().split() if word.startswith(prefix)), None)
+
+
+def send_assignment_email(
+    recipient_email: str,
+    student_name: str,
+    exam_title: str,
+) -> None:
+    smtp_session.send(build_assignment_email(recipient_email, student_name, exam_title))
+
+
+def send_password_reset_email(recipient_email: str, reset_token: str) -> None:
+    smtp_session.send(build_password_reset_email(recipient_email, reset_token))
+
+
+@dataclass
+class BatchReport:
+    # ``None`` or the error for each message, in order.
+    errors: list[Exception | None] = field(default_factory=list)
+    messages: int = 0
+    sent: int = 0
+    failed: int = 0
+    reconnects: int = 0
+    seconds: float = 0.0
+
+
+class SmtpSession:
+    """Long-lived SMTP connections, one per sending thread.
+
+    Worker pool threads send at the same time, each over its own connection, so
+    one slow server round trip does not hold up every other email. Counters
+    are shared.
+    """
+
+    def __init__(self) -> None:
+        self._local = local()
+        self._connections: set[smtplib.SMTP] = set()
+        self._lock = Lock()
+        self.connections_opened = 0
+        self.reconnects = 0
+        self.batches = 0
+        self.messages_sent = 0
+        self.messages_failed = 0
+        self.last_batch = BatchReport()
 
-    if not settings.smtp_host or not settings.smtp_username or not settings.smtp_password:
-        # No SMTP configured: log the link so the flow stays testable in dev.
+    def send(self, message: EmailMessage) -> None:
+        (error,) = self.send_batch([message]).errors
+        if error is not None:
+            raise error
+
+    def send_batch(self, messages: list[EmailMessage]) -> BatchReport:
+        """Send ``messages`` over this thread's connection and report how each went.
+
+        The report belongs to this call; ``last_batch`` is only kept for ``stats``
+        and may already belong to another thread's batch.
+        """
+        if not smtp_configured():
+            for message in messages:
+                reset_url = _reset_url(message)
+                if reset_url is not None:
+                    # Log the link so the reset flow stays testable in dev.
+                    logger.info(
+                        "Password reset email skipped SMTP send. To=%s Reset=%s", message["To"], reset_url
+                    )
+                    continue
+                logger.info(
+                    "Email skipped SMTP send (SMTP not configured). To=%s Subject=%s",
+                    message["To"],
+                    message["Subject"],
+                )
+            return BatchReport(errors=[None] * len(messages), messages=len(messages), sent=len(messages))
+
+        report = BatchReport(messages=len(messages))
+        started = perf_counter()
+        outcomes = report.errors
+        for index, message in enumerate(messages):
+            try:
+                outcomes.append(self._send_with_retry(message, report))
+            except OSError as exc:
+                # The server is unreachable or refused the session: the rest
+                # of the batch would fail the same way.
+                logger.warning("SMTP unavailable, %s emails not sent: %s", len(messages) - index, exc)
+                outcomes.extend([exc] * (len(messages) - index))
+                break
+        report.failed = sum(error is not None for error in outcomes)
+        report.sent = len(messages) - report.failed
+        report.seconds = perf_counter() - started
+        with self._lock:
+            self.batches += 1
+            self.reconnects += report.reconnects
+            self.messages_sent += report.sent
+            self.messages_failed += report.failed
+            self.last_batch = report
         logger.info(
-            "Password reset email skipped SMTP send. To=%s Reset=%s",
-            recipient_email,
-            reset_url,
+            "SMTP batch: %s sent, %s failed, %s reconnects in %.3fs",
+            report.sent,
+            report.failed,
+            report.reconnects,
+            report.seconds,
         )
-        return
+        return report
 
-    _send(message)
+    def _send_with_retry(self, message: EmailMessage, report: BatchReport) -> Exception | None:
+        """Send one message, reconnecting once if the connection was lost.
 
+        Returns the error when the server rejects this message; raises when the
+        server cannot be reached or refuses the session.
+        """
+        for attempt in range(2):
+            try:
+                self._connection().send_message(message)
+                self._local.last_used = monotonic()
+                return None
+            except smtplib.SMTPException as exc:
+                if not isinstance(exc, LOST_CONNECTION_ERRORS):
+                    if self._current() is None:  # STARTTLS or login failed
+                        raise
+                    logger.warning("Email to %s rejected: %s", message["To"], exc)
+                    return exc
+                error: OSError = exc
+            except OSError as exc:
+                error = exc
+            self._discard()
+            if attempt:
+                raise error
+            report.reconnects += 1
+        return None
 
-def _send(message: EmailMessage) -> None:
-    settings = get_settings()
-    with smtplib.SMTP(settings.smtp_host, settings.smtp_port, timeout=20) as smtp:
-        if settings.smtp_use_tls:
-            smtp.starttls()
-        smtp.login(settings.smtp_username, settings.smtp_password)
-        smtp.send_message(message)
+    def _current(self) -> smtplib.SMTP | None:
+        return getattr(self._local, "smtp", None)
+
+    def _connection(self) -> smtplib.SMTP:
+        settings = get_settings()
+        smtp = self._current()
+        if smtp is not None and monotonic() - self._local.last_used > settings.smtp_idle_timeout_seconds:
+            # Most servers close idle sessions after a minute or so; start over
+            # rather than discover that on the first send.
+            self._discard()
+            smtp = None
+        if smtp is None:
+            smtp = smtplib.SMTP(settings.smtp_host, settings.smtp_port, timeout=20)
+            try:
+                if settings.smtp_use_tls:
+                    smtp.starttls()
+                smtp.login(settings.smtp_username, settings.smtp_password)
+            except BaseException:
+                smtp.close()
+                raise
+            self._local.smtp = smtp
+            self._local.last_used = monotonic()
+            with self._lock:
+                self._connections.add(smtp)
+                self.connections_opened += 1
+        return smtp
+
+    def _discard(self) -> None:
+        smtp = self._current()
+        if smtp is None:
+            return
+        self._local.smtp = None
+        with self._lock:
+            self._connections.discard(smtp)
+        _quit(smtp)
+
+    def close(self) -> None:
+        """Close every thread's connection; a thread that sends again reconnects."""
+        with self._lock:
+            connections = list(self._connections)
+            self._connections.clear()
+        for smtp in connections:
+            _quit(smtp)
+
+    def stats(self) -> dict[str, int | float]:
+        with self._lock:
+            return {
+                "connected": len(self._connections),
+                "connections_opened": self.connections_opened,
+                "reconnects": self.reconnects,
+                "batches": self.batches,
+                "messages_sent": self.messages_sent,
+                "messages_failed": self.messages_failed,
+                "last_batch_size": self.last_batch.messages,
+                "last_batch_seconds": round(self.last_batch.seconds, 4),
+            }
+
+
+def _quit(smtp: smtplib.SMTP) -> None:
+    try:
+        smtp.quit()
+    except (smtplib.SMTPException, OSError):
+        smtp.close()
+
+
+smtp_session = SmtpSession()
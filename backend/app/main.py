@@ -3,6 +3,7 @@ from time import monotonic
 
 from fastapi import FastAPI, Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
 
 from app.config.base import get_settings
@@ -11,6 +12,9 @@ from app.modules.admin.routes import router as admin_router
 from app.modules.auth.routes import router as auth_router
 from app.modules.core.routes import router as core_router
 from app.modules.student.routes import router as students_router
+from app.services.autosave_buffer import autosave_buffer
+from app.services.password_hashing import PasswordHashingBusyError, password_hasher
+from app.utils.pagination import NEXT_CURSOR_HEADER
 
 
 class SecurityHeadersMiddleware(BaseHTTPMiddleware):
@@ -61,10 +65,22 @@ class AuthRateLimitMiddleware(BaseHTTPMiddleware):
         return await call_next(request)
 
 
+def password_hashing_busy_handler(_: Request, exc: PasswordHashingBusyError) -> Response:
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "The server is busy, please retry shortly."},
+        headers={"Retry-After": "1"},
+    )
+
+
 @asynccontextmanager
 async def lifespan(_: FastAPI):
     init_db()
+    # The first flush also drains answers a crashed process left in a shared buffer.
+    autosave_buffer.start()
     yield
+    autosave_buffer.stop()
+    password_hasher.shutdown()
 
 
 def create_app() -> FastAPI:
@@ -81,6 +97,7 @@ def create_app() -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=[NEXT_CURSOR_HEADER],
     )
     app.add_middleware(SecurityHeadersMiddleware)
     app.add_middleware(
@@ -89,6 +106,8 @@ def create_app() -> FastAPI:
         window_seconds=settings.auth_rate_limit_window_seconds,
     )
 
+    app.add_exception_handler(PasswordHashingBusyError, password_hashing_busy_handler)
+
     app.include_router(core_router, prefix="/api/v1")
     app.include_router(auth_router, prefix="/api/v1")
     app.include_router(admin_router, prefix="/api/v1")
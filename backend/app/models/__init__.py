@@ -1,10 +1,14 @@
+from app.models.analytics import ExamRollup, IncidentRollup
 from app.models.audit import AuditEvent
 from app.models.exam import AttemptAnswer, AttemptStatus, Exam, ExamAssignment, ExamAttempt, ExamQuestion
-from app.models.job import BackgroundJob, JobStatus
+from app.models.job import ArchivedBackgroundJob, BackgroundJob, JobStatus, StudentImportRow
+from app.models.report import AttemptReport
 from app.models.user import AuthProvider, User, UserRole
 
 __all__ = [
+    "ArchivedBackgroundJob",
     "AttemptAnswer",
+    "AttemptReport",
     "AttemptStatus",
     "AuditEvent",
     "AuthProvider",
@@ -13,7 +17,10 @@ __all__ = [
     "ExamAssignment",
     "ExamAttempt",
     "ExamQuestion",
+    "ExamRollup",
+    "IncidentRollup",
     "JobStatus",
+    "StudentImportRow",
     "User",
     "UserRole",
 ]
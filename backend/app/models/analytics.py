@@ -0,0 +1,30 @@
+from sqlalchemy import ForeignKey, Integer, Numeric, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.extensions.db import Base
+
+
+class ExamRollup(Base):
+    """Running analytics totals for one exam, keyed on each assignment's latest attempt.
+
+    Maintained incrementally by the routes that change them; rebuilt from the
+    raw tables with ``python -m app.cli rebuild-analytics``.
+    """
+
+    __tablename__ = "exam_rollups"
+
+    exam_id: Mapped[int] = mapped_column(ForeignKey("portal_exams.id", ondelete="CASCADE"), primary_key=True)
+    assignments: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    in_progress: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    submitted: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    passed: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    score_sum: Mapped[float] = mapped_column(Numeric(14, 2), nullable=False, default=0)
+    highest_score: Mapped[float | None] = mapped_column(Numeric(5, 2), nullable=True)
+    lowest_score: Mapped[float | None] = mapped_column(Numeric(5, 2), nullable=True)
+
+
+class IncidentRollup(Base):
+    __tablename__ = "incident_rollups"
+
+    incident_type: Mapped[str] = mapped_column(String(80), primary_key=True)
+    incidents: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
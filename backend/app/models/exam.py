@@ -1,7 +1,7 @@
 from datetime import datetime
 from enum import Enum
 
-from sqlalchemy import Boolean, DateTime, ForeignKey, Integer, Numeric, String, Text, func
+from sqlalchemy import Boolean, DateTime, ForeignKey, Index, Integer, Numeric, String, Text, func
 from sqlalchemy import Enum as SqlEnum
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -26,6 +26,8 @@ class Exam(Base):
     block_inspect_shortcuts: Mapped[bool] = mapped_column(Boolean, nullable=False, default=True)
     enforce_fullscreen: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
     track_focus_loss: Mapped[bool] = mapped_column(Boolean, nullable=False, default=True)
+    # Bumped whenever the question set changes; keys the cached question paper.
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=1, server_default="1")
     created_by_id: Mapped[int | None] = mapped_column(ForeignKey("portal_users.id"), nullable=True)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
@@ -57,6 +59,13 @@ class ExamQuestion(Base):
 
 class ExamAssignment(Base):
     __tablename__ = "exam_assignments"
+    # One assignment per exam and student (the bulk insert's conflict target),
+    # plus keyset pagination of assignments filtered by exam or student.
+    __table_args__ = (
+        Index("uq_exam_assignments_exam_student", "exam_id", "student_id", unique=True),
+        Index("ix_exam_assignments_exam_id_id", "exam_id", "id"),
+        Index("ix_exam_assignments_student_id_id", "student_id", "id"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     exam_id: Mapped[int] = mapped_column(ForeignKey("portal_exams.id", ondelete="CASCADE"), index=True)
@@ -74,6 +83,7 @@ class ExamAssignment(Base):
 
 class ExamAttempt(Base):
     __tablename__ = "exam_attempts"
+    __table_args__ = (Index("ix_exam_attempts_student_id_id", "student_id", "id"),)
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     assignment_id: Mapped[int] = mapped_column(
@@ -108,6 +118,10 @@ class ExamAttempt(Base):
 
 class AttemptAnswer(Base):
     __tablename__ = "attempt_answers"
+    # One answer per question per attempt; the conflict target for autosave upserts.
+    __table_args__ = (
+        Index("uq_attempt_answers_attempt_question", "attempt_id", "question_id", unique=True),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     attempt_id: Mapped[int] = mapped_column(ForeignKey("exam_attempts.id", ondelete="CASCADE"), index=True)
@@ -122,6 +136,12 @@ class AttemptAnswer(Base):
 
 class SecurityIncident(Base):
     __tablename__ = "security_incidents"
+    # Newest-first keyset pagination, overall and filtered by exam or student.
+    __table_args__ = (
+        Index("ix_security_incidents_occurred_at_id", "occurred_at", "id"),
+        Index("ix_security_incidents_exam_id_occurred_at_id", "exam_id", "occurred_at", "id"),
+        Index("ix_security_incidents_student_id_occurred_at_id", "student_id", "occurred_at", "id"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     attempt_id: Mapped[int] = mapped_column(ForeignKey("exam_attempts.id", ondelete="CASCADE"), index=True)
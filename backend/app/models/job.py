@@ -2,7 +2,7 @@ from datetime import datetime
 from enum import Enum
 from typing import Any
 
-from sqlalchemy import JSON, DateTime, Integer, String, Text, func
+from sqlalchemy import JSON, DateTime, Index, Integer, String, Text, func, text
 from sqlalchemy import Enum as SqlEnum
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -18,6 +18,30 @@ class JobStatus(str, Enum):
 
 class BackgroundJob(Base):
     __tablename__ = "background_jobs"
+    __table_args__ = (
+        # The claim query: queued jobs, oldest first. Only the queued rows are
+        # indexed, so the index stays small however many finished jobs remain.
+        Index(
+            "ix_background_jobs_queued_created_at_id",
+            "created_at",
+            "id",
+            postgresql_where=text("status = 'queued'"),
+            sqlite_where=text("status = 'queued'"),
+        ),
+        # The reaper's scan for running jobs whose lease has run out.
+        Index(
+            "ix_background_jobs_running_lease_expires_at",
+            "lease_expires_at",
+            postgresql_where=text("status = 'running'"),
+            sqlite_where=text("status = 'running'"),
+        ),
+        # Keyset pagination of the admin job and report lists.
+        Index("ix_background_jobs_job_type_id", "job_type", "id"),
+        Index("ix_background_jobs_status_id", "status", "id"),
+        Index(
+            "ix_background_jobs_job_type_status_completed_at_id", "job_type", "status", "completed_at", "id"
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     job_type: Mapped[str] = mapped_column(String(80), nullable=False, index=True)
@@ -25,7 +49,6 @@ class BackgroundJob(Base):
         SqlEnum(JobStatus, name="job_status"),
         nullable=False,
         default=JobStatus.queued,
-        index=True,
     )
     payload: Mapped[dict[str, Any]] = mapped_column(JSON, nullable=False)
     result: Mapped[dict[str, Any] | None] = mapped_column(JSON, nullable=True)
@@ -36,9 +59,11 @@ class BackgroundJob(Base):
         DateTime(timezone=True),
         server_default=func.now(),
         nullable=False,
-        index=True,
     )
     started_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    # Set while running and renewed by the worker; once it passes, the worker
+    # is presumed dead and the reaper requeues the job.
+    lease_expires_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     completed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
@@ -51,3 +76,52 @@ class BackgroundJob(Base):
         onupdate=func.now(),
         nullable=False,
     )
+
+
+class ArchivedBackgroundJob(Base):
+    """A finished job moved out of ``background_jobs`` by the retention job.
+
+    Rows keep their original id and timestamps, so a job referenced in logs or
+    audit events can still be looked up after it leaves the queue table.
+    """
+
+    __tablename__ = "background_jobs_archive"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+    job_type: Mapped[str] = mapped_column(String(80), nullable=False)
+    status: Mapped[JobStatus] = mapped_column(SqlEnum(JobStatus, name="job_status"), nullable=False)
+    payload: Mapped[dict[str, Any]] = mapped_column(JSON, nullable=False)
+    result: Mapped[dict[str, Any] | None] = mapped_column(JSON, nullable=True)
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False)
+    max_attempts: Mapped[int] = mapped_column(Integer, nullable=False)
+    started_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    completed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    archived_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False,
+        index=True,
+    )
+
+
+class StudentImportRow(Base):
+    """A raw roster row staged by an upload until the import job consumes it.
+
+    Rows are deleted as each chunk is processed, so a retried job resumes where
+    the previous attempt stopped.
+    """
+
+    __tablename__ = "student_import_rows"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    upload_id: Mapped[str] = mapped_column(String(36), nullable=False, index=True)
+    line_number: Mapped[int] = mapped_column(Integer, nullable=False)
+    data: Mapped[dict[str, Any]] = mapped_column(JSON, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False,
+    )
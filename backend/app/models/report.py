@@ -0,0 +1,42 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, Numeric, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.extensions.db import Base
+
+
+class AttemptReport(Base):
+    """The report for one submitted attempt, written by the ``attempt_report`` job.
+
+    Names and titles are copied as they were when the report was generated.
+    Re-generating a report replaces it.
+    """
+
+    __tablename__ = "attempt_reports"
+    # Keyset pagination of /admin/reports, unfiltered and per exam or student.
+    __table_args__ = (
+        Index("ix_attempt_reports_generated_at_id", "generated_at", "id"),
+        Index("ix_attempt_reports_exam_id_generated_at_id", "exam_id", "generated_at", "id"),
+        Index("ix_attempt_reports_student_id_generated_at_id", "student_id", "generated_at", "id"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    attempt_id: Mapped[int] = mapped_column(
+        ForeignKey("exam_attempts.id", ondelete="CASCADE"), nullable=False, unique=True
+    )
+    exam_id: Mapped[int] = mapped_column(ForeignKey("portal_exams.id", ondelete="CASCADE"), nullable=False)
+    student_id: Mapped[int] = mapped_column(ForeignKey("portal_users.id", ondelete="CASCADE"), nullable=False)
+    student_name: Mapped[str] = mapped_column(String(120), nullable=False)
+    exam_title: Mapped[str] = mapped_column(String(180), nullable=False)
+    score: Mapped[int] = mapped_column(Integer, nullable=False)
+    total_marks: Mapped[int] = mapped_column(Integer, nullable=False)
+    percentage: Mapped[float] = mapped_column(Numeric(5, 2), nullable=False)
+    answered_questions: Mapped[int] = mapped_column(Integer, nullable=False)
+    correct_answers: Mapped[int] = mapped_column(Integer, nullable=False)
+    submitted_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    generated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False,
+    )
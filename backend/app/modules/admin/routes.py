@@ -1,42 +1,89 @@
 import logging
-
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import desc, func, select
+import uuid
+from collections import Counter
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
+from sqlalchemy import func, insert, select
 from sqlalchemy.orm import Session, selectinload
 
-from app.extensions.db import get_db
+from app.config.base import get_settings
+from app.extensions.db import get_db, upsert_insert
 from app.models.audit import AuditEvent
 from app.models.exam import AttemptStatus, Exam, ExamAssignment, ExamAttempt, ExamQuestion, SecurityIncident
 from app.models.job import BackgroundJob, JobStatus
+from app.models.report import AttemptReport
 from app.models.user import User, UserRole
 from app.modules.auth.dependencies import require_admin
 from app.schemas.analytics import (
     AdminAnalytics,
-    AssignmentBreakdown,
     AuditEventRead,
-    ExamPerformance,
-    IncidentBreakdown,
-    ResultsMetrics,
+    AutosaveBufferStats,
+    CacheStats,
+    PasswordHashingStats,
+    RuntimeMetrics,
 )
 from app.schemas.exam import (
     AssignmentCreate,
     AssignmentRead,
+    AssignmentStatus,
+    AttemptReportRead,
     BackgroundJobRead,
+    BulkAssignmentCreate,
+    BulkAssignmentResult,
     BulkExamCreate,
     DashboardStats,
     ExamCreate,
     ExamRead,
+    ExamSummaryRead,
     SecurityIncidentRead,
 )
-from app.schemas.user import BulkUserCreate, UserCreate, UserRead
+from app.schemas.user import BulkConflictReport, BulkUserCreate, UserCreate, UserRead
+from app.services.analytics import (
+    read_admin_analytics,
+    read_dashboard_stats,
+    record_assignments,
+    refresh_exam_rollups,
+    refresh_incident_rollups,
+)
 from app.services.audit import record_audit
-from app.services.job_queue import ATTEMPT_REPORT_JOB, enqueue_assignment_email
-from app.utils.security import hash_password
+from app.services.autosave_buffer import autosave_buffer
+from app.services.bulk_validation import find_student_conflicts
+from app.services.exam_paper_cache import bump_exam_version, exam_paper_cache
+from app.services.job_queue import (
+    enqueue_assignment_email,
+    enqueue_assignment_emails,
+    enqueue_exam_regrade,
+    enqueue_student_import,
+)
+from app.services.password_hashing import password_hasher
+from app.services.principal_cache import principal_cache
+from app.services.roster_import import (
+    CSV_FORMAT,
+    NDJSON_FORMAT,
+    RosterFormatError,
+    RowParser,
+    discard_upload,
+    iter_lines,
+    stage_rows,
+)
+from app.services.student_summary import student_summary_cache
+from app.utils.pagination import Pagination, date_range
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 logger = logging.getLogger(__name__)
 
-PASS_THRESHOLD = 50
+# Rows per INSERT ... ON CONFLICT DO NOTHING, keeping bind parameters well
+# under SQLite's per-statement limit.
+BULK_ASSIGNMENT_CHUNK_SIZE = 1000
+
+ROSTER_CONTENT_TYPES = {
+    "text/csv": CSV_FORMAT,
+    "application/x-ndjson": NDJSON_FORMAT,
+    "application/jsonl": NDJSON_FORMAT,
+}
 
 
 @router.get("/dashboard", response_model=DashboardStats)
@@ -44,42 +91,19 @@ def admin_dashboard(
     _: User = Depends(require_admin),
     db: Session = Depends(get_db),
 ) -> DashboardStats:
-    total_students = db.scalar(select(func.count(User.id)).where(User.role == UserRole.student)) or 0
-    total_exams = db.scalar(select(func.count(Exam.id))) or 0
-    total_assignments = db.scalar(select(func.count(ExamAssignment.id))) or 0
-    completed_attempts = (
-        db.scalar(
-            select(func.count(ExamAttempt.id)).where(ExamAttempt.status == AttemptStatus.submitted)
-        )
-        or 0
-    )
-    average_score = (
-        db.scalar(
-            select(func.avg(ExamAttempt.percentage)).where(
-                ExamAttempt.status == AttemptStatus.submitted
-            )
-        )
-        or 0
-    )
-    return DashboardStats(
-        total_students=total_students,
-        total_exams=total_exams,
-        total_assignments=total_assignments,
-        completed_attempts=completed_attempts,
-        average_score=round(float(average_score), 2),
-    )
+    return read_dashboard_stats(db)
 
 
 @router.get("/students", response_model=list[UserRead])
 def list_students(
+    since: datetime | None = None,
+    until: datetime | None = None,
+    pagination: Pagination = Depends(),
     _: User = Depends(require_admin),
     db: Session = Depends(get_db),
 ) -> list[User]:
-    return list(
-        db.scalars(
-            select(User).where(User.role == UserRole.student).order_by(desc(User.id))
-        ).all()
-    )
+    statement = select(User).where(User.role == UserRole.student, *date_range(User.created_at, since, until))
+    return pagination.page(db, statement, [User.id])
 
 
 @router.post("/students", response_model=UserRead, status_code=status.HTTP_201_CREATED)
@@ -101,7 +125,7 @@ def create_student(
         full_name=payload.full_name,
         username=payload.username,
         email=payload.email,
-        password_hash=hash_password(payload.password),
+        password_hash=password_hasher.hash(payload.password),
         role=UserRole.student,
     )
     db.add(student)
@@ -119,54 +143,125 @@ def create_student(
     return student
 
 
-@router.post("/students/bulk", response_model=list[UserRead], status_code=status.HTTP_201_CREATED)
+@router.post(
+    "/students/bulk",
+    response_model=list[UserRead],
+    status_code=status.HTTP_201_CREATED,
+    responses={status.HTTP_409_CONFLICT: {"model": BulkConflictReport}},
+)
 def create_students_bulk(
     payload: BulkUserCreate,
     admin: User = Depends(require_admin),
     db: Session = Depends(get_db),
-) -> list[User]:
-    usernames = [student.username for student in payload.users]
-    emails = [student.email for student in payload.users]
-    duplicate_usernames = {username for username in usernames if usernames.count(username) > 1}
-    duplicate_emails = {email for email in emails if emails.count(email) > 1}
-    if duplicate_usernames or duplicate_emails:
-        raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail="Duplicate usernames/emails found in uploaded batch",
+) -> list[UserRead] | JSONResponse:
+    conflicts = find_student_conflicts(
+        db,
+        [(index, student.username, student.email) for index, student in enumerate(payload.users)],
+    )
+    if conflicts:
+        report = BulkConflictReport(
+            detail=f"{len({conflict.row for conflict in conflicts})} rows conflict with the batch "
+            "or with existing users",
+            conflicts=[conflict.as_dict() for conflict in conflicts],
         )
-
-    existing_users = db.scalars(
-        select(User.username).where((User.username.in_(usernames)) | (User.email.in_(emails)))
+        return JSONResponse(status_code=status.HTTP_409_CONFLICT, content=report.model_dump())
+
+    password_hashes = password_hasher.hash_many([student.password for student in payload.users])
+    students = db.scalars(
+        insert(User).returning(User, sort_by_parameter_order=True),
+        [
+            {
+                "full_name": student.full_name,
+                "username": student.username,
+                "email": student.email,
+                "password_hash": password_hash,
+                "role": UserRole.student,
+            }
+            for student, password_hash in zip(payload.users, password_hashes, strict=True)
+        ],
     ).all()
-    if existing_users:
+    record_audit(
+        db,
+        actor=admin,
+        action="student.bulk_create",
+        entity_type="user",
+        detail={"count": len(students)},
+    )
+    # Serialise before commit: committing expires the returned rows, and reading
+    # them afterwards would issue one SELECT per student.
+    created = [UserRead.model_validate(student) for student in students]
+    db.commit()
+    return created
+
+
+@router.post(
+    "/students/import",
+    response_model=BackgroundJobRead,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def import_students(
+    request: Request,
+    admin: User = Depends(require_admin),
+    db: Session = Depends(get_db),
+) -> BackgroundJobRead:
+    """Stage a streamed CSV/NDJSON roster and queue an ``import_students`` job.
+
+    The body is read incrementally and staged in batches, so memory stays flat
+    regardless of roster size. Progress and per-row errors are reported on the
+    job's ``result`` under ``/admin/jobs``.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    fmt = ROSTER_CONTENT_TYPES.get(content_type)
+    if fmt is None:
         raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail=f"Duplicate users found: {', '.join(sorted(set(existing_users)))}",
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Upload must be text/csv or application/x-ndjson",
         )
 
-    students = [
-        User(
-            full_name=student.full_name,
-            username=student.username,
-            email=student.email,
-            password_hash=hash_password(student.password),
-            role=UserRole.student,
+    batch_size = get_settings().student_import_chunk_size
+    upload_id = str(uuid.uuid4())
+    parser = RowParser(fmt)
+    batch: list = []
+    total_rows = 0
+    try:
+        async for line in iter_lines(request.stream()):
+            batch.extend(parser.feed(line))
+            if len(batch) >= batch_size:
+                await run_in_threadpool(stage_rows, db, upload_id, batch)
+                total_rows += len(batch)
+                batch = []
+        await run_in_threadpool(stage_rows, db, upload_id, batch)
+        total_rows += len(batch)
+    except RosterFormatError as exc:
+        await run_in_threadpool(discard_upload, db, upload_id)
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    except Exception:
+        await run_in_threadpool(discard_upload, db, upload_id)
+        raise
+
+    if total_rows == 0:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Upload contains no roster rows",
         )
-        for student in payload.users
-    ]
-    db.add_all(students)
-    db.flush()
+    return await run_in_threadpool(_queue_student_import, db, admin, upload_id, total_rows)
+
+
+def _queue_student_import(db: Session, admin: User, upload_id: str, total_rows: int) -> BackgroundJobRead:
+    job = enqueue_student_import(
+        db, upload_id=upload_id, total_rows=total_rows, requested_by_id=admin.id
+    )
     record_audit(
         db,
         actor=admin,
-        action="student.bulk_create",
-        entity_type="user",
-        detail={"count": len(students)},
+        action="student.import",
+        entity_type="job",
+        entity_id=job.id,
+        detail={"rows": total_rows},
     )
     db.commit()
-    for student in students:
-        db.refresh(student)
-    return students
+    db.refresh(job)
+    return BackgroundJobRead.model_validate(job)
 
 
 @router.delete("/students/{student_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -189,24 +284,91 @@ def delete_student(
         entity_id=student.id,
         detail={"username": student.username},
     )
+    exam_ids = set(db.scalars(select(ExamAssignment.exam_id).where(ExamAssignment.student_id == student_id)))
     db.delete(student)
+    db.flush()
+    refresh_exam_rollups(db, exam_ids)
+    refresh_incident_rollups(db)
     db.commit()
+    principal_cache.invalidate(student_id)
+    student_summary_cache.invalidate(student_id)
 
 
-@router.get("/exams", response_model=list[ExamRead])
+@router.get("/exams", response_model=list[ExamSummaryRead])
 def list_exams(
+    is_active: bool | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    pagination: Pagination = Depends(),
     _: User = Depends(require_admin),
     db: Session = Depends(get_db),
-) -> list[Exam]:
-    return list(
-        db.scalars(
-            select(Exam)
-            .options(selectinload(Exam.questions))
-            .order_by(desc(Exam.id))
-        ).all()
+) -> list[ExamSummaryRead]:
+    statement = select(Exam).where(*date_range(Exam.created_at, since, until))
+    if is_active is not None:
+        statement = statement.where(Exam.is_active.is_(is_active))
+    exams = pagination.page(db, statement, [Exam.id])
+    if not exams:
+        return []
+
+    # Question totals for this page only, from one grouped query.
+    totals = {
+        exam_id: (question_count, total_marks)
+        for exam_id, question_count, total_marks in db.execute(
+            select(ExamQuestion.exam_id, func.count(ExamQuestion.id), func.sum(ExamQuestion.marks))
+            .where(ExamQuestion.exam_id.in_([exam.id for exam in exams]))
+            .group_by(ExamQuestion.exam_id)
+        )
+    }
+    summaries = []
+    for exam in exams:
+        question_count, total_marks = totals.get(exam.id, (0, 0))
+        summary = ExamSummaryRead.model_validate(exam, from_attributes=True)
+        summary.question_count, summary.total_marks = question_count, total_marks
+        summaries.append(summary)
+    return summaries
+
+
+@router.get(
+    "/exams/{exam_id}",
+    response_model=ExamRead,
+    responses={status.HTTP_304_NOT_MODIFIED: {"description": "The exam matches If-None-Match"}},
+)
+def get_exam(
+    exam_id: int,
+    request: Request,
+    response: Response,
+    _: User = Depends(require_admin),
+    db: Session = Depends(get_db),
+) -> Exam | Response:
+    version = db.scalar(select(Exam.version).where(Exam.id == exam_id))
+    if version is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Exam not found",
+        )
+    # Exam.version is bumped whenever the question set changes (the other exam
+    # fields are fixed at creation), so it tags the full representation and a
+    # matching client is answered without loading the questions.
+    etag = f'"exam-{exam_id}-v{version}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if_none_match = _parse_if_none_match(request.headers.get("if-none-match"))
+    if etag in if_none_match or "*" in if_none_match:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    response.headers.update(headers)
+    return db.scalar(
+        select(Exam)
+        .where(Exam.id == exam_id)
+        .options(selectinload(Exam.questions))
     )
 
 
+def _parse_if_none_match(header: str | None) -> set[str]:
+    if not header:
+        return set()
+    return {tag.strip().removeprefix("W/") for tag in header.split(",")}
+
+
 @router.post("/exams", response_model=ExamRead, status_code=status.HTTP_201_CREATED)
 def create_exam(
     payload: ExamCreate,
@@ -297,7 +459,44 @@ def delete_exam(
         detail={"title": exam.title},
     )
     db.delete(exam)
+    db.flush()
+    refresh_exam_rollups(db, [exam_id])
+    refresh_incident_rollups(db)
+    db.commit()
+    exam_paper_cache.invalidate(exam_id)
+    student_summary_cache.clear()
+
+
+@router.post(
+    "/exams/{exam_id}/regrade",
+    response_model=BackgroundJobRead,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+def regrade_exam(
+    exam_id: int,
+    admin: User = Depends(require_admin),
+    db: Session = Depends(get_db),
+) -> BackgroundJobRead:
+    """Queue re-scoring of every submitted attempt after the answer key or marks changed."""
+    if db.get(Exam, exam_id) is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Exam not found",
+        )
+    # Marks may have changed, so students starting the exam must see fresh totals.
+    bump_exam_version(db, exam_id)
+    job = enqueue_exam_regrade(db, exam_id=exam_id, requested_by_id=admin.id)
+    record_audit(
+        db,
+        actor=admin,
+        action="exam.regrade",
+        entity_type="exam",
+        entity_id=exam_id,
+        detail={"job_id": job.id},
+    )
     db.commit()
+    db.refresh(job)
+    return BackgroundJobRead.model_validate(job)
 
 
 @router.post("/assignments", response_model=AssignmentRead, status_code=status.HTTP_201_CREATED)
@@ -337,6 +536,7 @@ def assign_exam(
         entity_id=assignment.id,
         detail={"exam_id": exam.id, "student_id": student.id},
     )
+    record_assignments(db, exam.id)
     enqueue_assignment_email(
         db,
         recipient_email=student.email,
@@ -344,6 +544,7 @@ def assign_exam(
         exam_title=exam.title,
     )
     db.commit()
+    student_summary_cache.invalidate(student.id)
     db.refresh(assignment)
     logger.info("Queued assignment email to %s for exam %s", student.email, exam.title)
     return AssignmentRead(
@@ -356,37 +557,134 @@ def assign_exam(
     )
 
 
+@router.post("/assignments/bulk", response_model=BulkAssignmentResult, status_code=status.HTTP_201_CREATED)
+def assign_exams_bulk(
+    payload: BulkAssignmentCreate,
+    admin: User = Depends(require_admin),
+    db: Session = Depends(get_db),
+) -> BulkAssignmentResult:
+    """Assign every listed exam to every listed student; existing pairs are skipped."""
+    exam_ids = list(dict.fromkeys(payload.exam_ids))
+    student_ids = list(dict.fromkeys(payload.student_ids))
+    known_exams = set(db.scalars(select(Exam.id).where(Exam.id.in_(exam_ids))))
+    known_students = set(
+        db.scalars(select(User.id).where(User.id.in_(student_ids), User.role == UserRole.student))
+    )
+    if len(known_exams) < len(exam_ids) or len(known_students) < len(student_ids):
+        missing_exams = [exam_id for exam_id in exam_ids if exam_id not in known_exams]
+        missing_students = [student_id for student_id in student_ids if student_id not in known_students]
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Unknown exams {missing_exams} or students {missing_students}",
+        )
+
+    pairs = [
+        {"exam_id": exam_id, "student_id": student_id} for exam_id in exam_ids for student_id in student_ids
+    ]
+    created = []
+    for start in range(0, len(pairs), BULK_ASSIGNMENT_CHUNK_SIZE):
+        chunk = pairs[start : start + BULK_ASSIGNMENT_CHUNK_SIZE]
+        statement = upsert_insert(db, ExamAssignment).values(chunk)
+        created.extend(
+            db.execute(
+                statement.on_conflict_do_nothing(
+                    index_elements=[ExamAssignment.exam_id, ExamAssignment.student_id]
+                ).returning(ExamAssignment.id, ExamAssignment.exam_id, ExamAssignment.student_id)
+            ).all()
+        )
+
+    for exam_id, count in Counter(exam_id for _, exam_id, _ in created).items():
+        record_assignments(db, exam_id, count)
+    jobs = enqueue_assignment_emails(db, sorted(assignment_id for assignment_id, _, _ in created))
+    record_audit(
+        db,
+        actor=admin,
+        action="assignment.bulk_create",
+        entity_type="assignment",
+        detail={
+            "exam_ids": exam_ids,
+            "students": len(student_ids),
+            "created": len(created),
+            "skipped": len(pairs) - len(created),
+        },
+    )
+    db.commit()
+    for student_id in {student_id for _, _, student_id in created}:
+        student_summary_cache.invalidate(student_id)
+    logger.info(
+        "Bulk assigned %s exams to %s students: %s created", len(exam_ids), len(student_ids), len(created)
+    )
+    return BulkAssignmentResult(
+        created=len(created),
+        skipped=len(pairs) - len(created),
+        email_job_ids=[job.id for job in jobs],
+    )
+
+
 @router.get("/assignments", response_model=list[AssignmentRead])
 def list_assignments(
+    exam_id: int | None = None,
+    student_id: int | None = None,
+    status_filter: AssignmentStatus | None = Query(None, alias="status"),
+    since: datetime | None = None,
+    until: datetime | None = None,
+    pagination: Pagination = Depends(),
     _: User = Depends(require_admin),
     db: Session = Depends(get_db),
 ) -> list[AssignmentRead]:
-    assignments = db.scalars(
-        select(ExamAssignment)
-        .options(
-            selectinload(ExamAssignment.exam),
-            selectinload(ExamAssignment.student),
-            selectinload(ExamAssignment.attempts),
+    latest_attempt_id = (
+        select(func.max(ExamAttempt.id))
+        .where(ExamAttempt.assignment_id == ExamAssignment.id)
+        .correlate(ExamAssignment)
+        .scalar_subquery()
+    )
+    statement = (
+        select(
+            ExamAssignment.id,
+            ExamAssignment.exam_id,
+            ExamAssignment.student_id,
+            ExamAssignment.assigned_at,
+            Exam.title,
+            User.full_name,
+            ExamAttempt.status,
+            ExamAttempt.percentage,
         )
-        .order_by(desc(ExamAssignment.id))
-    ).all()
+        .join(Exam, Exam.id == ExamAssignment.exam_id)
+        .join(User, User.id == ExamAssignment.student_id)
+        .outerjoin(ExamAttempt, ExamAttempt.id == latest_attempt_id)
+        .where(*date_range(ExamAssignment.assigned_at, since, until))
+    )
+    if exam_id is not None:
+        statement = statement.where(ExamAssignment.exam_id == exam_id)
+    if student_id is not None:
+        statement = statement.where(ExamAssignment.student_id == student_id)
+    if status_filter == AssignmentStatus.pending:
+        statement = statement.where(ExamAttempt.id.is_(None))
+    elif status_filter is not None:
+        statement = statement.where(ExamAttempt.status == AttemptStatus(status_filter.value))
 
-    result: list[AssignmentRead] = []
-    for assignment in assignments:
-        latest_attempt = assignment.attempts[-1] if assignment.attempts else None
-        result.append(
-            AssignmentRead(
-                id=assignment.id,
-                exam_id=assignment.exam_id,
-                student_id=assignment.student_id,
-                assigned_at=assignment.assigned_at,
-                exam_title=assignment.exam.title,
-                student_name=assignment.student.full_name,
-                attempt_status=latest_attempt.status if latest_attempt else None,
-                latest_score=float(latest_attempt.percentage) if latest_attempt else None,
-            )
+    return [
+        AssignmentRead(
+            id=assignment_id,
+            exam_id=assigned_exam_id,
+            student_id=assigned_student_id,
+            assigned_at=assigned_at,
+            exam_title=title,
+            student_name=full_name,
+            attempt_status=attempt_status,
+            latest_score=float(percentage) if percentage is not None else None,
         )
-    return result
+        for (
+            assignment_id,
+            assigned_exam_id,
+            assigned_student_id,
+            assigned_at,
+            title,
+            full_name,
+            attempt_status,
+            percentage,
+        ) in pagination.page(db, statement, [ExamAssignment.id])
+    ]
 
 
 @router.delete("/assignments/{assignment_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -409,8 +707,13 @@ def delete_assignment(
         entity_id=assignment.id,
         detail={"exam_id": assignment.exam_id, "student_id": assignment.student_id},
     )
+    exam_id, student_id = assignment.exam_id, assignment.student_id
     db.delete(assignment)
+    db.flush()
+    refresh_exam_rollups(db, [exam_id])
+    refresh_incident_rollups(db)
     db.commit()
+    student_summary_cache.invalidate(student_id)
 
 
 @router.get("/analytics", response_model=AdminAnalytics)
@@ -418,135 +721,94 @@ def admin_analytics(
     _: User = Depends(require_admin),
     db: Session = Depends(get_db),
 ) -> AdminAnalytics:
-    total_students = (
-        db.scalar(select(func.count(User.id)).where(User.role == UserRole.student)) or 0
-    )
-    total_exams = db.scalar(select(func.count(Exam.id))) or 0
-    active_exams = db.scalar(select(func.count(Exam.id)).where(Exam.is_active.is_(True))) or 0
-
-    assignments = db.scalars(
-        select(ExamAssignment).options(
-            selectinload(ExamAssignment.exam),
-            selectinload(ExamAssignment.attempts),
-        )
-    ).all()
-
-    breakdown = AssignmentBreakdown(total=len(assignments))
-    scores: list[float] = []
-    per_exam: dict[int, dict] = {}
-    for assignment in assignments:
-        latest = assignment.attempts[-1] if assignment.attempts else None
-        status_value = latest.status if latest else None
-        if status_value == AttemptStatus.submitted:
-            breakdown.submitted += 1
-        elif status_value == AttemptStatus.in_progress:
-            breakdown.in_progress += 1
-        else:
-            breakdown.pending += 1
-
-        bucket = per_exam.setdefault(
-            assignment.exam_id,
-            {"title": assignment.exam.title, "assignments": 0, "submissions": 0, "score_sum": 0.0},
-        )
-        bucket["assignments"] += 1
-        if status_value == AttemptStatus.submitted and latest is not None:
-            score = float(latest.percentage)
-            scores.append(score)
-            bucket["submissions"] += 1
-            bucket["score_sum"] += score
-
-    results = ResultsMetrics(submitted_attempts=len(scores))
-    if scores:
-        results.average_score = round(sum(scores) / len(scores), 2)
-        results.highest_score = round(max(scores), 2)
-        results.lowest_score = round(min(scores), 2)
-        passed = len([score for score in scores if score >= PASS_THRESHOLD])
-        results.pass_rate = round((passed / len(scores)) * 100, 2)
-
-    exam_performance = [
-        ExamPerformance(
-            exam_id=exam_id,
-            title=data["title"],
-            assignments=data["assignments"],
-            submissions=data["submissions"],
-            average_score=round(data["score_sum"] / data["submissions"], 2)
-            if data["submissions"]
-            else 0,
-        )
-        for exam_id, data in per_exam.items()
-    ]
-    exam_performance.sort(key=lambda item: (item.submissions, item.assignments), reverse=True)
-
-    incident_total = db.scalar(select(func.count(SecurityIncident.id))) or 0
-    incident_rows = db.execute(
-        select(SecurityIncident.incident_type, func.count(SecurityIncident.id)).group_by(
-            SecurityIncident.incident_type
-        )
-    ).all()
-    incidents = IncidentBreakdown(
-        total=incident_total,
-        by_type={incident_type: count for incident_type, count in incident_rows},
-    )
-
-    return AdminAnalytics(
-        pass_threshold=PASS_THRESHOLD,
-        total_students=total_students,
-        total_exams=total_exams,
-        active_exams=active_exams,
-        assignments=breakdown,
-        results=results,
-        incidents=incidents,
-        exam_performance=exam_performance[:10],
-    )
+    return read_admin_analytics(db)
 
 
 @router.get("/audit-events", response_model=list[AuditEventRead])
 def list_audit_events(
+    action: str | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    pagination: Pagination = Depends(),
     _: User = Depends(require_admin),
     db: Session = Depends(get_db),
 ) -> list[AuditEvent]:
-    return list(
-        db.scalars(select(AuditEvent).order_by(desc(AuditEvent.id)).limit(100)).all()
+    statement = select(AuditEvent).where(*date_range(AuditEvent.created_at, since, until))
+    if action is not None:
+        statement = statement.where(AuditEvent.action == action)
+    return pagination.page(db, statement, [AuditEvent.id])
+
+
+@router.get("/metrics", response_model=RuntimeMetrics)
+def runtime_metrics(_: User = Depends(require_admin)) -> RuntimeMetrics:
+    return RuntimeMetrics(
+        principal_cache=CacheStats(**principal_cache.stats()),
+        password_hashing=PasswordHashingStats(**password_hasher.stats()),
+        exam_paper_cache=CacheStats(**exam_paper_cache.stats()),
+        autosave_buffer=AutosaveBufferStats(**autosave_buffer.stats()),
+        student_summary_cache=CacheStats(**student_summary_cache.stats()),
     )
 
 
 @router.get("/jobs", response_model=list[BackgroundJobRead])
 def list_background_jobs(
+    job_type: str | None = None,
+    status_filter: JobStatus | None = Query(None, alias="status"),
+    since: datetime | None = None,
+    until: datetime | None = None,
+    pagination: Pagination = Depends(),
     _: User = Depends(require_admin),
     db: Session = Depends(get_db),
 ) -> list[BackgroundJob]:
-    return list(db.scalars(select(BackgroundJob).order_by(desc(BackgroundJob.id)).limit(100)).all())
+    statement = select(BackgroundJob).where(*date_range(BackgroundJob.created_at, since, until))
+    if job_type is not None:
+        statement = statement.where(BackgroundJob.job_type == job_type)
+    if status_filter is not None:
+        statement = statement.where(BackgroundJob.status == status_filter)
+    return pagination.page(db, statement, [BackgroundJob.id])
 
 
-@router.get("/reports", response_model=list[BackgroundJobRead])
+@router.get("/reports", response_model=list[AttemptReportRead])
 def list_generated_reports(
+    exam_id: int | None = None,
+    student_id: int | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    pagination: Pagination = Depends(),
     _: User = Depends(require_admin),
     db: Session = Depends(get_db),
-) -> list[BackgroundJob]:
-    return list(
-        db.scalars(
-            select(BackgroundJob)
-            .where(
-                BackgroundJob.job_type == ATTEMPT_REPORT_JOB,
-                BackgroundJob.status == JobStatus.completed,
-            )
-            .order_by(desc(BackgroundJob.completed_at), desc(BackgroundJob.id))
-            .limit(100)
-        ).all()
-    )
+) -> list[AttemptReport]:
+    statement = select(AttemptReport).where(*date_range(AttemptReport.generated_at, since, until))
+    if exam_id is not None:
+        statement = statement.where(AttemptReport.exam_id == exam_id)
+    if student_id is not None:
+        statement = statement.where(AttemptReport.student_id == student_id)
+    return pagination.page(db, statement, [AttemptReport.generated_at, AttemptReport.id])
 
 
 @router.get("/security-incidents", response_model=list[SecurityIncidentRead])
 def list_security_incidents(
+    exam_id: int | None = None,
+    student_id: int | None = None,
+    incident_type: str | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    pagination: Pagination = Depends(),
     _: User = Depends(require_admin),
     db: Session = Depends(get_db),
 ) -> list[SecurityIncidentRead]:
-    incidents = db.scalars(
+    statement = (
         select(SecurityIncident)
         .options(selectinload(SecurityIncident.student), selectinload(SecurityIncident.exam))
-        .order_by(desc(SecurityIncident.occurred_at), desc(SecurityIncident.id))
-        .limit(100)
-    ).all()
+        .where(*date_range(SecurityIncident.occurred_at, since, until))
+    )
+    if exam_id is not None:
+        statement = statement.where(SecurityIncident.exam_id == exam_id)
+    if student_id is not None:
+        statement = statement.where(SecurityIncident.student_id == student_id)
+    if incident_type is not None:
+        statement = statement.where(SecurityIncident.incident_type == incident_type)
+    incidents = pagination.page(db, statement, [SecurityIncident.occurred_at, SecurityIncident.id])
 
     return [
         SecurityIncidentRead(
@@ -4,6 +4,7 @@ from sqlalchemy.orm import Session
 
 from app.extensions.db import get_db
 from app.models.user import User, UserRole
+from app.services.principal_cache import get_principal, principal_cache, put_principal
 from app.utils.security import decode_access_token
 
 
@@ -26,17 +27,27 @@ def get_current_user(
             detail=str(exc),
         ) from exc
 
-    user = db.scalar(select(User).where(User.id == int(payload["sub"])))
+    user_id = int(payload["sub"])
+    token_version = int(payload.get("ver", 0))
+    cached = get_principal(user_id, token_version)
+    if cached is not None:
+        # Attach a per-request copy without a SELECT so routes can still mutate
+        # and commit the user through their own session.
+        return db.merge(cached, load=False)
+
+    epoch = principal_cache.epoch
+    user = db.scalar(select(User).where(User.id == user_id))
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found",
         )
-    if int(payload.get("ver", 0)) != user.token_version:
+    if token_version != user.token_version:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Session has been revoked. Please sign in again.",
         )
+    put_principal(user, epoch=epoch)
     return user
 
 
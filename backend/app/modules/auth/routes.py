@@ -20,13 +20,13 @@ from app.schemas.user import (
     UserRead,
 )
 from app.services.job_queue import enqueue_password_reset_email
+from app.services.password_hashing import password_hasher
+from app.services.principal_cache import principal_cache
 from app.utils.security import (
     create_access_token,
     generate_random_password,
     generate_reset_token,
-    hash_password,
     hash_reset_token,
-    verify_password,
     verify_reset_token,
 )
 
@@ -47,7 +47,7 @@ def _issue_login(user: User) -> LoginResponse:
 @router.post("/login", response_model=LoginResponse)
 def login(payload: LoginRequest, db: Session = Depends(get_db)) -> LoginResponse:
     user = db.scalar(select(User).where(User.username == payload.username))
-    if user is None or not verify_password(payload.password, user.password_hash):
+    if user is None or not password_hasher.verify(payload.password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid username or password",
@@ -79,7 +79,7 @@ def register_student(
         full_name=payload.full_name,
         username=payload.username,
         email=payload.email,
-        password_hash=hash_password(payload.password),
+        password_hash=password_hasher.hash(payload.password),
         role=UserRole.student,
         auth_provider=AuthProvider.password,
     )
@@ -158,7 +158,7 @@ def google_login(payload: GoogleLoginRequest, db: Session = Depends(get_db)) ->
             email=email,
             # Provider-managed account: store an unguessable random password so
             # the password-login path can never authenticate as this user.
-            password_hash=hash_password(generate_random_password()),
+            password_hash=password_hasher.hash(generate_random_password()),
             role=UserRole.student,
             auth_provider=AuthProvider.google,
             email_verified=True,
@@ -179,6 +179,7 @@ def logout(
     # for this user (logout everywhere), since tokens are stateless.
     current_user.token_version += 1
     db.commit()
+    principal_cache.invalidate(current_user.id)
     return MessageResponse(detail="Signed out on all devices.")
 
 
@@ -229,12 +230,13 @@ def confirm_password_reset(
             detail="Reset link is invalid or has expired.",
         )
 
-    user.password_hash = hash_password(payload.new_password)
+    user.password_hash = password_hasher.hash(payload.new_password)
     user.reset_token_hash = None
     user.reset_token_expires_at = None
     # Revoke all existing sessions after a password change.
     user.token_version += 1
     db.commit()
+    principal_cache.invalidate(user.id)
     return MessageResponse(detail="Password updated. Please sign in with your new password.")
 
 
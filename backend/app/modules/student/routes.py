@@ -1,11 +1,19 @@
 from datetime import UTC, datetime
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import desc, func, select
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import desc, func, select, update
 from sqlalchemy.orm import Session, selectinload
 
 from app.extensions.db import get_db
-from app.models.exam import AttemptAnswer, AttemptStatus, Exam, ExamAssignment, ExamAttempt, SecurityIncident
+from app.models.exam import (
+    AttemptAnswer,
+    AttemptStatus,
+    Exam,
+    ExamAssignment,
+    ExamAttempt,
+    ExamQuestion,
+    SecurityIncident,
+)
 from app.models.user import User
 from app.modules.auth.dependencies import require_student
 from app.schemas.exam import (
@@ -13,13 +21,20 @@ from app.schemas.exam import (
     AssignmentStatusRead,
     AttemptResult,
     AttemptSubmitRequest,
+    AutosaveAck,
     ExamStartResponse,
-    QuestionRead,
     SecurityIncidentCreate,
     SecurityIncidentRead,
     StudentDashboard,
 )
+from app.services.analytics import record_attempt_started, record_attempt_submitted, record_incident
+from app.services.answers import upsert_answers
+from app.services.autosave_buffer import autosave_buffer
+from app.services.exam_paper_cache import get_exam_paper
+from app.services.grading import grade_attempts
 from app.services.job_queue import enqueue_attempt_report
+from app.services.student_summary import get_student_summary, student_summary_cache
+from app.utils.pagination import Pagination, date_range
 
 router = APIRouter(prefix="/student", tags=["student"])
 
@@ -29,34 +44,7 @@ def student_dashboard(
     current_user: User = Depends(require_student),
     db: Session = Depends(get_db),
 ) -> StudentDashboard:
-    assigned_exams = (
-        db.scalar(select(func.count(ExamAssignment.id)).where(ExamAssignment.student_id == current_user.id))
-        or 0
-    )
-    completed_exams = (
-        db.scalar(
-            select(func.count(ExamAttempt.id)).where(
-                ExamAttempt.student_id == current_user.id,
-                ExamAttempt.status == AttemptStatus.submitted,
-            )
-        )
-        or 0
-    )
-    average_score = (
-        db.scalar(
-            select(func.avg(ExamAttempt.percentage)).where(
-                ExamAttempt.student_id == current_user.id,
-                ExamAttempt.status == AttemptStatus.submitted,
-            )
-        )
-        or 0
-    )
-    return StudentDashboard(
-        assigned_exams=assigned_exams,
-        completed_exams=completed_exams,
-        pending_exams=max(assigned_exams - completed_exams, 0),
-        average_score=round(float(average_score), 2),
-    )
+    return get_student_summary(db, current_user.id).dashboard
 
 
 @router.get("/assignments", response_model=list[AssignmentStatusRead])
@@ -64,31 +52,7 @@ def my_assignments(
     current_user: User = Depends(require_student),
     db: Session = Depends(get_db),
 ) -> list[AssignmentStatusRead]:
-    assignments = db.scalars(
-        select(ExamAssignment)
-        .where(ExamAssignment.student_id == current_user.id)
-        .options(selectinload(ExamAssignment.exam), selectinload(ExamAssignment.attempts))
-        .order_by(desc(ExamAssignment.id))
-    ).all()
-
-    response: list[AssignmentStatusRead] = []
-    for assignment in assignments:
-        latest_attempt = max(assignment.attempts, key=lambda item: item.id) if assignment.attempts else None
-        response.append(
-            AssignmentStatusRead(
-                assignment_id=assignment.id,
-                exam_id=assignment.exam_id,
-                exam_title=assignment.exam.title,
-                duration_minutes=assignment.exam.duration_minutes,
-                assigned_at=assignment.assigned_at,
-                attempt_id=latest_attempt.id if latest_attempt else None,
-                status=latest_attempt.status if latest_attempt else None,
-                score=latest_attempt.score if latest_attempt else None,
-                total_marks=latest_attempt.total_marks if latest_attempt else None,
-                percentage=float(latest_attempt.percentage) if latest_attempt else None,
-            )
-        )
-    return response
+    return list(get_student_summary(db, current_user.id).assignments)
 
 
 @router.post("/assignments/{assignment_id}/start", response_model=ExamStartResponse)
@@ -97,49 +61,63 @@ def start_exam(
     current_user: User = Depends(require_student),
     db: Session = Depends(get_db),
 ) -> ExamStartResponse:
-    assignment = db.scalar(
-        select(ExamAssignment)
+    row = db.execute(
+        select(ExamAssignment, Exam)
+        .join(Exam, Exam.id == ExamAssignment.exam_id)
         .where(ExamAssignment.id == assignment_id, ExamAssignment.student_id == current_user.id)
-        .options(
-            selectinload(ExamAssignment.exam).selectinload(Exam.questions),
-            selectinload(ExamAssignment.attempts).selectinload(ExamAttempt.answers),
-        )
-    )
+    ).first()
 
-    if assignment is None:
+    if row is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Assignment not found")
+    assignment, exam = row
 
-    latest_attempt = max(assignment.attempts, key=lambda item: item.id) if assignment.attempts else None
+    latest_attempt = db.scalar(
+        select(ExamAttempt)
+        .where(ExamAttempt.assignment_id == assignment.id)
+        .order_by(desc(ExamAttempt.id))
+        .limit(1)
+    )
     if latest_attempt and latest_attempt.status == AttemptStatus.submitted:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail="Exam already submitted",
         )
 
+    # The question list is identical for every student, so it comes from the
+    # versioned paper cache; only attempt-specific state is read per request.
+    paper = get_exam_paper(db, exam)
     if latest_attempt and latest_attempt.status == AttemptStatus.in_progress:
         attempt = latest_attempt
+        if autosave_buffer.enabled:
+            autosave_buffer.flush(attempt.id)
+        saved_answers = [
+            AnswerState(question_id=question_id, selected_option=selected_option)
+            for question_id, selected_option in db.execute(
+                select(AttemptAnswer.question_id, AttemptAnswer.selected_option)
+                .where(AttemptAnswer.attempt_id == attempt.id)
+                .order_by(AttemptAnswer.question_id)
+            )
+        ]
     else:
-        total_marks = sum(question.marks for question in assignment.exam.questions)
         attempt = ExamAttempt(
             assignment_id=assignment.id,
             student_id=current_user.id,
-            total_marks=total_marks,
+            total_marks=paper.total_marks,
             status=AttemptStatus.in_progress,
         )
         db.add(attempt)
+        record_attempt_started(db, exam.id)
         db.commit()
+        student_summary_cache.invalidate(current_user.id)
         db.refresh(attempt)
+        saved_answers = []
 
-    saved_answers = [
-        AnswerState(question_id=answer.question_id, selected_option=answer.selected_option)
-        for answer in sorted(attempt.answers, key=lambda item: item.question_id)
-    ]
-    answered_question_ids = {answer.question_id for answer in attempt.answers}
+    answered_question_ids = {answer.question_id for answer in saved_answers}
     next_unanswered_index = next(
         (
             index
-            for index, question in enumerate(assignment.exam.questions)
-            if question.id not in answered_question_ids
+            for index, question_id in enumerate(paper.question_ids)
+            if question_id not in answered_question_ids
         ),
         0,
     )
@@ -147,20 +125,20 @@ def start_exam(
     return ExamStartResponse(
         attempt_id=attempt.id,
         assignment_id=assignment.id,
-        exam_id=assignment.exam.id,
-        title=assignment.exam.title,
-        description=assignment.exam.description,
-        duration_minutes=assignment.exam.duration_minutes,
-        block_clipboard=assignment.exam.block_clipboard,
-        block_context_menu=assignment.exam.block_context_menu,
-        block_inspect_shortcuts=assignment.exam.block_inspect_shortcuts,
-        enforce_fullscreen=assignment.exam.enforce_fullscreen,
-        track_focus_loss=assignment.exam.track_focus_loss,
+        exam_id=exam.id,
+        title=exam.title,
+        description=exam.description,
+        duration_minutes=exam.duration_minutes,
+        block_clipboard=exam.block_clipboard,
+        block_context_menu=exam.block_context_menu,
+        block_inspect_shortcuts=exam.block_inspect_shortcuts,
+        enforce_fullscreen=exam.enforce_fullscreen,
+        track_focus_loss=exam.track_focus_loss,
         started_at=attempt.started_at,
-        question_count=len(assignment.exam.questions),
+        question_count=len(paper.question_ids),
         current_question_index=next_unanswered_index,
         saved_answers=saved_answers,
-        questions=[QuestionRead.model_validate(question) for question in assignment.exam.questions],
+        questions=paper.questions,
     )
 
 
@@ -193,6 +171,7 @@ def log_security_incident(
         detail=payload.detail,
     )
     db.add(incident)
+    record_incident(db, payload.incident_type)
     db.commit()
     db.refresh(incident)
 
@@ -216,55 +195,71 @@ def autosave_answers(
     current_user: User = Depends(require_student),
     db: Session = Depends(get_db),
 ) -> list[AnswerState]:
-    attempt = db.scalar(
-        select(ExamAttempt)
-        .where(ExamAttempt.id == attempt_id, ExamAttempt.student_id == current_user.id)
-        .options(
-            selectinload(ExamAttempt.assignment)
-            .selectinload(ExamAssignment.exam)
-            .selectinload(Exam.questions),
-            selectinload(ExamAttempt.answers),
-        )
+    incoming_answers = {answer.question_id: answer.selected_option for answer in payload.answers}
+    _check_autosave_target(db, attempt_id, current_user.id, set(incoming_answers))
+    _save_answers(db, attempt_id, incoming_answers)
+    answers = dict(
+        db.execute(
+            select(AttemptAnswer.question_id, AttemptAnswer.selected_option).where(
+                AttemptAnswer.attempt_id == attempt_id
+            )
+        ).all()
     )
-    if attempt is None:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Attempt not found")
-    if attempt.status == AttemptStatus.submitted:
-        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Attempt already submitted")
+    if autosave_buffer.enabled:
+        answers.update(autosave_buffer.pending_answers(attempt_id))
+    return [
+        AnswerState(question_id=question_id, selected_option=selected_option)
+        for question_id, selected_option in sorted(answers.items())
+    ]
 
-    valid_question_ids = {question.id for question in attempt.assignment.exam.questions}
+
+@router.patch("/attempts/{attempt_id}/answers", response_model=AutosaveAck)
+def autosave_answer_delta(
+    attempt_id: int,
+    payload: AttemptSubmitRequest,
+    current_user: User = Depends(require_student),
+    db: Session = Depends(get_db),
+) -> AutosaveAck:
+    """Save only the answers that changed and acknowledge without echoing state.
+
+    One query validates ownership, status and question membership; one upsert
+    writes the delta, or the write-behind buffer takes it when enabled.
+    """
     incoming_answers = {answer.question_id: answer.selected_option for answer in payload.answers}
-    if not set(incoming_answers).issubset(valid_question_ids):
+    _check_autosave_target(db, attempt_id, current_user.id, set(incoming_answers))
+    _save_answers(db, attempt_id, incoming_answers)
+    return AutosaveAck(attempt_id=attempt_id, saved=len(incoming_answers))
+
+
+def _check_autosave_target(db: Session, attempt_id: int, student_id: int, question_ids: set[int]) -> None:
+    matching_questions = (
+        select(func.count(ExamQuestion.id))
+        .where(ExamQuestion.exam_id == ExamAssignment.exam_id, ExamQuestion.id.in_(question_ids))
+        .scalar_subquery()
+    )
+    row = db.execute(
+        select(ExamAttempt.status, matching_questions)
+        .join(ExamAssignment, ExamAssignment.id == ExamAttempt.assignment_id)
+        .where(ExamAttempt.id == attempt_id, ExamAttempt.student_id == student_id)
+    ).first()
+    if row is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Attempt not found")
+    attempt_status, matched = row
+    if attempt_status == AttemptStatus.submitted:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Attempt already submitted")
+    if matched != len(question_ids):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="One or more answers do not belong to this exam",
         )
 
-    existing_answers = {answer.question_id: answer for answer in attempt.answers}
-    for question_id, selected_option in incoming_answers.items():
-        existing_answer = existing_answers.get(question_id)
-        if existing_answer:
-            existing_answer.selected_option = selected_option
-        else:
-            db.add(
-                AttemptAnswer(
-                    attempt_id=attempt.id,
-                    question_id=question_id,
-                    selected_option=selected_option,
-                    is_correct=False,
-                    marks_awarded=0,
-                )
-            )
 
+def _save_answers(db: Session, attempt_id: int, answers: dict[int, str]) -> None:
+    if autosave_buffer.enabled:
+        autosave_buffer.add(attempt_id, answers)
+        return
+    upsert_answers(db, ((attempt_id, question_id, option) for question_id, option in answers.items()))
     db.commit()
-    refreshed_attempt = db.scalar(
-        select(ExamAttempt)
-        .where(ExamAttempt.id == attempt.id)
-        .options(selectinload(ExamAttempt.answers))
-    )
-    return [
-        AnswerState(question_id=answer.question_id, selected_option=answer.selected_option)
-        for answer in sorted(refreshed_attempt.answers, key=lambda item: item.question_id)
-    ]
 
 
 @router.post("/attempts/{attempt_id}/submit", response_model=AttemptResult)
@@ -274,94 +269,91 @@ def submit_attempt(
     current_user: User = Depends(require_student),
     db: Session = Depends(get_db),
 ) -> AttemptResult:
-    attempt = db.scalar(
-        select(ExamAttempt)
+    if autosave_buffer.enabled:
+        # Grading must see every answer the buffer has acknowledged.
+        autosave_buffer.flush(attempt_id)
+    row = db.execute(
+        select(ExamAttempt.status, Exam)
+        .join(ExamAssignment, ExamAssignment.id == ExamAttempt.assignment_id)
+        .join(Exam, Exam.id == ExamAssignment.exam_id)
         .where(ExamAttempt.id == attempt_id, ExamAttempt.student_id == current_user.id)
-        .options(
-            selectinload(ExamAttempt.assignment)
-            .selectinload(ExamAssignment.exam)
-            .selectinload(Exam.questions),
-            selectinload(ExamAttempt.answers),
-        )
-    )
-    if attempt is None:
+    ).first()
+    if row is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Attempt not found")
-    if attempt.status == AttemptStatus.submitted:
+    attempt_status, exam = row
+    if attempt_status == AttemptStatus.submitted:
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Attempt already submitted")
 
-    allowed_finish_time = attempt.started_at.astimezone(UTC).timestamp() + (
-        attempt.assignment.exam.duration_minutes * 60
-    )
-    now_ts = datetime.now(UTC).timestamp()
-
-    question_map = {question.id: question for question in attempt.assignment.exam.questions}
     if payload.answers:
-        incoming_answers = {answer.question_id: answer.selected_option for answer in payload.answers}
-        existing_answers = {answer.question_id: answer for answer in attempt.answers}
-        for question_id, selected_option in incoming_answers.items():
-            existing_answer = existing_answers.get(question_id)
-            if existing_answer:
-                existing_answer.selected_option = selected_option
-            elif question_id in question_map:
-                db.add(
-                    AttemptAnswer(
-                        attempt_id=attempt.id,
-                        question_id=question_id,
-                        selected_option=selected_option,
-                        is_correct=False,
-                        marks_awarded=0,
-                    )
-                )
-        db.flush()
-        db.refresh(attempt)
+        # Answers to questions outside this exam are ignored, as before. A
+        # question sent twice keeps its last answer: one upsert statement
+        # cannot update the same row twice.
+        question_ids = set(get_exam_paper(db, exam).question_ids)
+        answers = {answer.question_id: answer.selected_option for answer in payload.answers}
+        upsert_answers(
+            db,
+            (
+                (attempt_id, question_id, option)
+                for question_id, option in answers.items()
+                if question_id in question_ids
+            ),
+        )
 
-    score = 0
-    for answer in attempt.answers:
-        question = question_map.get(answer.question_id)
-        selected_option = answer.selected_option
-        if question is None:
-            continue
-        if selected_option is None:
-            continue
-        is_correct = selected_option == question.correct_option
-        marks_awarded = question.marks if is_correct else 0
-        score += marks_awarded
-        answer.is_correct = is_correct
-        answer.marks_awarded = marks_awarded
-
-    _ = now_ts > allowed_finish_time
-    attempt.status = AttemptStatus.submitted
-    attempt.score = score
-    attempt.total_marks = sum(question.marks for question in question_map.values())
-    attempt.percentage = round((score / attempt.total_marks) * 100, 2) if attempt.total_marks else 0
-    attempt.submitted_at = datetime.now(UTC)
-    db.flush()
-    enqueue_attempt_report(db, attempt_id=attempt.id)
+    submitted_at = datetime.now(UTC)
+    # The check above is a plain read, so two concurrent submits can both pass
+    # it. Only the request whose update still finds the attempt in progress
+    # goes on to grade it, count it in the rollups and queue its report.
+    claimed = db.execute(
+        update(ExamAttempt)
+        .where(ExamAttempt.id == attempt_id, ExamAttempt.status == AttemptStatus.in_progress)
+        .values(status=AttemptStatus.submitted, submitted_at=submitted_at)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if not claimed:
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Attempt already submitted")
+    (graded,) = grade_attempts(db, [attempt_id])
+    record_attempt_submitted(db, exam.id, graded.percentage)
+    enqueue_attempt_report(db, attempt_id=attempt_id)
     db.commit()
-    db.refresh(attempt)
+    student_summary_cache.invalidate(current_user.id)
 
     return AttemptResult(
-        attempt_id=attempt.id,
-        exam_title=attempt.assignment.exam.title,
-        score=attempt.score,
-        total_marks=attempt.total_marks,
-        percentage=float(attempt.percentage),
-        status=attempt.status,
-        submitted_at=attempt.submitted_at,
+        attempt_id=attempt_id,
+        exam_title=exam.title,
+        score=graded.score,
+        total_marks=graded.total_marks,
+        percentage=graded.percentage,
+        status=AttemptStatus.submitted,
+        submitted_at=submitted_at,
     )
 
 
 @router.get("/attempts/history", response_model=list[AttemptResult])
 def attempt_history(
+    exam_id: int | None = None,
+    status_filter: AttemptStatus | None = Query(None, alias="status"),
+    since: datetime | None = None,
+    until: datetime | None = None,
+    pagination: Pagination = Depends(),
     current_user: User = Depends(require_student),
     db: Session = Depends(get_db),
 ) -> list[AttemptResult]:
-    attempts = db.scalars(
+    statement = (
         select(ExamAttempt)
-        .where(ExamAttempt.student_id == current_user.id)
+        .where(
+            ExamAttempt.student_id == current_user.id,
+            *date_range(ExamAttempt.started_at, since, until),
+        )
         .options(selectinload(ExamAttempt.assignment).selectinload(ExamAssignment.exam))
-        .order_by(desc(ExamAttempt.id))
-    ).all()
+    )
+    if exam_id is not None:
+        statement = statement.join(ExamAssignment, ExamAssignment.id == ExamAttempt.assignment_id).where(
+            ExamAssignment.exam_id == exam_id
+        )
+    if status_filter is not None:
+        statement = statement.where(ExamAttempt.status == status_filter)
+    attempts = pagination.page(db, statement, [ExamAttempt.id])
 
     return [
         AttemptResult(
@@ -52,3 +52,49 @@ class AuditEventRead(BaseModel):
     created_at: datetime
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class CacheStats(BaseModel):
+    size: int = 0
+    max_entries: int = 0
+    hits: int = 0
+    misses: int = 0
+    hit_ratio: float = 0
+    evictions: int = 0
+    invalidations: int = 0
+
+
+class PasswordHashingStats(BaseModel):
+    workers: int = 0
+    bulk_workers: int = 0
+    capacity: int = 0
+    in_flight: int = 0
+    queue_depth: int = 0
+    completed: int = 0
+    rejected: int = 0
+    timed_out: int = 0
+    avg_latency_ms: float = 0
+    max_latency_ms: float = 0
+    bulk_hashed: int = 0
+    bulk_seconds: float = 0
+
+
+class AutosaveBufferStats(BaseModel):
+    enabled: bool = False
+    buffered: int = 0
+    flushes: int = 0
+    flush_failures: int = 0
+    flushed_answers: int = 0
+    discarded_answers: int = 0
+    last_flush_ms: float = 0
+    max_flush_ms: float = 0
+
+
+class RuntimeMetrics(BaseModel):
+    """Per-process counters; each API worker reports its own values."""
+
+    principal_cache: CacheStats = CacheStats()
+    password_hashing: PasswordHashingStats = PasswordHashingStats()
+    exam_paper_cache: CacheStats = CacheStats()
+    autosave_buffer: AutosaveBufferStats = AutosaveBufferStats()
+    student_summary_cache: CacheStats = CacheStats()
@@ -1,4 +1,5 @@
 from datetime import datetime
+from enum import Enum
 
 from pydantic import BaseModel, ConfigDict, Field
 
@@ -48,6 +49,23 @@ class BulkExamCreate(BaseModel):
     exams: list[ExamCreate] = Field(min_length=1)
 
 
+class ExamSummaryRead(BaseModel):
+    """An exam for listings: question totals instead of the questions themselves."""
+
+    id: int
+    title: str
+    duration_minutes: int
+    is_active: bool
+    block_clipboard: bool
+    block_context_menu: bool
+    block_inspect_shortcuts: bool
+    enforce_fullscreen: bool
+    track_focus_loss: bool
+    created_at: datetime
+    question_count: int = 0
+    total_marks: int = 0
+
+
 class ExamRead(BaseModel):
     id: int
     title: str
@@ -70,6 +88,27 @@ class AssignmentCreate(BaseModel):
     student_id: int
 
 
+class BulkAssignmentCreate(BaseModel):
+    """Assign every listed exam to every listed student."""
+
+    exam_ids: list[int] = Field(min_length=1, max_length=100)
+    student_ids: list[int] = Field(min_length=1, max_length=10000)
+
+
+class BulkAssignmentResult(BaseModel):
+    created: int
+    skipped: int
+    email_job_ids: list[int]
+
+
+class AssignmentStatus(str, Enum):
+    """Assignment filter: the latest attempt's status, or ``pending`` when never started."""
+
+    pending = "pending"
+    in_progress = "in_progress"
+    submitted = "submitted"
+
+
 class AssignmentRead(BaseModel):
     id: int
     exam_id: int
@@ -130,6 +169,11 @@ class AttemptSubmitRequest(BaseModel):
     answers: list[AnswerSubmit] = Field(default_factory=list)
 
 
+class AutosaveAck(BaseModel):
+    attempt_id: int
+    saved: int
+
+
 class AttemptResult(BaseModel):
     attempt_id: int
     exam_title: str
@@ -190,3 +234,21 @@ class BackgroundJobRead(BaseModel):
     completed_at: datetime | None = None
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class AttemptReportRead(BaseModel):
+    id: int
+    attempt_id: int
+    exam_id: int
+    exam_title: str
+    student_id: int
+    student_name: str
+    score: int
+    total_marks: int
+    percentage: float
+    answered_questions: int
+    correct_answers: int
+    submitted_at: datetime | None = None
+    generated_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
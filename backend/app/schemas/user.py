@@ -28,6 +28,19 @@ class BulkUserCreate(BaseModel):
     users: list[UserCreate] = Field(min_length=1)
 
 
+class RowConflictRead(BaseModel):
+    row: int
+    field: str
+    value: str
+    reason: str
+    first_row: int | None = None
+
+
+class BulkConflictReport(BaseModel):
+    detail: str
+    conflicts: list[RowConflictRead]
+
+
 class StudentRegisterRequest(BaseModel):
     full_name: str = Field(min_length=2, max_length=120)
     username: str = Field(min_length=3, max_length=80)
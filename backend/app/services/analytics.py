@@ -0,0 +1,297 @@
+"""Admin analytics: rollup maintenance, reads, and the SQL aggregation behind them.
+
+``/admin/analytics`` and ``/admin/dashboard`` read the ``exam_rollups`` and
+``incident_rollups`` tables, which hold one row per exam and per incident type.
+The hot paths keep them current with single-statement upserts in the same
+transaction as the change: assigning an exam, starting and submitting an
+attempt, and logging an incident. Deletes and re-grades are rare, so they
+recompute the affected exams from the raw tables with the same aggregation
+``rebuild_rollups`` uses (``python -m app.cli rebuild-analytics``).
+
+The aggregation reduces each assignment to its latest attempt (highest id) with
+a ``row_number()`` window and groups per exam, so only summary rows leave the
+database.
+"""
+
+from collections.abc import Iterable
+
+from sqlalchemy import Float, and_, case, cast, delete, func, insert, or_, select
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Subquery
+
+from app.extensions.db import upsert_insert
+from app.models.analytics import ExamRollup, IncidentRollup
+from app.models.exam import AttemptStatus, Exam, ExamAssignment, ExamAttempt, SecurityIncident
+from app.models.user import User, UserRole
+from app.schemas.analytics import (
+    AdminAnalytics,
+    AssignmentBreakdown,
+    ExamPerformance,
+    IncidentBreakdown,
+    ResultsMetrics,
+)
+from app.schemas.exam import DashboardStats
+
+PASS_THRESHOLD = 50
+TOP_EXAMS = 10
+EXAM_COUNTERS = ("assignments", "in_progress", "submitted", "passed", "score_sum")
+
+
+def latest_attempts() -> Subquery:
+    """One row per assignment that has attempts: its most recent attempt."""
+    ranked = select(
+        ExamAttempt.assignment_id,
+        ExamAttempt.status,
+        ExamAttempt.percentage,
+        func.row_number()
+        .over(partition_by=ExamAttempt.assignment_id, order_by=ExamAttempt.id.desc())
+        .label("position"),
+    ).subquery()
+    return (
+        select(ranked.c.assignment_id, ranked.c.status, ranked.c.percentage)
+        .where(ranked.c.position == 1)
+        .subquery("latest_attempts")
+    )
+
+
+def _count_where(condition):
+    return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+
+def _exam_aggregates(db: Session, exam_ids: Iterable[int] | None = None) -> list[dict]:
+    """Rollup rows for ``exam_ids`` (every assigned exam when ``None``) from the raw tables."""
+    latest = latest_attempts()
+    submitted = latest.c.status == AttemptStatus.submitted
+    percentage = cast(latest.c.percentage, Float)
+    query = (
+        select(
+            ExamAssignment.exam_id,
+            func.count(ExamAssignment.id),
+            _count_where(latest.c.status == AttemptStatus.in_progress),
+            _count_where(submitted),
+            _count_where(and_(submitted, percentage >= PASS_THRESHOLD)),
+            func.coalesce(func.sum(case((submitted, percentage))), 0),
+            func.max(case((submitted, percentage))),
+            func.min(case((submitted, percentage))),
+        )
+        .outerjoin(latest, latest.c.assignment_id == ExamAssignment.id)
+        .group_by(ExamAssignment.exam_id)
+        .order_by(ExamAssignment.exam_id)
+    )
+    if exam_ids is not None:
+        query = query.where(ExamAssignment.exam_id.in_(list(exam_ids)))
+    return [
+        {
+            "exam_id": exam_id,
+            **dict(zip(EXAM_COUNTERS, counters, strict=True)),
+            "highest_score": high,
+            "lowest_score": low,
+        }
+        for exam_id, *counters, high, low in db.execute(query)
+    ]
+
+
+def compute_admin_analytics(db: Session) -> AdminAnalytics:
+    """Analytics straight from the raw tables, bypassing the rollups."""
+    titles = dict(db.execute(select(Exam.id, Exam.title)).all())
+    rows = [{**row, "title": titles[row["exam_id"]]} for row in _exam_aggregates(db)]
+    incidents = db.execute(
+        select(SecurityIncident.incident_type, func.count(SecurityIncident.id)).group_by(
+            SecurityIncident.incident_type
+        )
+    ).all()
+    return _build_analytics(db, rows, incidents)
+
+
+def read_admin_analytics(db: Session) -> AdminAnalytics:
+    rows = [
+        {
+            "exam_id": rollup.exam_id,
+            "title": title,
+            **{counter: getattr(rollup, counter) for counter in EXAM_COUNTERS},
+            "highest_score": rollup.highest_score,
+            "lowest_score": rollup.lowest_score,
+        }
+        for rollup, title in db.execute(
+            select(ExamRollup, Exam.title)
+            .join(Exam, Exam.id == ExamRollup.exam_id)
+            .where(ExamRollup.assignments > 0)
+            .order_by(ExamRollup.exam_id)
+        )
+    ]
+    incidents = db.execute(select(IncidentRollup.incident_type, IncidentRollup.incidents)).all()
+    return _build_analytics(db, rows, incidents)
+
+
+def read_dashboard_stats(db: Session) -> DashboardStats:
+    assignments, submitted, score_sum = db.execute(
+        select(
+            func.coalesce(func.sum(ExamRollup.assignments), 0),
+            func.coalesce(func.sum(ExamRollup.submitted), 0),
+            func.coalesce(func.sum(ExamRollup.score_sum), 0),
+        )
+    ).one()
+    return DashboardStats(
+        total_students=_student_count(db),
+        total_exams=db.scalar(select(func.count(Exam.id))) or 0,
+        total_assignments=assignments,
+        completed_attempts=submitted,
+        average_score=round(float(score_sum) / submitted, 2) if submitted else 0,
+    )
+
+
+def _student_count(db: Session) -> int:
+    return db.scalar(select(func.count(User.id)).where(User.role == UserRole.student)) or 0
+
+
+def _build_analytics(db: Session, rows: list[dict], incidents) -> AdminAnalytics:
+    breakdown = AssignmentBreakdown()
+    results = ResultsMetrics()
+    score_sum = 0.0
+    passed = 0
+    highest: list[float] = []
+    lowest: list[float] = []
+    exam_performance: list[ExamPerformance] = []
+    for row in rows:
+        submissions = row["submitted"]
+        breakdown.total += row["assignments"]
+        breakdown.in_progress += row["in_progress"]
+        breakdown.submitted += submissions
+        passed += row["passed"]
+        score_sum += float(row["score_sum"])
+        if submissions:
+            highest.append(float(row["highest_score"]))
+            lowest.append(float(row["lowest_score"]))
+        exam_performance.append(
+            ExamPerformance(
+                exam_id=row["exam_id"],
+                title=row["title"],
+                assignments=row["assignments"],
+                submissions=submissions,
+                average_score=round(float(row["score_sum"]) / submissions, 2) if submissions else 0,
+            )
+        )
+    breakdown.pending = breakdown.total - breakdown.in_progress - breakdown.submitted
+
+    results.submitted_attempts = breakdown.submitted
+    if breakdown.submitted:
+        results.average_score = round(score_sum / breakdown.submitted, 2)
+        results.highest_score = round(max(highest), 2)
+        results.lowest_score = round(min(lowest), 2)
+        results.pass_rate = round((passed / breakdown.submitted) * 100, 2)
+    exam_performance.sort(key=lambda item: (item.submissions, item.assignments), reverse=True)
+
+    total_exams, active_exams = db.execute(
+        select(func.count(Exam.id), _count_where(Exam.is_active.is_(True)))
+    ).one()
+    return AdminAnalytics(
+        pass_threshold=PASS_THRESHOLD,
+        total_students=_student_count(db),
+        total_exams=total_exams,
+        active_exams=active_exams,
+        assignments=breakdown,
+        results=results,
+        incidents=IncidentBreakdown(
+            total=sum(count for _, count in incidents),
+            by_type={incident_type: count for incident_type, count in incidents},
+        ),
+        exam_performance=exam_performance[:TOP_EXAMS],
+    )
+
+
+def record_assignments(db: Session, exam_id: int, count: int = 1) -> None:
+    _bump_exam(db, exam_id, assignments=count)
+
+
+def record_attempt_started(db: Session, exam_id: int) -> None:
+    _bump_exam(db, exam_id, in_progress=1)
+
+
+def record_attempt_submitted(db: Session, exam_id: int, percentage: float) -> None:
+    _bump_exam(
+        db,
+        exam_id,
+        in_progress=-1,
+        submitted=1,
+        passed=int(percentage >= PASS_THRESHOLD),
+        score=percentage,
+    )
+
+
+def record_incident(db: Session, incident_type: str) -> None:
+    statement = upsert_insert(db, IncidentRollup).values(incident_type=incident_type, incidents=1)
+    db.execute(
+        statement.on_conflict_do_update(
+            index_elements=[IncidentRollup.incident_type],
+            set_={"incidents": IncidentRollup.__table__.c.incidents + 1},
+        )
+    )
+
+
+def _bump_exam(
+    db: Session,
+    exam_id: int,
+    *,
+    assignments: int = 0,
+    in_progress: int = 0,
+    submitted: int = 0,
+    passed: int = 0,
+    score: float | None = None,
+) -> None:
+    rollups = ExamRollup.__table__
+    statement = upsert_insert(db, ExamRollup).values(
+        exam_id=exam_id,
+        assignments=assignments,
+        in_progress=in_progress,
+        submitted=submitted,
+        passed=passed,
+        score_sum=score or 0,
+        highest_score=score,
+        lowest_score=score,
+    )
+    excluded = statement.excluded
+    set_ = {counter: rollups.c[counter] + excluded[counter] for counter in EXAM_COUNTERS}
+    if score is not None:
+        current_high, current_low = rollups.c.highest_score, rollups.c.lowest_score
+        set_["highest_score"] = case(
+            (or_(current_high.is_(None), excluded.highest_score > current_high), excluded.highest_score),
+            else_=current_high,
+        )
+        set_["lowest_score"] = case(
+            (or_(current_low.is_(None), excluded.lowest_score < current_low), excluded.lowest_score),
+            else_=current_low,
+        )
+    db.execute(statement.on_conflict_do_update(index_elements=[ExamRollup.exam_id], set_=set_))
+
+
+def refresh_exam_rollups(db: Session, exam_ids: Iterable[int] | None = None) -> None:
+    """Recompute rollups for ``exam_ids`` (all exams when ``None``). The caller commits."""
+    if exam_ids is not None:
+        exam_ids = set(exam_ids)
+        if not exam_ids:
+            return
+        db.execute(delete(ExamRollup).where(ExamRollup.exam_id.in_(exam_ids)))
+    else:
+        db.execute(delete(ExamRollup))
+    rows = _exam_aggregates(db, exam_ids)
+    if rows:
+        db.execute(insert(ExamRollup), rows)
+
+
+def refresh_incident_rollups(db: Session) -> None:
+    db.execute(delete(IncidentRollup))
+    rows = db.execute(
+        select(SecurityIncident.incident_type, func.count(SecurityIncident.id)).group_by(
+            SecurityIncident.incident_type
+        )
+    ).all()
+    if rows:
+        db.execute(
+            insert(IncidentRollup),
+            [{"incident_type": incident_type, "incidents": count} for incident_type, count in rows],
+        )
+
+
+def rebuild_rollups(db: Session) -> None:
+    refresh_exam_rollups(db)
+    refresh_incident_rollups(db)
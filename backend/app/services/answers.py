@@ -0,0 +1,34 @@
+from collections.abc import Iterable
+
+from sqlalchemy.orm import Session
+
+from app.extensions.db import upsert_insert
+from app.models.exam import AttemptAnswer
+
+
+def upsert_answers(db: Session, answers: Iterable[tuple[int, int, str]]) -> int:
+    """Write ``(attempt_id, question_id, selected_option)`` rows in one statement.
+
+    Existing answers for the same question are overwritten. The caller is
+    responsible for commit. Returns the number of rows sent.
+    """
+    rows = [
+        {
+            "attempt_id": attempt_id,
+            "question_id": question_id,
+            "selected_option": selected_option,
+            "is_correct": False,
+            "marks_awarded": 0,
+        }
+        for attempt_id, question_id, selected_option in answers
+    ]
+    if not rows:
+        return 0
+    statement = upsert_insert(db, AttemptAnswer).values(rows)
+    db.execute(
+        statement.on_conflict_do_update(
+            index_elements=[AttemptAnswer.attempt_id, AttemptAnswer.question_id],
+            set_={"selected_option": statement.excluded.selected_option},
+        )
+    )
+    return len(rows)
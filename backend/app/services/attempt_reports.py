@@ -0,0 +1,84 @@
+"""Submitted-attempt reports, computed for many attempts at once.
+
+Each submission queues an ``attempt_report`` job, so an exam closing for a whole
+class queues hundreds at the same moment. The worker claims them together and
+``build_attempt_reports`` answers the batch with one query: answer counts come
+from an aggregate over ``attempt_answers`` grouped by attempt, joined to the
+attempt, student and exam columns the report shows. No answer or question rows
+are loaded into Python. ``save_attempt_reports`` then upserts the batch into
+``attempt_reports``, which ``/admin/reports`` pages through.
+"""
+
+from collections.abc import Collection
+from typing import Any
+
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import Session
+
+from app.extensions.db import upsert_insert
+from app.models.exam import AttemptAnswer, Exam, ExamAssignment, ExamAttempt
+from app.models.report import AttemptReport
+from app.models.user import User
+
+
+def build_attempt_reports(db: Session, attempt_ids: Collection[int]) -> dict[int, dict[str, Any]]:
+    """Return ``attempt_reports`` values for each attempt in ``attempt_ids`` that exists."""
+    answer_totals = (
+        select(
+            AttemptAnswer.attempt_id,
+            func.sum(case((AttemptAnswer.selected_option != "", 1), else_=0)).label("answered"),
+            func.sum(case((AttemptAnswer.is_correct, 1), else_=0)).label("correct"),
+        )
+        .where(AttemptAnswer.attempt_id.in_(attempt_ids))
+        .group_by(AttemptAnswer.attempt_id)
+        .subquery()
+    )
+    rows = db.execute(
+        select(
+            ExamAttempt.id,
+            ExamAttempt.student_id,
+            User.full_name,
+            ExamAssignment.exam_id,
+            Exam.title,
+            ExamAttempt.score,
+            ExamAttempt.total_marks,
+            ExamAttempt.percentage,
+            ExamAttempt.submitted_at,
+            func.coalesce(answer_totals.c.answered, 0).label("answered"),
+            func.coalesce(answer_totals.c.correct, 0).label("correct"),
+        )
+        .join(User, User.id == ExamAttempt.student_id)
+        .join(ExamAssignment, ExamAssignment.id == ExamAttempt.assignment_id)
+        .join(Exam, Exam.id == ExamAssignment.exam_id)
+        .outerjoin(answer_totals, answer_totals.c.attempt_id == ExamAttempt.id)
+        .where(ExamAttempt.id.in_(attempt_ids))
+    )
+    return {
+        row.id: {
+            "attempt_id": row.id,
+            "student_id": row.student_id,
+            "student_name": row.full_name,
+            "exam_id": row.exam_id,
+            "exam_title": row.title,
+            "score": row.score,
+            "total_marks": row.total_marks,
+            "percentage": float(row.percentage),
+            "answered_questions": int(row.answered),
+            "correct_answers": int(row.correct),
+            "submitted_at": row.submitted_at,
+        }
+        for row in rows
+    }
+
+
+def save_attempt_reports(db: Session, reports: Collection[dict[str, Any]]) -> dict[int, int]:
+    """Insert or replace the reports in one statement; return report ids by attempt id."""
+    if not reports:
+        return {}
+    statement = upsert_insert(db, AttemptReport).values(list(reports))
+    replaced = {name: statement.excluded[name] for name in next(iter(reports)) if name != "attempt_id"}
+    statement = statement.on_conflict_do_update(
+        index_elements=[AttemptReport.attempt_id],
+        set_={**replaced, "generated_at": func.now()},
+    ).returning(AttemptReport.attempt_id, AttemptReport.id)
+    return dict(db.execute(statement).tuples().all())
@@ -0,0 +1,354 @@
+"""Optional write-behind buffer for exam autosaves.
+
+With ``AUTOSAVE_WRITE_BEHIND`` enabled, autosave endpoints validate a delta and
+add it to this buffer instead of committing it. Answers are coalesced per
+``(attempt_id, question_id)`` and written in one batched upsert every
+``AUTOSAVE_FLUSH_INTERVAL_SECONDS``; resuming or submitting an attempt flushes
+it synchronously first. The store is a SQLite file shared by the processes on
+one host (``AUTOSAVE_BUFFER_PATH``, required when the buffer is enabled) that
+survives a crash and is drained by the next flush from any process. The
+in-memory store backs a disabled buffer and single-process tests only: a submit
+on one API worker could not flush answers buffered by another.
+
+A flush first claims the entries it will write, inside the store, so flushes in
+other processes skip them (a claim left by a crashed process expires after
+``CLAIM_TIMEOUT_SECONDS``). It commits to the database before removing entries
+from the store, and only removes entries that were not overwritten in the
+meantime, so a crash in between replays an idempotent upsert. An overwritten
+entry stays claimed until that flush finishes, so an older value can never be
+written after a newer one. Answers for attempts that have since been submitted
+are discarded.
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import closing, contextmanager
+from time import perf_counter
+from typing import Protocol
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.config.base import get_settings
+from app.extensions.db import SessionLocal
+from app.models.exam import AttemptStatus, ExamAttempt
+from app.services.answers import upsert_answers
+
+logger = logging.getLogger(__name__)
+
+CLAIM_TIMEOUT_SECONDS = 60
+CLAIM_POLL_SECONDS = 0.05
+
+# (attempt_id, question_id, selected_option, seq). ``seq`` is unique within a
+# store and only ever increases, so a flush can tell it acknowledged the latest
+# value even if the entry was deleted and written again in between.
+BufferedAnswer = tuple[int, int, str, int]
+
+
+class AnswerStore(Protocol):
+    def add(self, attempt_id: int, answers: dict[int, str]) -> None: ...
+
+    def pending(self, attempt_id: int | None = None) -> list[BufferedAnswer]: ...
+
+    def claim(self, attempt_id: int | None = None) -> tuple[str, list[BufferedAnswer]]: ...
+
+    def ack(self, claim: str, entries: Iterable[BufferedAnswer]) -> None: ...
+
+    def release(self, claim: str) -> None: ...
+
+    def size(self) -> int: ...
+
+
+class MemoryAnswerStore:
+    def __init__(self) -> None:
+        # (attempt_id, question_id) -> [selected_option, seq, claim]
+        self._entries: dict[tuple[int, int], list] = {}
+        self._seq = 0
+        self._lock = threading.Lock()
+
+    def add(self, attempt_id: int, answers: dict[int, str]) -> None:
+        with self._lock:
+            for question_id, selected_option in answers.items():
+                self._seq += 1
+                current = self._entries.get((attempt_id, question_id))
+                claim = current[2] if current is not None else None
+                self._entries[(attempt_id, question_id)] = [selected_option, self._seq, claim]
+
+    def pending(self, attempt_id: int | None = None) -> list[BufferedAnswer]:
+        with self._lock:
+            return [
+                (entry_attempt, question_id, selected_option, seq)
+                for (entry_attempt, question_id), (selected_option, seq, _) in self._entries.items()
+                if attempt_id is None or entry_attempt == attempt_id
+            ]
+
+    def claim(self, attempt_id: int | None = None) -> tuple[str, list[BufferedAnswer]]:
+        claim = uuid.uuid4().hex
+        claimed = []
+        with self._lock:
+            for (entry_attempt, question_id), entry in self._entries.items():
+                if entry[2] is None and (attempt_id is None or entry_attempt == attempt_id):
+                    entry[2] = claim
+                    claimed.append((entry_attempt, question_id, entry[0], entry[1]))
+        return claim, claimed
+
+    def ack(self, claim: str, entries: Iterable[BufferedAnswer]) -> None:
+        with self._lock:
+            for attempt_id, question_id, _, seq in entries:
+                current = self._entries.get((attempt_id, question_id))
+                if current is not None and current[1] == seq:
+                    del self._entries[(attempt_id, question_id)]
+        self.release(claim)
+
+    def release(self, claim: str) -> None:
+        with self._lock:
+            for entry in self._entries.values():
+                if entry[2] == claim:
+                    entry[2] = None
+
+    def size(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+class SqliteAnswerStore:
+    def __init__(self, path: str) -> None:
+        self.path = path
+        with closing(self._connect()) as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+        with self._transaction() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS buffered_answers ("
+                " attempt_id INTEGER NOT NULL,"
+                " question_id INTEGER NOT NULL,"
+                " selected_option TEXT NOT NULL,"
+                " seq INTEGER NOT NULL,"
+                " claim TEXT,"
+                " claimed_at REAL,"
+                " PRIMARY KEY (attempt_id, question_id))"
+            )
+            # A single counter row, so ``seq`` keeps increasing after the rows
+            # holding the highest values are deleted.
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS buffer_seq"
+                " (id INTEGER PRIMARY KEY CHECK (id = 1), value INTEGER NOT NULL)"
+            )
+            connection.execute("INSERT OR IGNORE INTO buffer_seq (id, value) VALUES (1, 0)")
+
+    def _connect(self) -> sqlite3.Connection:
+        # Autocommit mode, so ``_transaction`` controls BEGIN itself.
+        return sqlite3.connect(self.path, timeout=10, isolation_level=None)
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Hold the file's write lock from the first read, so read-then-write steps are atomic."""
+        with closing(self._connect()) as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield connection
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+
+    def add(self, attempt_id: int, answers: dict[int, str]) -> None:
+        with self._transaction() as connection:
+            last_seq = connection.execute("SELECT value FROM buffer_seq WHERE id = 1").fetchone()[0]
+            connection.executemany(
+                "INSERT INTO buffered_answers (attempt_id, question_id, selected_option, seq)"
+                " VALUES (?, ?, ?, ?)"
+                " ON CONFLICT (attempt_id, question_id) DO UPDATE SET"
+                " selected_option = excluded.selected_option, seq = excluded.seq",
+                [
+                    (attempt_id, question_id, option, last_seq + offset)
+                    for offset, (question_id, option) in enumerate(answers.items(), start=1)
+                ],
+            )
+            connection.execute(
+                "UPDATE buffer_seq SET value = ? WHERE id = 1", (last_seq + len(answers),)
+            )
+
+    def pending(self, attempt_id: int | None = None) -> list[BufferedAnswer]:
+        query = "SELECT attempt_id, question_id, selected_option, seq FROM buffered_answers"
+        with closing(self._connect()) as connection:
+            if attempt_id is None:
+                return connection.execute(query).fetchall()
+            return connection.execute(f"{query} WHERE attempt_id = ?", (attempt_id,)).fetchall()
+
+    def claim(self, attempt_id: int | None = None) -> tuple[str, list[BufferedAnswer]]:
+        claim = uuid.uuid4().hex
+        now = time.time()
+        condition = "(claim IS NULL OR claimed_at < ?)"
+        params: tuple = (now - CLAIM_TIMEOUT_SECONDS,)
+        if attempt_id is not None:
+            condition += " AND attempt_id = ?"
+            params += (attempt_id,)
+        with self._transaction() as connection:
+            connection.execute(
+                f"UPDATE buffered_answers SET claim = ?, claimed_at = ? WHERE {condition}",
+                (claim, now, *params),
+            )
+            entries = connection.execute(
+                "SELECT attempt_id, question_id, selected_option, seq FROM buffered_answers"
+                " WHERE claim = ?",
+                (claim,),
+            ).fetchall()
+        return claim, entries
+
+    def ack(self, claim: str, entries: Iterable[BufferedAnswer]) -> None:
+        with self._transaction() as connection:
+            connection.executemany(
+                "DELETE FROM buffered_answers WHERE attempt_id = ? AND question_id = ? AND seq = ?",
+                [(attempt_id, question_id, seq) for attempt_id, question_id, _, seq in entries],
+            )
+            connection.execute(
+                "UPDATE buffered_answers SET claim = NULL, claimed_at = NULL WHERE claim = ?",
+                (claim,),
+            )
+
+    def release(self, claim: str) -> None:
+        with self._transaction() as connection:
+            connection.execute(
+                "UPDATE buffered_answers SET claim = NULL, claimed_at = NULL WHERE claim = ?",
+                (claim,),
+            )
+
+    def size(self) -> int:
+        with closing(self._connect()) as connection:
+            return connection.execute("SELECT count(*) FROM buffered_answers").fetchone()[0]
+
+
+class AutosaveBuffer:
+    def __init__(
+        self,
+        store: AnswerStore,
+        *,
+        enabled: bool,
+        flush_interval: float,
+        session_factory: Callable[[], Session] = SessionLocal,
+    ) -> None:
+        self.store = store
+        self.enabled = enabled
+        self.flush_interval = flush_interval
+        self.session_factory = session_factory
+        self._stats_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self.flushes = 0
+        self.flush_failures = 0
+        self.flushed_answers = 0
+        self.discarded_answers = 0
+        self.last_flush_seconds = 0.0
+        self.max_flush_seconds = 0.0
+
+    def add(self, attempt_id: int, answers: dict[int, str]) -> None:
+        self.store.add(attempt_id, answers)
+
+    def pending_answers(self, attempt_id: int) -> dict[int, str]:
+        return {question_id: option for _, question_id, option, _ in self.store.pending(attempt_id)}
+
+    def flush(self, attempt_id: int | None = None) -> int:
+        """Write buffered answers (all, or one attempt's) to the database.
+
+        For one attempt, also waits until flushes elsewhere have committed its
+        answers, so a submit grades everything buffered before it.
+        """
+        written = 0
+        while True:
+            claim, entries = self.store.claim(attempt_id)
+            if entries:
+                written += self._write(claim, entries)
+            if attempt_id is None or not self.store.pending(attempt_id):
+                return written
+            if not entries:
+                time.sleep(CLAIM_POLL_SECONDS)
+
+    def _write(self, claim: str, entries: list[BufferedAnswer]) -> int:
+        started = perf_counter()
+        try:
+            with self.session_factory() as db:
+                open_attempts = set(
+                    db.scalars(
+                        select(ExamAttempt.id).where(
+                            ExamAttempt.id.in_({entry[0] for entry in entries}),
+                            ExamAttempt.status == AttemptStatus.in_progress,
+                        )
+                    )
+                )
+                written = upsert_answers(
+                    db,
+                    (
+                        (entry_attempt, question_id, option)
+                        for entry_attempt, question_id, option, _ in entries
+                        if entry_attempt in open_attempts
+                    ),
+                )
+                db.commit()
+        except Exception:
+            self.store.release(claim)
+            with self._stats_lock:
+                self.flush_failures += 1
+            raise
+        self.store.ack(claim, entries)
+        elapsed = perf_counter() - started
+        with self._stats_lock:
+            self.flushes += 1
+            self.flushed_answers += written
+            self.discarded_answers += len(entries) - written
+            self.last_flush_seconds = elapsed
+            self.max_flush_seconds = max(self.max_flush_seconds, elapsed)
+        return written
+
+    def start(self) -> None:
+        if not self.enabled or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="autosave-flush", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        self.flush()
+
+    def stats(self) -> dict[str, int | float | bool]:
+        return {
+            "enabled": self.enabled,
+            "buffered": self.store.size(),
+            "flushes": self.flushes,
+            "flush_failures": self.flush_failures,
+            "flushed_answers": self.flushed_answers,
+            "discarded_answers": self.discarded_answers,
+            "last_flush_ms": round(self.last_flush_seconds * 1000, 2),
+            "max_flush_ms": round(self.max_flush_seconds * 1000, 2),
+        }
+
+    def _run(self) -> None:
+        # Flush immediately on start-up to recover anything a crashed process
+        # left in a shared store.
+        while True:
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Autosave flush failed; answers stay buffered for the next run")
+            if self._stop.wait(self.flush_interval):
+                return
+
+
+def _build_store(path: str) -> AnswerStore:
+    return SqliteAnswerStore(path) if path else MemoryAnswerStore()
+
+
+_settings = get_settings()
+autosave_buffer = AutosaveBuffer(
+    _build_store(_settings.autosave_buffer_path),
+    enabled=_settings.autosave_write_behind,
+    flush_interval=_settings.autosave_flush_interval_seconds,
+)
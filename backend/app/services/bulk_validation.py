@@ -0,0 +1,116 @@
+"""Conflict detection for bulk student creation.
+
+Shared by ``POST /admin/students/bulk`` and the streamed roster import. In-batch
+duplicates are found in one pass with first-seen maps. Existing accounts are
+then found with chunked ``IN`` lookups, or, for very large batches, by loading
+the batch keys into a temporary table and joining against ``portal_users``, so
+no single statement carries an unbounded parameter list.
+"""
+
+import uuid
+from collections.abc import Iterable, Sequence
+from dataclasses import asdict, dataclass
+
+from sqlalchemy import Column, MetaData, String, Table, insert, select
+from sqlalchemy.orm import Session
+
+from app.models.user import User
+
+DUPLICATE_IN_BATCH = "duplicate_in_batch"
+ALREADY_EXISTS = "already_exists"
+LOOKUP_CHUNK_SIZE = 1000
+TEMP_TABLE_THRESHOLD = 20000
+
+
+@dataclass(frozen=True)
+class RowConflict:
+    row: int
+    field: str
+    value: str
+    reason: str
+    first_row: int | None = None
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+def find_student_conflicts(
+    db: Session,
+    rows: Sequence[tuple[int, str, str]],
+    *,
+    temp_table_threshold: int = TEMP_TABLE_THRESHOLD,
+) -> list[RowConflict]:
+    """Return every conflict for ``(row, username, email)`` triples.
+
+    Later occurrences of a username/email are reported against the row that
+    first used it; rows clashing with stored accounts are reported once per
+    field. The result is ordered by row.
+    """
+    conflicts: list[RowConflict] = []
+    first_username: dict[str, int] = {}
+    first_email: dict[str, int] = {}
+    for row, username, email in rows:
+        for field, value, seen in (("username", username, first_username), ("email", email, first_email)):
+            first = seen.setdefault(value, row)
+            if first != row:
+                conflicts.append(RowConflict(row, field, value, DUPLICATE_IN_BATCH, first))
+
+    if len(rows) > temp_table_threshold:
+        taken_usernames, taken_emails = _existing_via_temp_table(db, first_username, first_email)
+    else:
+        taken_usernames = _existing_values(db, User.username, first_username)
+        taken_emails = _existing_values(db, User.email, first_email)
+
+    for row, username, email in rows:
+        if username in taken_usernames:
+            conflicts.append(RowConflict(row, "username", username, ALREADY_EXISTS))
+        if email in taken_emails:
+            conflicts.append(RowConflict(row, "email", email, ALREADY_EXISTS))
+
+    conflicts.sort(key=lambda conflict: conflict.row)
+    return conflicts
+
+
+def _existing_values(db: Session, column, values: Iterable[str]) -> set[str]:
+    values = list(values)
+    taken: set[str] = set()
+    for start in range(0, len(values), LOOKUP_CHUNK_SIZE):
+        chunk = values[start : start + LOOKUP_CHUNK_SIZE]
+        taken.update(db.scalars(select(column).where(column.in_(chunk))))
+    return taken
+
+
+def _existing_via_temp_table(
+    db: Session,
+    usernames: Iterable[str],
+    emails: Iterable[str],
+) -> tuple[set[str], set[str]]:
+    keys = Table(
+        f"tmp_roster_keys_{uuid.uuid4().hex[:12]}",
+        MetaData(),
+        Column("kind", String(8), nullable=False),
+        Column("value", String(255), nullable=False),
+        prefixes=["TEMPORARY"],
+        postgresql_on_commit="DROP",
+    )
+    connection = db.connection()
+    keys.create(connection)
+    connection.execute(
+        insert(keys),
+        [{"kind": "username", "value": value} for value in usernames]
+        + [{"kind": "email", "value": value} for value in emails],
+    )
+    taken_usernames = set(
+        connection.scalars(
+            select(User.username).join(
+                keys, (keys.c.kind == "username") & (keys.c.value == User.username)
+            )
+        )
+    )
+    taken_emails = set(
+        connection.scalars(
+            select(User.email).join(keys, (keys.c.kind == "email") & (keys.c.value == User.email))
+        )
+    )
+    keys.drop(connection)
+    return taken_usernames, taken_emails
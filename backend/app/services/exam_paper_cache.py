@@ -0,0 +1,64 @@
+"""Per-process cache of the student-facing question paper for each exam.
+
+Every student who starts the same exam receives the same question list, so the
+list is loaded and serialised once and reused. Entries are keyed by
+``(exam_id, Exam.version)``: any change to an exam's questions must bump
+``Exam.version`` (see ``bump_exam_version``), which makes stale entries miss in
+every process without coordination. Deleting an exam drops its entry locally;
+other processes simply never ask for it again and it ages out of the LRU.
+
+The cached payload is built from ``QuestionRead`` and therefore never contains
+``correct_option``.
+"""
+
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from app.config.base import get_settings
+from app.models.exam import Exam, ExamQuestion
+from app.schemas.exam import QuestionRead
+from app.utils.cache import TtlLruCache
+
+
+@dataclass(frozen=True)
+class ExamPaper:
+    version: int
+    questions: tuple[dict[str, Any], ...]
+    question_ids: tuple[int, ...]
+    total_marks: int
+
+
+def get_exam_paper(db: Session, exam: Exam) -> ExamPaper:
+    """Return the cached paper for the exam's current version, loading it on a miss."""
+    paper = exam_paper_cache.get(exam.id, valid=lambda cached: cached.version == exam.version)
+    if paper is None:
+        epoch = exam_paper_cache.epoch
+        paper = _load_paper(db, exam)
+        exam_paper_cache.put(exam.id, paper, epoch=epoch)
+    return paper
+
+
+def bump_exam_version(db: Session, exam_id: int) -> None:
+    """Mark an exam's questions as changed. The caller is responsible for commit."""
+    db.execute(update(Exam).where(Exam.id == exam_id).values(version=Exam.version + 1))
+    exam_paper_cache.invalidate(exam_id)
+
+
+def _load_paper(db: Session, exam: Exam) -> ExamPaper:
+    questions = db.scalars(
+        select(ExamQuestion).where(ExamQuestion.exam_id == exam.id).order_by(ExamQuestion.id)
+    ).all()
+    return ExamPaper(
+        version=exam.version,
+        questions=tuple(QuestionRead.model_validate(question).model_dump() for question in questions),
+        question_ids=tuple(question.id for question in questions),
+        total_marks=sum(question.marks for question in questions),
+    )
+
+
+exam_paper_cache: TtlLruCache[int, ExamPaper] = TtlLruCache(
+    max_entries=get_settings().exam_paper_cache_max_entries
+)
@@ -0,0 +1,149 @@
+"""Set-based grading of exam attempts.
+
+``grade_attempts`` marks every answer of the given attempts with one
+``UPDATE attempt_answers ... FROM exam_questions`` statement, totals score and
+available marks per attempt with one aggregate query, and writes the results
+back to ``exam_attempts`` in a single executemany. The number of statements
+does not depend on how many questions an exam has, and the same call re-grades
+already submitted attempts after an answer key correction; the
+``regrade_exam`` job (``run_exam_regrade``) walks an exam's submitted attempts
+in id-ordered chunks and commits each chunk together with its progress and
+the refreshed ``attempt_reports`` rows.
+"""
+
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import bindparam, case, func, select, update
+from sqlalchemy.orm import Session
+
+from app.models.exam import AttemptAnswer, AttemptStatus, ExamAssignment, ExamAttempt, ExamQuestion
+from app.models.job import BackgroundJob
+from app.services.analytics import refresh_exam_rollups
+from app.services.attempt_reports import build_attempt_reports, save_attempt_reports
+
+
+@dataclass(frozen=True)
+class GradedAttempt:
+    attempt_id: int
+    score: int
+    total_marks: int
+    percentage: float
+
+
+def grade_attempts(db: Session, attempt_ids: Sequence[int], **attempt_values: Any) -> list[GradedAttempt]:
+    """Grade ``attempt_ids`` and store the results. The caller is responsible for commit.
+
+    Answers to questions that are not part of the attempt's exam are left
+    ungraded. ``attempt_values`` are written to every attempt alongside its
+    score, e.g. ``status`` and ``submitted_at`` when submitting.
+    """
+    if not attempt_ids:
+        return []
+
+    is_correct = AttemptAnswer.selected_option == ExamQuestion.correct_option
+    db.execute(
+        update(AttemptAnswer)
+        .where(
+            AttemptAnswer.attempt_id.in_(attempt_ids),
+            ExamAttempt.id == AttemptAnswer.attempt_id,
+            ExamAssignment.id == ExamAttempt.assignment_id,
+            ExamQuestion.id == AttemptAnswer.question_id,
+            ExamQuestion.exam_id == ExamAssignment.exam_id,
+        )
+        .values(
+            is_correct=case((is_correct, True), else_=False),
+            marks_awarded=case((is_correct, ExamQuestion.marks), else_=0),
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+    score = (
+        select(func.coalesce(func.sum(AttemptAnswer.marks_awarded), 0))
+        .where(AttemptAnswer.attempt_id == ExamAttempt.id)
+        .scalar_subquery()
+    )
+    total_marks = (
+        select(func.coalesce(func.sum(ExamQuestion.marks), 0))
+        .where(ExamQuestion.exam_id == ExamAssignment.exam_id)
+        .scalar_subquery()
+    )
+    graded = [
+        GradedAttempt(
+            attempt_id=attempt_id,
+            score=attempt_score,
+            total_marks=attempt_total,
+            percentage=round((attempt_score / attempt_total) * 100, 2) if attempt_total else 0,
+        )
+        for attempt_id, attempt_score, attempt_total in db.execute(
+            select(ExamAttempt.id, score, total_marks)
+            .join(ExamAssignment, ExamAssignment.id == ExamAttempt.assignment_id)
+            .where(ExamAttempt.id.in_(attempt_ids))
+        )
+    ]
+
+    attempts = ExamAttempt.__table__
+    db.execute(
+        update(attempts)
+        .where(attempts.c.id == bindparam("graded_id"))
+        .values(
+            score=bindparam("score"),
+            total_marks=bindparam("total_marks"),
+            percentage=bindparam("percentage"),
+            **attempt_values,
+        ),
+        [
+            {
+                "graded_id": result.attempt_id,
+                "score": result.score,
+                "total_marks": result.total_marks,
+                "percentage": result.percentage,
+            }
+            for result in graded
+        ],
+    )
+    return graded
+
+
+def run_exam_regrade(db: Session, job: BackgroundJob, *, chunk_size: int) -> dict[str, Any]:
+    """Re-grade every submitted attempt of ``job.payload["exam_id"]``.
+
+    Progress is committed after each chunk, so a retried job resumes after the
+    last committed attempt id.
+    """
+    exam_id = job.payload["exam_id"]
+    submitted = (
+        select(ExamAttempt.id, ExamAttempt.score)
+        .join(ExamAssignment, ExamAssignment.id == ExamAttempt.assignment_id)
+        .where(ExamAssignment.exam_id == exam_id, ExamAttempt.status == AttemptStatus.submitted)
+    )
+    progress: dict[str, Any] = {"exam_id": exam_id, "processed": 0, "rescored": 0, "last_attempt_id": 0}
+    progress.update(job.result or {})
+    if "total_attempts" not in progress:
+        progress["total_attempts"] = db.scalar(select(func.count()).select_from(submitted.subquery()))
+
+    while True:
+        previous_scores = dict(
+            db.execute(
+                submitted.where(ExamAttempt.id > progress["last_attempt_id"])
+                .order_by(ExamAttempt.id)
+                .limit(chunk_size)
+            ).all()
+        )
+        if not previous_scores:
+            break
+        graded = grade_attempts(db, list(previous_scores))
+        # Stored reports show the score, so they are replaced in the same commit.
+        save_attempt_reports(db, build_attempt_reports(db, list(previous_scores)).values())
+        progress["processed"] += len(graded)
+        progress["rescored"] += sum(
+            1 for result in graded if result.score != previous_scores[result.attempt_id]
+        )
+        progress["last_attempt_id"] = max(previous_scores)
+        job.result = dict(progress)
+        db.commit()
+
+    refresh_exam_rollups(db, [exam_id])
+    db.commit()
+    return progress
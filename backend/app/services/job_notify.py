@@ -0,0 +1,68 @@
+"""Wake idle workers when a job is enqueued, via PostgreSQL LISTEN/NOTIFY.
+
+``enqueue_job`` calls ``notify_job_enqueued`` in the enqueuing transaction;
+PostgreSQL delivers the notification only once that transaction commits, so a
+woken worker always finds the job. Idle workers block in ``JobWakeup.wait`` on
+a dedicated listening connection instead of polling, which removes the idle
+query load and the polling delay.
+
+On other databases (SQLite in tests and local runs) notifying is a no-op and
+``wait`` simply sleeps, so the worker falls back to polling.
+"""
+
+import logging
+import time
+
+from sqlalchemy import func, select
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+JOB_CHANNEL = "background_jobs"
+# Pause before re-establishing a listening connection that failed.
+RECONNECT_DELAY_SECONDS = 1.0
+
+
+def notify_job_enqueued(db: Session, job_type: str) -> None:
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(select(func.pg_notify(JOB_CHANNEL, job_type)))
+
+
+class JobWakeup:
+    """Blocks an idle worker until a job is enqueued or the timeout passes."""
+
+    def __init__(self, database_url: str) -> None:
+        url = make_url(database_url)
+        self.listening = url.get_backend_name() == "postgresql"
+        self._conninfo = url.set(drivername="postgresql").render_as_string(hide_password=False)
+        self._connection = None
+
+    def wait(self, timeout: float) -> bool:
+        """Return ``True`` when woken by a notification, ``False`` on timeout."""
+        if not self.listening:
+            time.sleep(timeout)
+            return False
+
+        import psycopg
+
+        try:
+            if self._connection is None:
+                self._connection = psycopg.connect(self._conninfo, autocommit=True)
+                self._connection.execute(f"LISTEN {JOB_CHANNEL}")
+                # A job enqueued before LISTEN took effect sent its notification
+                # to nobody, so look for work once more before blocking.
+                return True
+            for _ in self._connection.notifies(timeout=timeout, stop_after=1):
+                return True
+            return False
+        except psycopg.Error:
+            logger.exception("Job notification listener failed; reconnecting")
+            self.close()
+            time.sleep(min(timeout, RECONNECT_DELAY_SECONDS))
+            return False
+
+    def close(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
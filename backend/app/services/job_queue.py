@@ -1,21 +1,48 @@
 import logging
-import time
-from datetime import UTC, datetime
+import random
+from collections.abc import Collection, Iterable
+from datetime import UTC, datetime, timedelta
+from email.message import EmailMessage
 from typing import Any
 
-from sqlalchemy import select
-from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
 
+from app.config.base import get_settings
 from app.extensions.db import SessionLocal
-from app.extensions.mail import send_assignment_email, send_password_reset_email
-from app.models.exam import AttemptAnswer, ExamAssignment, ExamAttempt
+from app.extensions.mail import (
+    build_assignment_email,
+    build_password_reset_email,
+    smtp_session,
+)
+from app.models.exam import Exam, ExamAssignment
 from app.models.job import BackgroundJob, JobStatus
+from app.models.user import User
+from app.services.attempt_reports import build_attempt_reports, save_attempt_reports
+from app.services.grading import run_exam_regrade
+from app.services.job_notify import notify_job_enqueued
+from app.services.job_retention import archive_finished_jobs
+from app.services.roster_import import delete_staged_rows, run_student_import
 
 logger = logging.getLogger(__name__)
 
+ARCHIVE_JOBS_JOB = "archive_jobs"
 ASSIGNMENT_EMAIL_JOB = "assignment_email"
+ASSIGNMENT_EMAIL_BATCH_JOB = "assignment_email_batch"
 ATTEMPT_REPORT_JOB = "attempt_report"
+IMPORT_STUDENTS_JOB = "import_students"
 PASSWORD_RESET_EMAIL_JOB = "password_reset_email"
+REGRADE_EXAM_JOB = "regrade_exam"
+# Single-message email jobs, which the worker sends in batches.
+EMAIL_JOB_TYPES = (ASSIGNMENT_EMAIL_JOB, PASSWORD_RESET_EMAIL_JOB)
+
+
+class PartialBatchError(RuntimeError):
+    """A batch job finished part of its work; ``payload`` describes what is left to retry."""
+
+    def __init__(self, message: str, payload: dict[str, Any]) -> None:
+        super().__init__(message)
+        self.payload = payload
 
 
 def enqueue_job(
@@ -28,6 +55,7 @@ def enqueue_job(
     job = BackgroundJob(job_type=job_type, payload=payload, max_attempts=max_attempts)
     db.add(job)
     db.flush()
+    notify_job_enqueued(db, job_type)
     logger.info("Queued background job %s type=%s", job.id, job.job_type)
     return job
 
@@ -50,10 +78,43 @@ def enqueue_assignment_email(
     )
 
 
+def enqueue_assignment_emails(db: Session, assignment_ids: list[int]) -> list[BackgroundJob]:
+    """Queue notification emails for many assignments, one job per batch.
+
+    The payload holds assignment ids only; recipients and exam titles are read
+    when the job runs, so assignments deleted in the meantime are skipped.
+    """
+    batch_size = get_settings().assignment_email_batch_size
+    return [
+        enqueue_job(db, ASSIGNMENT_EMAIL_BATCH_JOB, {"assignment_ids": batch})
+        for batch in (
+            assignment_ids[start : start + batch_size] for start in range(0, len(assignment_ids), batch_size)
+        )
+    ]
+
+
 def enqueue_attempt_report(db: Session, *, attempt_id: int) -> BackgroundJob:
     return enqueue_job(db, ATTEMPT_REPORT_JOB, {"attempt_id": attempt_id})
 
 
+def enqueue_student_import(
+    db: Session,
+    *,
+    upload_id: str,
+    total_rows: int,
+    requested_by_id: int,
+) -> BackgroundJob:
+    return enqueue_job(
+        db,
+        IMPORT_STUDENTS_JOB,
+        {"upload_id": upload_id, "total_rows": total_rows, "requested_by_id": requested_by_id},
+    )
+
+
+def enqueue_exam_regrade(db: Session, *, exam_id: int, requested_by_id: int) -> BackgroundJob:
+    return enqueue_job(db, REGRADE_EXAM_JOB, {"exam_id": exam_id, "requested_by_id": requested_by_id})
+
+
 def enqueue_password_reset_email(
     db: Session,
     *,
@@ -67,118 +128,352 @@ def enqueue_password_reset_email(
     )
 
 
-def claim_next_job(db: Session) -> BackgroundJob | None:
+def schedule_job_archive(db: Session) -> BackgroundJob | None:
+    """Queue an ``archive_jobs`` run unless one is already queued or running."""
+    pending = db.scalar(
+        select(BackgroundJob.id)
+        .where(
+            BackgroundJob.job_type == ARCHIVE_JOBS_JOB,
+            BackgroundJob.status.in_([JobStatus.queued, JobStatus.running]),
+        )
+        .limit(1)
+    )
+    if pending is not None:
+        return None
+    return enqueue_job(db, ARCHIVE_JOBS_JOB, {}, max_attempts=1)
+
+
+def claim_jobs(
+    db: Session,
+    limit: int,
+    job_types: Collection[str] | None = None,
+    *,
+    exclude_types: Collection[str] = (),
+) -> list[BackgroundJob]:
+    """Claim up to ``limit`` due jobs, oldest first, in one statement.
+
+    ``UPDATE ... WHERE id IN (SELECT ... FOR UPDATE SKIP LOCKED LIMIT n)
+    RETURNING *`` marks the whole batch running and loads it in a single round
+    trip, and concurrent workers skip each other's locked rows instead of
+    waiting on them.
+    """
     now = datetime.now(UTC)
-    job = db.scalar(
-        select(BackgroundJob)
+    lease_expires_at = now + timedelta(seconds=get_settings().job_lease_seconds)
+    eligible = (
+        select(BackgroundJob.id)
         .where(
             BackgroundJob.status == JobStatus.queued,
             BackgroundJob.available_at <= now,
         )
         .order_by(BackgroundJob.created_at, BackgroundJob.id)
         .with_for_update(skip_locked=True)
-        .limit(1)
+        .limit(limit)
     )
-    if job is None:
-        return None
+    if job_types is not None:
+        eligible = eligible.where(BackgroundJob.job_type.in_(job_types))
+    if exclude_types:
+        eligible = eligible.where(BackgroundJob.job_type.not_in(exclude_types))
+    claimed = db.scalars(
+        update(BackgroundJob)
+        .where(BackgroundJob.id.in_(eligible))
+        .values(
+            status=JobStatus.running,
+            attempts=BackgroundJob.attempts + 1,
+            started_at=now,
+            lease_expires_at=lease_expires_at,
+            error=None,
+        )
+        .returning(BackgroundJob),
+        execution_options={"synchronize_session": False, "populate_existing": True},
+    ).all()
+    # The returned rows are exactly what is being committed, so keep them
+    # loaded rather than letting the commit expire them into one SELECT each.
+    expire_on_commit, db.expire_on_commit = db.expire_on_commit, False
+    try:
+        db.commit()
+    finally:
+        db.expire_on_commit = expire_on_commit
+    # RETURNING does not preserve the subquery's order.
+    return sorted(claimed, key=lambda job: (job.created_at, job.id))
+
 
-    job.status = JobStatus.running
-    job.attempts += 1
-    job.started_at = now
-    job.error = None
+def release_jobs(db: Session, job_ids: Collection[int]) -> int:
+    """Return claimed jobs that never started to the queue, undoing the claim."""
+    released = db.execute(
+        update(BackgroundJob)
+        .where(BackgroundJob.id.in_(job_ids), BackgroundJob.status == JobStatus.running)
+        .values(
+            status=JobStatus.queued,
+            attempts=BackgroundJob.attempts - 1,
+            started_at=None,
+            lease_expires_at=None,
+        )
+    ).rowcount
     db.commit()
-    db.refresh(job)
-    return job
+    return released
+
+
+def renew_leases(db: Session, job_ids: Collection[int]) -> None:
+    """Extend the leases of jobs this worker still holds."""
+    lease_expires_at = datetime.now(UTC) + timedelta(seconds=get_settings().job_lease_seconds)
+    db.execute(
+        update(BackgroundJob)
+        .where(BackgroundJob.id.in_(job_ids), BackgroundJob.status == JobStatus.running)
+        .values(lease_expires_at=lease_expires_at)
+    )
+    db.commit()
+
+
+def requeue_expired_jobs(db: Session) -> int:
+    """Recover running jobs whose worker stopped renewing their lease.
+
+    Jobs with attempts left go back to the queue at once; the rest are failed,
+    as a job that keeps killing its worker would otherwise never stop.
+    """
+    now = datetime.now(UTC)
+    expired = (
+        BackgroundJob.status == JobStatus.running,
+        BackgroundJob.lease_expires_at < now,
+    )
+    error = "Lease expired: the worker running this job stopped responding"
+    failed_jobs = db.execute(
+        update(BackgroundJob)
+        .where(*expired, BackgroundJob.attempts >= BackgroundJob.max_attempts)
+        .values(status=JobStatus.failed, lease_expires_at=None, error=error)
+        .returning(BackgroundJob.job_type, BackgroundJob.payload)
+    ).all()
+    _discard_staged_imports(db, failed_jobs)
+    failed = len(failed_jobs)
+    requeued = db.execute(
+        update(BackgroundJob)
+        .where(*expired)
+        .values(status=JobStatus.queued, lease_expires_at=None, available_at=now, error=error)
+    ).rowcount
+    db.commit()
+    if failed or requeued:
+        logger.warning("Recovered jobs with expired leases: %s requeued, %s failed", requeued, failed)
+    return failed + requeued
+
+
+def retry_delay(attempts: int) -> float:
+    """Seconds to wait before retrying a job that has failed ``attempts`` times.
+
+    Doubles from ``JOB_RETRY_BASE_SECONDS`` up to ``JOB_RETRY_MAX_SECONDS``,
+    randomized over the upper half of that window so jobs that failed together
+    (a mail server outage) do not all retry at the same moment.
+    """
+    settings = get_settings()
+    exponential = settings.job_retry_base_seconds * 2 ** min(attempts - 1, 32)
+    ceiling = min(settings.job_retry_max_seconds, exponential)
+    return random.uniform(ceiling / 2, ceiling)
 
 
 def process_job(db: Session, job: BackgroundJob) -> None:
     try:
         result = _dispatch_job(db, job)
     except Exception as exc:
+        # Drop whatever the job wrote since its last commit (half a regrade
+        # chunk, or a session broken by a database error) before recording
+        # the failure against the job's committed state.
+        db.rollback()
+        db.refresh(job)
         logger.exception("Background job %s failed", job.id)
-        job.error = str(exc)
-        job.status = JobStatus.failed if job.attempts >= job.max_attempts else JobStatus.queued
+        if isinstance(exc, PartialBatchError):
+            # Set after the rollback so the retry skips the work already done.
+            job.payload = exc.payload
+        _fail_job(job, exc)
+        if job.status == JobStatus.failed:
+            _discard_staged_imports(db, [job])
         db.commit()
         return
 
+    _complete_job(job, result)
+    db.commit()
+
+
+def process_email_jobs(db: Session, jobs: list[BackgroundJob]) -> None:
+    """Send single-message email jobs together over one SMTP connection."""
+    messages = {}
+    for job in jobs:
+        try:
+            messages[job.id] = _email_message(job)
+        except Exception as exc:
+            logger.exception("Background job %s failed", job.id)
+            _fail_job(job, exc)
+    outcomes = dict(zip(messages, smtp_session.send_batch(list(messages.values())).errors, strict=True))
+    for job in jobs:
+        if job.id not in outcomes:
+            continue
+        if outcomes[job.id] is None:
+            _complete_job(job, {"sent": True, "batch_size": len(messages)})
+        else:
+            _fail_job(job, outcomes[job.id])
+    db.commit()
+
+
+def process_report_jobs(db: Session, jobs: list[BackgroundJob]) -> None:
+    """Generate and store the reports for a batch of ``attempt_report`` jobs."""
+    try:
+        reports = build_attempt_reports(db, [int(job.payload["attempt_id"]) for job in jobs])
+        report_ids = save_attempt_reports(db, reports.values())
+    except Exception as exc:
+        logger.exception("Report batch of %s jobs failed", len(jobs))
+        db.rollback()
+        for job in jobs:
+            _fail_job(job, exc)
+        db.commit()
+        return
+    for job in jobs:
+        attempt_id = int(job.payload["attempt_id"])
+        if attempt_id in report_ids:
+            _complete_job(job, {"attempt_id": attempt_id, "report_id": report_ids[attempt_id]})
+        else:
+            _fail_job(job, ValueError(f"Attempt {attempt_id} not found"))
+    db.commit()
+
+
+def _discard_staged_imports(db: Session, jobs: Iterable[Any]) -> None:
+    """Delete the staged rows, plaintext passwords included, of import jobs that failed for good."""
+    delete_staged_rows(
+        db, [job.payload["upload_id"] for job in jobs if job.job_type == IMPORT_STUDENTS_JOB]
+    )
+
+
+def _complete_job(job: BackgroundJob, result: dict[str, Any] | None) -> None:
     job.result = result or {}
     job.status = JobStatus.completed
     job.completed_at = datetime.now(UTC)
-    db.commit()
+    job.lease_expires_at = None
     logger.info("Completed background job %s type=%s", job.id, job.job_type)
 
 
+def _fail_job(job: BackgroundJob, error: Exception) -> None:
+    job.error = str(error)
+    job.lease_expires_at = None
+    if job.attempts >= job.max_attempts:
+        job.status = JobStatus.failed
+        return
+    job.status = JobStatus.queued
+    job.available_at = datetime.now(UTC) + timedelta(seconds=retry_delay(job.attempts))
+
+
+def claim_tasks(
+    db: Session,
+    limit: int,
+    *,
+    exclude_types: Collection[str] = (),
+) -> list[list[BackgroundJob]]:
+    """Claim up to ``limit`` units of work: one job, or a batch of batchable jobs.
+
+    Email and report jobs are grouped by type and each group is topped up to its
+    batch size, so a batch shares one SMTP connection or one report query and
+    counts as a single unit.
+    """
+    tasks: list[list[BackgroundJob]] = []
+    batches: dict[str, list[BackgroundJob]] = {}
+    for job in claim_jobs(db, limit, exclude_types=exclude_types):
+        if _batch_size(job.job_type) > 1:
+            batches.setdefault(job.job_type, []).append(job)
+        else:
+            tasks.append([job])
+    for job_type, jobs in batches.items():
+        batch_size = _batch_size(job_type)
+        if len(jobs) % batch_size:
+            jobs.extend(claim_jobs(db, batch_size - len(jobs) % batch_size, [job_type]))
+        tasks.extend(jobs[start : start + batch_size] for start in range(0, len(jobs), batch_size))
+    return tasks
+
+
+def _batch_size(job_type: str) -> int:
+    settings = get_settings()
+    if job_type in EMAIL_JOB_TYPES:
+        return settings.smtp_batch_size
+    if job_type == ATTEMPT_REPORT_JOB:
+        return settings.attempt_report_batch_size
+    return 1
+
+
+def run_task(db: Session, jobs: list[BackgroundJob]) -> None:
+    if jobs[0].job_type in EMAIL_JOB_TYPES:
+        process_email_jobs(db, jobs)
+    elif jobs[0].job_type == ATTEMPT_REPORT_JOB:
+        process_report_jobs(db, jobs)
+    else:
+        process_job(db, jobs[0])
+
+
 def process_one_job() -> bool:
     with SessionLocal() as db:
-        job = claim_next_job(db)
-        if job is None:
+        tasks = claim_tasks(db, 1)
+        if not tasks:
             return False
-        process_job(db, job)
+        run_task(db, tasks[0])
         return True
 
 
-def run_worker(*, poll_interval: float = 2.0) -> None:
-    # Schema is owned by migrations (the `migrate` service / entrypoint), so the
-    # worker no longer creates tables. It tolerates transient DB errors while the
-    # migration/seed steps finish coming up.
-    logger.info("Background worker started")
-    while True:
-        try:
-            did_work = process_one_job()
-        except Exception:
-            logger.exception("Worker iteration failed; backing off before retry")
-            did_work = False
-        if not did_work:
-            time.sleep(poll_interval)
-
-
-def _dispatch_job(db: Session, job: BackgroundJob) -> dict[str, Any]:
+def _email_message(job: BackgroundJob) -> EmailMessage:
     if job.job_type == ASSIGNMENT_EMAIL_JOB:
-        send_assignment_email(
+        return build_assignment_email(
             job.payload["recipient_email"],
             job.payload["student_name"],
             job.payload["exam_title"],
         )
-        return {"sent": True}
+    return build_password_reset_email(job.payload["recipient_email"], job.payload["reset_token"])
 
-    if job.job_type == ATTEMPT_REPORT_JOB:
-        return _generate_attempt_report(db, int(job.payload["attempt_id"]))
 
-    if job.job_type == PASSWORD_RESET_EMAIL_JOB:
-        send_password_reset_email(
-            job.payload["recipient_email"],
-            job.payload["reset_token"],
-        )
+def _dispatch_job(db: Session, job: BackgroundJob) -> dict[str, Any]:
+    if job.job_type in EMAIL_JOB_TYPES:
+        smtp_session.send(_email_message(job))
         return {"sent": True}
 
+    if job.job_type == ASSIGNMENT_EMAIL_BATCH_JOB:
+        return _send_assignment_emails(db, job)
+
+    if job.job_type == IMPORT_STUDENTS_JOB:
+        return run_student_import(db, job, chunk_size=get_settings().student_import_chunk_size)
+
+    if job.job_type == REGRADE_EXAM_JOB:
+        return run_exam_regrade(db, job, chunk_size=get_settings().regrade_chunk_size)
+
+    if job.job_type == ARCHIVE_JOBS_JOB:
+        return archive_jobs(db)
+
     raise ValueError(f"Unsupported background job type: {job.job_type}")
 
 
-def _generate_attempt_report(db: Session, attempt_id: int) -> dict[str, Any]:
-    attempt = db.scalar(
-        select(ExamAttempt)
-        .where(ExamAttempt.id == attempt_id)
-        .options(
-            selectinload(ExamAttempt.student),
-            selectinload(ExamAttempt.assignment).selectinload(ExamAssignment.exam),
-            selectinload(ExamAttempt.answers).selectinload(AttemptAnswer.question),
-        )
+def archive_jobs(db: Session) -> dict[str, Any]:
+    settings = get_settings()
+    return archive_finished_jobs(
+        db,
+        retention_days=settings.job_retention_days,
+        batch_size=settings.job_archive_batch_size,
     )
-    if attempt is None:
-        raise ValueError(f"Attempt {attempt_id} not found")
 
-    answered = len([answer for answer in attempt.answers if answer.selected_option])
-    correct = len([answer for answer in attempt.answers if answer.is_correct])
+
+def _send_assignment_emails(db: Session, job: BackgroundJob) -> dict[str, Any]:
+    assignment_ids = [int(item) for item in job.payload["assignment_ids"]]
+    recipients = db.execute(
+        select(ExamAssignment.id, User.email, User.full_name, Exam.title)
+        .select_from(ExamAssignment)
+        .join(User, User.id == ExamAssignment.student_id)
+        .join(Exam, Exam.id == ExamAssignment.exam_id)
+        .where(ExamAssignment.id.in_(assignment_ids))
+        .order_by(ExamAssignment.id)
+    ).all()
+    batch = smtp_session.send_batch(
+        [build_assignment_email(email, name, exam_title) for _, email, name, exam_title in recipients]
+    )
+    failed = [row.id for row, error in zip(recipients, batch.errors, strict=True) if error is not None]
+    if failed:
+        # Retry only the emails that did not go out.
+        first_error = next(error for error in batch.errors if error is not None)
+        raise PartialBatchError(
+            f"{len(failed)} of {len(recipients)} assignment emails failed: {first_error}",
+            {**job.payload, "assignment_ids": failed},
+        )
     return {
-        "attempt_id": attempt.id,
-        "student_id": attempt.student_id,
-        "student_name": attempt.student.full_name,
-        "exam_id": attempt.assignment.exam_id,
-        "exam_title": attempt.assignment.exam.title,
-        "score": attempt.score,
-        "total_marks": attempt.total_marks,
-        "percentage": float(attempt.percentage),
-        "answered_questions": answered,
-        "correct_answers": correct,
-        "submitted_at": attempt.submitted_at.isoformat() if attempt.submitted_at else None,
+        "sent": len(recipients),
+        "skipped": len(assignment_ids) - len(recipients),
+        "reconnects": batch.reconnects,
+        "seconds": round(batch.seconds, 4),
     }
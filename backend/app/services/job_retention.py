@@ -0,0 +1,75 @@
+"""Move finished background jobs out of the queue table.
+
+Completed and failed jobs used to stay in ``background_jobs`` forever, payloads
+and results included, so the table the worker claims from kept growing. The
+``archive_jobs`` job moves those older than ``JOB_RETENTION_DAYS`` to
+``background_jobs_archive``. It works in batches of ``JOB_ARCHIVE_BATCH_SIZE``
+rows, each an ``INSERT ... SELECT`` and a ``DELETE`` committed together, so it
+never holds locks on many rows at once and a failed run loses nothing.
+
+The worker enqueues the job every ``JOB_ARCHIVE_INTERVAL_SECONDS``; it can also
+be run by hand with ``python -m app.cli archive-jobs``.
+"""
+
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+
+from app.models.job import ArchivedBackgroundJob, BackgroundJob, JobStatus
+
+FINISHED_STATUSES = (JobStatus.completed, JobStatus.failed)
+ARCHIVED_COLUMNS = (
+    "id",
+    "job_type",
+    "status",
+    "payload",
+    "result",
+    "error",
+    "attempts",
+    "max_attempts",
+    "started_at",
+    "completed_at",
+    "created_at",
+    "updated_at",
+)
+
+
+def archive_finished_jobs(
+    db: Session,
+    *,
+    retention_days: int,
+    batch_size: int,
+) -> dict[str, int]:
+    """Archive jobs that finished more than ``retention_days`` ago, one batch per commit."""
+    cutoff = datetime.now(UTC) - timedelta(days=retention_days)
+    # Finished jobs are mostly the oldest ids, so walking the primary key finds
+    # a batch quickly without another index on the queue table.
+    candidates = (
+        select(BackgroundJob.id)
+        .where(
+            BackgroundJob.status.in_(FINISHED_STATUSES),
+            BackgroundJob.updated_at < cutoff,
+        )
+        .order_by(BackgroundJob.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    source_columns = [getattr(BackgroundJob, name) for name in ARCHIVED_COLUMNS]
+
+    archived = batches = 0
+    while job_ids := db.scalars(candidates).all():
+        db.execute(
+            insert(ArchivedBackgroundJob).from_select(
+                ARCHIVED_COLUMNS,
+                select(*source_columns).where(BackgroundJob.id.in_(job_ids)),
+            )
+        )
+        db.execute(
+            delete(BackgroundJob).where(BackgroundJob.id.in_(job_ids)),
+            execution_options={"synchronize_session": False},
+        )
+        db.commit()
+        archived += len(job_ids)
+        batches += 1
+    return {"archived": archived, "batches": batches, "retention_days": retention_days}
@@ -0,0 +1,191 @@
+"""Bounded executor for PBKDF2 password hashing.
+
+``hash_password``/``verify_password`` spend ~100ms of CPU each. Running them
+inline in request handlers lets a burst of logins occupy every API thread, so
+auth routes submit them here instead. Work runs in a small process pool (PBKDF2
+is pure CPU, so processes also sidestep the GIL) and admission is capped at
+``workers + queue_size`` outstanding calls. Past that, callers get
+``PasswordHashingBusyError`` immediately, which the app maps to a 503, rather
+than queueing without bound.
+
+A slot is held until the hash itself finishes, not until the caller stops
+waiting: a call that times out keeps its slot while its process is still busy,
+so CPU use never exceeds what the limit allows.
+
+Bulk imports use ``hash_many``, which runs on a second pool of
+``bulk_workers`` processes (``PASSWORD_HASH_BULK_WORKERS``, default
+``os.cpu_count()``) outside the admission limit. An import of thousands of
+students then uses every core instead of the two login workers, and never
+takes a slot a login is waiting for.
+
+Setting ``PASSWORD_HASH_WORKERS=0`` hashes inline in the calling thread while
+keeping the same admission limit and metrics (used by the test suite);
+``PASSWORD_HASH_BULK_WORKERS=0`` does the same for ``hash_many``.
+"""
+
+import multiprocessing
+import os
+from collections.abc import Callable, Sequence
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from threading import BoundedSemaphore, Lock
+from time import perf_counter
+from typing import TypeVar
+
+from app.config.base import get_settings
+from app.utils.security import hash_password, verify_password
+
+T = TypeVar("T")
+
+
+class PasswordHashingBusyError(RuntimeError):
+    """Raised when the hashing executor has no free capacity."""
+
+
+class PasswordHasher:
+    def __init__(
+        self,
+        *,
+        workers: int,
+        queue_size: int,
+        timeout_seconds: float,
+        bulk_workers: int | None = None,
+    ) -> None:
+        self.workers = workers
+        self.bulk_workers = (os.cpu_count() or 1) if bulk_workers is None else bulk_workers
+        self.capacity = max(workers, 1) + queue_size
+        self.timeout_seconds = timeout_seconds
+        self._slots = BoundedSemaphore(self.capacity)
+        self._executor: Executor | None = None
+        self._bulk_executor: Executor | None = None
+        self._executor_lock = Lock()
+        self._stats_lock = Lock()
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self._latency_total = 0.0
+        self.max_latency = 0.0
+        self.bulk_hashed = 0
+        self.bulk_seconds = 0.0
+
+    def hash(self, password: str) -> str:
+        return self._run(hash_password, password)
+
+    def verify(self, password: str, password_hash: str) -> bool:
+        return self._run(verify_password, password, password_hash)
+
+    def hash_many(self, passwords: Sequence[str]) -> list[str]:
+        """Hash a batch of passwords on the bulk pool, preserving input order."""
+        started = perf_counter()
+        if self.bulk_workers > 0:
+            # Chunking keeps the per-call pickling overhead small next to the hashes.
+            chunksize = max(len(passwords) // (self.bulk_workers * 4), 1)
+            hashes = list(self._get_bulk_executor().map(hash_password, passwords, chunksize=chunksize))
+        else:
+            hashes = [hash_password(password) for password in passwords]
+        with self._stats_lock:
+            self.bulk_hashed += len(hashes)
+            self.bulk_seconds += perf_counter() - started
+        return hashes
+
+    def shutdown(self) -> None:
+        with self._executor_lock:
+            for executor in (self._executor, self._bulk_executor):
+                if executor is not None:
+                    executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = self._bulk_executor = None
+
+    def stats(self) -> dict[str, int | float]:
+        with self._stats_lock:
+            return {
+                "workers": self.workers,
+                "bulk_workers": self.bulk_workers,
+                "capacity": self.capacity,
+                "in_flight": self.in_flight,
+                "queue_depth": max(self.in_flight - max(self.workers, 1), 0),
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "timed_out": self.timed_out,
+                "avg_latency_ms": round(self._latency_total / self.completed * 1000, 2)
+                if self.completed
+                else 0.0,
+                "max_latency_ms": round(self.max_latency * 1000, 2),
+                "bulk_hashed": self.bulk_hashed,
+                "bulk_seconds": round(self.bulk_seconds, 3),
+            }
+
+    def _run(self, fn: Callable[..., T], *args: str) -> T:
+        if not self._slots.acquire(blocking=False):
+            with self._stats_lock:
+                self.rejected += 1
+            raise PasswordHashingBusyError("Password hashing capacity exhausted")
+
+        with self._stats_lock:
+            self.in_flight += 1
+        started = perf_counter()
+        future = self._submit(fn, *args)
+        try:
+            result = future.result(timeout=self.timeout_seconds)
+        except FutureTimeoutError as exc:
+            # Only a hash still waiting for a process can be cancelled; a
+            # running one keeps its slot until it finishes.
+            future.cancel()
+            with self._stats_lock:
+                self.timed_out += 1
+            raise PasswordHashingBusyError("Password hashing timed out") from exc
+        elapsed = perf_counter() - started
+        with self._stats_lock:
+            self.completed += 1
+            self._latency_total += elapsed
+            self.max_latency = max(self.max_latency, elapsed)
+        return result
+
+    def _submit(self, fn: Callable[..., T], *args: str) -> Future[T]:
+        """Run ``fn`` on the pool (or inline) and free the caller's slot once it finishes."""
+        if self.workers > 0:
+            try:
+                future = self._get_executor().submit(fn, *args)
+            except BaseException:
+                self._release()
+                raise
+        else:
+            future = Future()
+            try:
+                future.set_result(fn(*args))
+            except Exception as exc:
+                future.set_exception(exc)
+        future.add_done_callback(lambda _future: self._release())
+        return future
+
+    def _release(self) -> None:
+        with self._stats_lock:
+            self.in_flight -= 1
+        self._slots.release()
+
+    def _get_executor(self) -> Executor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = _process_pool(self.workers)
+            return self._executor
+
+    def _get_bulk_executor(self) -> Executor:
+        with self._executor_lock:
+            if self._bulk_executor is None:
+                self._bulk_executor = _process_pool(self.bulk_workers)
+            return self._bulk_executor
+
+
+def _process_pool(workers: int) -> Executor:
+    # API workers run threads, so start hashing processes with "spawn" rather
+    # than forking a multi-threaded parent.
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+_settings = get_settings()
+password_hasher = PasswordHasher(
+    workers=_settings.password_hash_workers,
+    queue_size=_settings.password_hash_queue_size,
+    timeout_seconds=_settings.password_hash_timeout_seconds,
+    bulk_workers=_settings.password_hash_bulk_workers,
+)
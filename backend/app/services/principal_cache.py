@@ -0,0 +1,50 @@
+"""Per-process cache of authenticated principals.
+
+``get_current_user`` runs on every authenticated request, so resolving the
+token's user from the database each time costs one round trip before the route
+even starts. This cache keeps a detached ``User`` snapshot per user id, carrying
+the ``token_version`` it was loaded at, so a lookup is only a hit when the
+presented token carries the same version.
+
+Routes that bump ``token_version`` or delete a user call ``invalidate`` after
+committing. The cache is per process, so other workers only observe such a
+change once their entry expires; ``principal_cache_ttl_seconds`` bounds that
+window and setting it to ``0`` disables the cache entirely.
+"""
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.config.base import get_settings
+from app.models.user import User
+from app.utils.cache import TtlLruCache
+
+
+def get_principal(user_id: int, token_version: int) -> User | None:
+    """Return the cached snapshot of the user if it was loaded at ``token_version``."""
+    return principal_cache.get(user_id, valid=lambda snapshot: snapshot.token_version == token_version)
+
+
+def put_principal(user: User, *, epoch: int) -> None:
+    if principal_cache.enabled:
+        principal_cache.put(user.id, _snapshot(user), epoch=epoch)
+
+
+def _snapshot(user: User) -> User:
+    """Copy the user's column state into a detached instance.
+
+    The copy is never attached to a session itself; callers ``merge`` it with
+    ``load=False`` so each request gets its own session-bound instance.
+    """
+    snapshot = User(
+        **{attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs}
+    )
+    make_transient_to_detached(snapshot)
+    return snapshot
+
+
+_settings = get_settings()
+principal_cache: TtlLruCache[int, User] = TtlLruCache(
+    max_entries=_settings.principal_cache_max_entries,
+    ttl_seconds=_settings.principal_cache_ttl_seconds,
+)
@@ -0,0 +1,199 @@
+"""Streaming student roster import.
+
+An upload is parsed line by line as it arrives and staged into
+``student_import_rows`` in fixed-size batches, so the API worker never holds
+more than one batch in memory. The ``import_students`` job then consumes the
+staged rows chunk by chunk: each chunk is validated, hashed, inserted and
+committed together with the job's progress, and its staged rows are deleted in
+the same transaction. A retried job therefore resumes after the last committed
+chunk.
+
+Staged rows contain plaintext passwords until their chunk is processed. The
+upload is removed if staging fails part way, and whatever is left of it when
+its job fails for good.
+"""
+
+import codecs
+import csv
+import json
+from collections.abc import AsyncIterator, Collection, Iterator
+from typing import Any
+
+from pydantic import ValidationError
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+
+from app.models.job import BackgroundJob, StudentImportRow
+from app.models.user import User, UserRole
+from app.schemas.user import UserCreate
+from app.services.bulk_validation import DUPLICATE_IN_BATCH, find_student_conflicts
+from app.services.password_hashing import password_hasher
+
+CSV_FORMAT = "csv"
+NDJSON_FORMAT = "ndjson"
+ROSTER_COLUMNS = ("full_name", "username", "email", "password")
+MAX_REPORTED_ERRORS = 1000
+
+
+class RosterFormatError(ValueError):
+    """Raised when an upload cannot be parsed as the declared format."""
+
+
+async def iter_lines(stream: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Yield decoded text lines from a byte stream without buffering it all."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    async for chunk in stream:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.rstrip("\r")
+
+
+class RowParser:
+    """Turns roster lines into ``(line_number, row)`` pairs for one format.
+
+    CSV input must start with a header naming at least ``ROSTER_COLUMNS``; each
+    record has to fit on a single line. NDJSON input is one JSON object per line.
+    """
+
+    def __init__(self, fmt: str) -> None:
+        self.fmt = fmt
+        self.line_number = 0
+        self._header: list[str] | None = None
+
+    def feed(self, line: str) -> Iterator[tuple[int, dict[str, Any]]]:
+        self.line_number += 1
+        if not line.strip():
+            return
+        if self.fmt == NDJSON_FORMAT:
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError:
+                row = {"_error": "Line is not valid JSON"}
+            if not isinstance(row, dict):
+                row = {"_error": "Line is not a JSON object"}
+            yield self.line_number, row
+            return
+
+        values = next(csv.reader([line]))
+        if self._header is None:
+            header = [value.strip().lower() for value in values]
+            missing = [column for column in ROSTER_COLUMNS if column not in header]
+            if missing:
+                raise RosterFormatError(f"CSV header is missing columns: {', '.join(missing)}")
+            self._header = header
+            return
+        if len(values) != len(self._header):
+            yield self.line_number, {"_error": "Wrong number of columns"}
+            return
+        yield self.line_number, dict(zip(self._header, values, strict=True))
+
+
+def stage_rows(db: Session, upload_id: str, rows: list[tuple[int, dict[str, Any]]]) -> None:
+    if not rows:
+        return
+    db.execute(
+        insert(StudentImportRow),
+        [{"upload_id": upload_id, "line_number": line, "data": data} for line, data in rows],
+    )
+    db.commit()
+
+
+def discard_upload(db: Session, upload_id: str) -> None:
+    db.rollback()
+    delete_staged_rows(db, [upload_id])
+    db.commit()
+
+
+def delete_staged_rows(db: Session, upload_ids: Collection[str]) -> None:
+    if upload_ids:
+        db.execute(delete(StudentImportRow).where(StudentImportRow.upload_id.in_(upload_ids)))
+
+
+def run_student_import(db: Session, job: BackgroundJob, *, chunk_size: int) -> dict[str, Any]:
+    upload_id = job.payload["upload_id"]
+    progress: dict[str, Any] = {
+        "total_rows": job.payload.get("total_rows", 0),
+        "processed": 0,
+        "created": 0,
+        "failed": 0,
+        "errors": [],
+        "errors_truncated": 0,
+        **(job.result or {}),
+    }
+
+    while True:
+        staged = db.scalars(
+            select(StudentImportRow)
+            .where(StudentImportRow.upload_id == upload_id)
+            .order_by(StudentImportRow.line_number)
+            .limit(chunk_size)
+        ).all()
+        if not staged:
+            break
+
+        created, errors = _import_chunk(db, [(row.line_number, row.data) for row in staged])
+        db.execute(delete(StudentImportRow).where(StudentImportRow.id.in_([row.id for row in staged])))
+
+        progress["processed"] += len(staged)
+        progress["created"] += created
+        progress["failed"] += len(errors)
+        room = MAX_REPORTED_ERRORS - len(progress["errors"])
+        progress["errors"] = progress["errors"] + errors[:room]
+        progress["errors_truncated"] += max(len(errors) - room, 0)
+        job.result = dict(progress)
+        db.commit()
+
+    return progress
+
+
+def _import_chunk(db: Session, rows: list[tuple[int, dict[str, Any]]]) -> tuple[int, list[dict]]:
+    errors: list[dict[str, Any]] = []
+    valid: dict[int, UserCreate] = {}
+    for line, data in rows:
+        if "_error" in data:
+            errors.append({"line": line, "error": data["_error"]})
+            continue
+        try:
+            valid[line] = UserCreate.model_validate(
+                {column: data.get(column) for column in ROSTER_COLUMNS}
+            )
+        except ValidationError as exc:
+            first = exc.errors()[0]
+            field = ".".join(str(part) for part in first["loc"])
+            errors.append({"line": line, "error": f"{field}: {first['msg']}"})
+
+    conflicts = find_student_conflicts(
+        db, [(line, student.username, student.email) for line, student in valid.items()]
+    )
+    for conflict in conflicts:
+        if valid.pop(conflict.row, None) is None:
+            continue
+        if conflict.reason == DUPLICATE_IN_BATCH:
+            message = f"Duplicate {conflict.field} of line {conflict.first_row}"
+        else:
+            message = f"{conflict.field.capitalize()} already exists"
+        errors.append({"line": conflict.row, "error": message})
+
+    students = list(valid.values())
+    if students:
+        password_hashes = password_hasher.hash_many([student.password for student in students])
+        db.execute(
+            insert(User),
+            [
+                {
+                    "full_name": student.full_name,
+                    "username": student.username,
+                    "email": student.email,
+                    "password_hash": password_hash,
+                    "role": UserRole.student,
+                }
+                for student, password_hash in zip(students, password_hashes, strict=True)
+            ],
+        )
+    errors.sort(key=lambda error: error["line"])
+    return len(students), errors
@@ -0,0 +1,117 @@
+"""A student's dashboard totals and assignment list, loaded together.
+
+``load_student_summary`` reads every assignment of a student with its exam and
+latest attempt in one query; the latest attempt comes from a ``row_number()``
+window over each assignment's attempts (the portable form of ``DISTINCT ON``).
+The dashboard totals are derived from the same rows, so ``/student/dashboard``
+and ``/student/assignments`` share one query.
+
+The summary can additionally be cached per student. Starting or submitting an
+attempt and admin changes to a student's assignments call ``invalidate`` after
+committing. The cache is per process and therefore off by default: enable it
+with ``STUDENT_SUMMARY_CACHE_MAX_ENTRIES`` and keep
+``STUDENT_SUMMARY_CACHE_TTL_SECONDS`` short, because other workers (and
+re-grading, which runs in the job worker) only become visible once an entry
+expires.
+"""
+
+from dataclasses import dataclass
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.config.base import get_settings
+from app.models.exam import AttemptStatus, Exam, ExamAssignment, ExamAttempt
+from app.schemas.exam import AssignmentStatusRead, StudentDashboard
+from app.utils.cache import TtlLruCache
+
+
+@dataclass(frozen=True)
+class StudentSummary:
+    dashboard: StudentDashboard
+    assignments: tuple[AssignmentStatusRead, ...]
+
+
+def get_student_summary(db: Session, student_id: int) -> StudentSummary:
+    summary = student_summary_cache.get(student_id)
+    if summary is None:
+        epoch = student_summary_cache.epoch
+        summary = load_student_summary(db, student_id)
+        student_summary_cache.put(student_id, summary, epoch=epoch)
+    return summary
+
+
+def load_student_summary(db: Session, student_id: int) -> StudentSummary:
+    # Rank each assignment's attempts newest first inside the join, so the
+    # latest-attempt pick is a filter on the joined rows rather than a second
+    # join against a materialised window.
+    ranked = (
+        select(
+            ExamAssignment.id.label("assignment_id"),
+            ExamAssignment.exam_id,
+            Exam.title,
+            Exam.duration_minutes,
+            ExamAssignment.assigned_at,
+            ExamAttempt.id.label("attempt_id"),
+            ExamAttempt.status,
+            ExamAttempt.score,
+            ExamAttempt.total_marks,
+            ExamAttempt.percentage,
+            func.row_number()
+            .over(partition_by=ExamAssignment.id, order_by=ExamAttempt.id.desc())
+            .label("position"),
+        )
+        .join(Exam, Exam.id == ExamAssignment.exam_id)
+        .outerjoin(ExamAttempt, ExamAttempt.assignment_id == ExamAssignment.id)
+        .where(ExamAssignment.student_id == student_id)
+        .subquery()
+    )
+    rows = db.execute(
+        select(*(column for column in ranked.c if column.name != "position"))
+        .where(ranked.c.position == 1)
+        .order_by(ranked.c.assignment_id.desc())
+    ).all()
+
+    assignments = tuple(
+        AssignmentStatusRead(
+            assignment_id=assignment_id,
+            exam_id=exam_id,
+            exam_title=title,
+            duration_minutes=duration_minutes,
+            assigned_at=assigned_at,
+            attempt_id=attempt_id,
+            status=attempt_status,
+            score=score,
+            total_marks=total_marks,
+            percentage=float(percentage) if percentage is not None else None,
+        )
+        for (
+            assignment_id,
+            exam_id,
+            title,
+            duration_minutes,
+            assigned_at,
+            attempt_id,
+            attempt_status,
+            score,
+            total_marks,
+            percentage,
+        ) in rows
+    )
+    scores = [item.percentage for item in assignments if item.status == AttemptStatus.submitted]
+    return StudentSummary(
+        dashboard=StudentDashboard(
+            assigned_exams=len(assignments),
+            completed_exams=len(scores),
+            pending_exams=len(assignments) - len(scores),
+            average_score=round(sum(scores) / len(scores), 2) if scores else 0,
+        ),
+        assignments=assignments,
+    )
+
+
+_settings = get_settings()
+student_summary_cache: TtlLruCache[int, StudentSummary] = TtlLruCache(
+    max_entries=_settings.student_summary_cache_max_entries,
+    ttl_seconds=_settings.student_summary_cache_ttl_seconds,
+)
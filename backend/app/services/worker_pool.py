@@ -0,0 +1,286 @@
+"""Run background jobs concurrently on a pool of worker threads.
+
+The dispatcher (the thread calling ``WorkerPool.run``) claims tasks from the
+queue and hands each to one of ``slots`` threads, which opens its own database
+session. Jobs spend their time on SMTP round trips and database queries, both
+of which release the GIL, so threads give the concurrency without the start-up
+and serialization cost of worker processes.
+
+``job_type_limits`` caps how many tasks of a type run at once (say one
+``regrade_exam``); the dispatcher skips capped types when claiming, so other
+jobs keep flowing past them. ``prefetch`` claims up to that many tasks ahead of
+a free slot, which saves a queue round trip between short jobs; prefetched
+tasks that have not started when the pool stops go back to the queue.
+
+Between claims the dispatcher also keeps the queue healthy: it renews the
+leases of the jobs it holds (every third of ``JOB_LEASE_SECONDS``), requeues
+jobs whose lease has run out because their worker died (every
+``JOB_REAPER_INTERVAL_SECONDS``) and queues an ``archive_jobs`` run (every
+``JOB_ARCHIVE_INTERVAL_SECONDS``). Each also runs on start-up.
+
+``stop`` (wired to SIGTERM and SIGINT by ``run_worker``) stops claiming, lets
+in-flight jobs finish and then returns from ``run``.
+"""
+
+import logging
+import signal
+import threading
+from collections import Counter, deque
+from collections.abc import Mapping
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from time import monotonic
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.config.base import get_settings
+from app.extensions.db import SessionLocal
+from app.extensions.mail import smtp_session
+from app.models.job import BackgroundJob
+from app.services.job_notify import JobWakeup
+from app.services.job_queue import (
+    claim_tasks,
+    release_jobs,
+    renew_leases,
+    requeue_expired_jobs,
+    run_task,
+    schedule_job_archive,
+)
+
+logger = logging.getLogger(__name__)
+
+# How long the listener blocks on the notification connection between checks
+# for shutdown; waiting costs no queries, so this only bounds stop latency.
+LISTEN_INTERVAL_SECONDS = 1.0
+
+
+@dataclass
+class _Task:
+    job_type: str
+    job_ids: list[int]
+
+
+class WorkerPool:
+    def __init__(
+        self,
+        *,
+        slots: int = 4,
+        job_type_limits: Mapping[str, int] | None = None,
+        prefetch: int = 0,
+        poll_interval: float = 2.0,
+        notify_fallback_interval: float = 30.0,
+    ) -> None:
+        if slots < 1:
+            raise ValueError("slots must be at least 1")
+        if prefetch < 0:
+            raise ValueError("prefetch cannot be negative")
+        self.slots = slots
+        self.job_type_limits = dict(job_type_limits or {})
+        self.prefetch = prefetch
+        self.poll_interval = poll_interval
+        self._wakeup = JobWakeup(get_settings().database_url)
+        self._idle_wait = notify_fallback_interval if self._wakeup.listening else poll_interval
+        self._executor = ThreadPoolExecutor(max_workers=slots, thread_name_prefix="job-worker")
+        self._running: dict[Future, _Task] = {}
+        self._prefetched: deque[_Task] = deque()
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._upkeep_due: dict[str, float] = {}
+        self.tasks_completed = 0
+        self.tasks_crashed = 0
+
+    def run(self) -> None:
+        """Dispatch jobs until ``stop`` is called, then drain in-flight work."""
+        listener = None
+        if self._wakeup.listening:
+            listener = threading.Thread(target=self._listen, name="job-listener", daemon=True)
+            listener.start()
+        logger.info(
+            "Background worker started: %s slots, prefetch %s, limits %s (%s)",
+            self.slots,
+            self.prefetch,
+            self.job_type_limits or "none",
+            "LISTEN/NOTIFY" if self._wakeup.listening else "polling",
+        )
+        try:
+            while not self._stopping.is_set():
+                self._wake.clear()
+                try:
+                    upkeep_wait = self._upkeep()
+                    progressed = self._fill()
+                except Exception:
+                    logger.exception("Dispatching jobs failed; backing off before retry")
+                    self._stopping.wait(self.poll_interval)
+                    continue
+                if not progressed:
+                    # Woken early by a finished task, a notification or ``stop``.
+                    self._wake.wait(min(self._idle_wait, upkeep_wait))
+        finally:
+            self._shutdown(listener)
+
+    def stop(self) -> None:
+        self._stopping.set()
+        self._wake.set()
+
+    def _upkeep(self) -> float:
+        """Run the periodic queue upkeep that is due; return seconds until more is."""
+        settings = get_settings()
+        schedule = {
+            "renew_leases": (settings.job_lease_seconds / 3, self._renew_leases),
+            "requeue_expired": (settings.job_reaper_interval_seconds, requeue_expired_jobs),
+            "schedule_archive": (settings.job_archive_interval_seconds, schedule_job_archive),
+        }
+        next_due = float("inf")
+        for name, (interval, action) in schedule.items():
+            if interval <= 0:
+                continue
+            if monotonic() >= self._upkeep_due.get(name, 0.0):
+                with SessionLocal() as db:
+                    action(db)
+                    db.commit()
+                self._upkeep_due[name] = monotonic() + interval
+            next_due = min(next_due, self._upkeep_due[name])
+        return max(next_due - monotonic(), 0.0)
+
+    def _renew_leases(self, db: Session) -> None:
+        job_ids = [job_id for task in [*self._running.values(), *self._prefetched] for job_id in task.job_ids]
+        if job_ids:
+            renew_leases(db, job_ids)
+
+    def _fill(self) -> bool:
+        """Start ready tasks and claim more while capacity remains."""
+        progressed = self._start_ready()
+        with SessionLocal() as db:
+            while not self._stopping.is_set():
+                capacity = self.slots + self.prefetch - len(self._running) - len(self._prefetched)
+                if capacity <= 0:
+                    break
+                tasks = claim_tasks(db, capacity, exclude_types=self._saturated_types())
+                if not tasks:
+                    break
+                self._accept(db, tasks)
+                progressed = True
+                self._start_ready()
+        return progressed
+
+    def _accept(self, db: Session, tasks: list[list[BackgroundJob]]) -> None:
+        """Queue claimed tasks, handing back any beyond a job type's limit."""
+        claimed = self._claimed_types()
+        excess = []
+        for jobs in tasks:
+            job_type = jobs[0].job_type
+            limit = self.job_type_limits.get(job_type)
+            if limit is not None and claimed[job_type] >= limit:
+                excess.extend(job.id for job in jobs)
+                continue
+            claimed[job_type] += 1
+            self._prefetched.append(_Task(job_type, [job.id for job in jobs]))
+        if excess:
+            # A batch claim can pick up more of a capped type than it may run.
+            release_jobs(db, excess)
+
+    def _start_ready(self) -> bool:
+        self._reap()
+        started = False
+        running_types = Counter(task.job_type for task in self._running.values())
+        for task in list(self._prefetched):
+            if len(self._running) >= self.slots:
+                break
+            if running_types[task.job_type] >= self.job_type_limits.get(task.job_type, self.slots):
+                continue
+            self._prefetched.remove(task)
+            future = self._executor.submit(self._execute, task)
+            self._running[future] = task
+            running_types[task.job_type] += 1
+            future.add_done_callback(lambda _: self._wake.set())
+            started = True
+        return started
+
+    def _claimed_types(self) -> Counter[str]:
+        return Counter(task.job_type for task in [*self._running.values(), *self._prefetched])
+
+    def _saturated_types(self) -> list[str]:
+        """Job types that already have as many tasks claimed as their limit allows."""
+        claimed = self._claimed_types()
+        return [job_type for job_type, limit in self.job_type_limits.items() if claimed[job_type] >= limit]
+
+    def _reap(self) -> None:
+        for future in [future for future in self._running if future.done()]:
+            task = self._running.pop(future)
+            if future.exception() is None:
+                self.tasks_completed += 1
+            else:
+                # Job failures are recorded on the job itself; this is the
+                # worker failing around it (lost database connection, ...).
+                self.tasks_crashed += 1
+                logger.error("Task for jobs %s crashed", task.job_ids, exc_info=future.exception())
+
+    @staticmethod
+    def _execute(task: _Task) -> None:
+        with SessionLocal() as db:
+            jobs = db.scalars(
+                select(BackgroundJob)
+                .where(BackgroundJob.id.in_(task.job_ids))
+                .order_by(BackgroundJob.created_at, BackgroundJob.id)
+            ).all()
+            run_task(db, list(jobs))
+
+    def _listen(self) -> None:
+        try:
+            while not self._stopping.is_set():
+                if self._wakeup.wait(LISTEN_INTERVAL_SECONDS):
+                    self._wake.set()
+        finally:
+            self._wakeup.close()
+
+    def _shutdown(self, listener: threading.Thread | None) -> None:
+        self._stopping.set()
+        if self._prefetched:
+            job_ids = [job_id for task in self._prefetched for job_id in task.job_ids]
+            with SessionLocal() as db:
+                released = release_jobs(db, job_ids)
+            self._prefetched.clear()
+            logger.info("Returned %s prefetched jobs to the queue", released)
+        if self._running:
+            logger.info("Waiting for %s in-flight tasks to finish", len(self._running))
+        self._executor.shutdown(wait=True)
+        self._reap()
+        if listener is not None:
+            listener.join()
+        smtp_session.close()
+        logger.info("Background worker stopped after %s tasks", self.tasks_completed)
+
+
+def run_worker(
+    *,
+    slots: int = 4,
+    job_type_limits: Mapping[str, int] | None = None,
+    prefetch: int = 0,
+    poll_interval: float = 2.0,
+    notify_fallback_interval: float = 30.0,
+) -> None:
+    """Process jobs until SIGTERM or SIGINT, then finish in-flight jobs and exit.
+
+    When idle, a PostgreSQL-backed worker waits on job notifications and only
+    polls every ``notify_fallback_interval`` seconds, which picks up jobs that
+    became due later (retries). Other databases poll every ``poll_interval``.
+    """
+    # Schema is owned by migrations (the `migrate` service / entrypoint), so the
+    # worker no longer creates tables. It tolerates transient DB errors while the
+    # migration/seed steps finish coming up.
+    pool = WorkerPool(
+        slots=slots,
+        job_type_limits=job_type_limits,
+        prefetch=prefetch,
+        poll_interval=poll_interval,
+        notify_fallback_interval=notify_fallback_interval,
+    )
+
+    def _request_stop(signum: int, _frame: object) -> None:
+        logger.info("Received %s; finishing in-flight jobs", signal.Signals(signum).name)
+        pool.stop()
+
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, _request_stop)
+    pool.run()
@@ -0,0 +1,106 @@
+"""Bounded per-process LRU cache with an optional per-entry TTL.
+
+Backs the principal, exam paper and student summary caches. Every entry is
+local to the process, so callers invalidate after committing and rely on the
+TTL (or a version check in ``get``) for changes made elsewhere.
+"""
+
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from math import inf
+from threading import Lock
+from time import monotonic
+from typing import Generic, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class TtlLruCache(Generic[K, V]):
+    """Bounded LRU cache, safe to share between threads.
+
+    ``ttl_seconds=None`` keeps entries until they are evicted or invalidated.
+    """
+
+    def __init__(self, *, max_entries: int, ttl_seconds: float | None = None) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[K, tuple[V, float]] = OrderedDict()
+        self._lock = Lock()
+        # Incremented on every invalidation. A loader records it before going to
+        # the database and passes it back to ``put`` so a value read before a
+        # concurrent invalidation is never cached after it.
+        self._epoch = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and (self.ttl_seconds is None or self.ttl_seconds > 0)
+
+    @property
+    def epoch(self) -> int:
+        return self._epoch
+
+    def get(self, key: K, *, valid: Callable[[V], bool] | None = None) -> V | None:
+        """Return the live entry for ``key``; ``valid`` can reject it (e.g. an older version)."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] <= monotonic():
+                del self._entries[key]
+                entry = None
+            if entry is None or (valid is not None and not valid(entry[0])):
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: K, value: V, *, epoch: int, ttl_seconds: float | None = None) -> None:
+        """Store ``value``; ``ttl_seconds`` overrides the cache's TTL for this entry."""
+        if not self.enabled:
+            return
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        now = monotonic()
+        expires_at = inf if ttl is None else now + ttl
+        with self._lock:
+            if epoch != self._epoch:
+                return
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            # Expired entries are otherwise only dropped when looked up again;
+            # sweep those at the least recently used end as new ones arrive.
+            while self._entries and next(iter(self._entries.values()))[1] <= now:
+                self._entries.popitem(last=False)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: K) -> None:
+        with self._lock:
+            self._epoch += 1
+            self.invalidations += 1
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._epoch += 1
+            self.invalidations += 1
+            self._entries.clear()
+
+    def stats(self) -> dict[str, int | float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
@@ -0,0 +1,122 @@
+"""Keyset (cursor) pagination for list endpoints.
+
+List endpoints take ``limit`` and ``after`` query parameters and keep returning
+a plain JSON array. When more rows exist, the response carries an
+``X-Next-Cursor`` header; passing it back as ``after`` continues from the last
+row. Pages are selected with ``(k1, k2, ...) < (:v1, :v2, ...)`` on the sort key
+(always ending in the primary key), so with a matching index page N costs the
+same as page 1.
+
+Cursors are opaque to clients: base64url-encoded JSON of the last row's key.
+"""
+
+import base64
+import binascii
+import json
+from collections.abc import Sequence
+from datetime import datetime
+from typing import Any
+
+from fastapi import HTTPException, Query, Response, status
+from sqlalchemy import DateTime, Select, func, select, tuple_
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import ColumnElement
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    payload = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, keys: Sequence[ColumnElement]) -> list[Any]:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(values, list) or len(values) != len(keys):
+            raise ValueError
+        return [_cursor_value(key, value) for key, value in zip(keys, values, strict=True)]
+    except (ValueError, TypeError, binascii.Error, UnicodeDecodeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor") from None
+
+
+def _cursor_value(key: ColumnElement, value: Any) -> Any:
+    """Check a decoded cursor value against its key column's Python type.
+
+    A tampered cursor must fail here with a 400, not later in the database.
+    """
+    if isinstance(key.type, DateTime):
+        if not isinstance(value, str):
+            raise TypeError
+        return datetime.fromisoformat(value)
+    python_type = key.type.python_type
+    if isinstance(value, bool) or not isinstance(value, python_type):
+        raise TypeError
+    return value
+
+
+def _bound_values(keys: Sequence[ColumnElement], cursor: str) -> list[Any]:
+    values = decode_cursor(cursor, keys)
+    unique_key, last_id = keys[-1], values[-1]
+    # A datetime read back into Python does not always compare equal to the
+    # stored value once bound again (SQLite keeps ``CURRENT_TIMESTAMP`` as text
+    # without microseconds), which would repeat rows at page boundaries. Compare
+    # against the stored value of the cursor row, falling back to the decoded
+    # value if that row has since been deleted.
+    return [
+        func.coalesce(select(key).where(unique_key == last_id).correlate(None).scalar_subquery(), value)
+        if isinstance(key.type, DateTime)
+        else value
+        for key, value in zip(keys, values, strict=True)
+    ]
+
+
+def date_range(column: ColumnElement, since: datetime | None, until: datetime | None) -> list[ColumnElement]:
+    """Conditions for an optional half-open ``[since, until)`` filter on ``column``."""
+    conditions = []
+    if since is not None:
+        conditions.append(column >= since)
+    if until is not None:
+        conditions.append(column < until)
+    return conditions
+
+
+class Pagination:
+    """Request dependency holding ``limit``/``after`` and the response to annotate."""
+
+    def __init__(
+        self,
+        response: Response,
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        after: str | None = Query(None, description="Cursor from a previous X-Next-Cursor header"),
+    ) -> None:
+        self.response = response
+        self.limit = limit
+        self.after = after
+
+    def page(self, db: Session, statement: Select, keys: Sequence[ColumnElement]) -> list[Any]:
+        """Run ``statement`` newest-first by ``keys`` and return one page.
+
+        ``keys`` must end with a unique column. Single-entity selects return
+        ORM objects; anything else returns rows, which must include ``keys``.
+        """
+        if self.after is not None:
+            statement = statement.where(tuple_(*keys) < tuple_(*_bound_values(keys, self.after)))
+        statement = statement.order_by(*(key.desc() for key in keys)).limit(self.limit + 1)
+
+        single_entity = len(statement.column_descriptions) == 1 and statement.column_descriptions[0].get(
+            "entity"
+        ) is not None
+        items = list(db.scalars(statement) if single_entity else db.execute(statement))
+        if len(items) > self.limit:
+            items = items[: self.limit]
+            last = items[-1]
+            values = (
+                [getattr(last, key.key) for key in keys]
+                if single_entity
+                else [last._mapping[key] for key in keys]
+            )
+            self.response.headers[NEXT_CURSOR_HEADER] = encode_cursor(values)
+        return items
@@ -6,11 +6,20 @@ import re
 import secrets
 from datetime import UTC, datetime, timedelta
 
-from app.config.base import get_settings
+from app.config.base import Settings, get_settings
+from app.utils.cache import TtlLruCache
 
 PASSWORD_MIN_LENGTH = 8
 PASSWORD_MAX_LENGTH = 72
 
+# Tokens whose signature has already been verified, keyed by SHA-256 of the
+# signing key and the token and holding the decoded payload. Rotating
+# ``AUTH_SECRET_KEY`` therefore misses every old entry. Each entry lives until
+# its token's ``exp``.
+_verified_tokens: TtlLruCache[bytes, dict] = TtlLruCache(
+    max_entries=get_settings().token_cache_max_entries
+)
+
 
 class PasswordPolicyError(ValueError):
     """Raised when a password does not satisfy the strength policy."""
@@ -101,14 +110,44 @@ def create_access_token(
 
 
 def decode_access_token(token: str) -> dict:
+    """Verify an access token and return its claims.
+
+    A token is HMAC-verified and JSON-decoded once; later calls with the same
+    token reuse the cached payload and only re-run the cheap claim checks.
+    """
     settings = get_settings()
+    key = hashlib.sha256(f"{settings.auth_secret_key}\0{token}".encode()).digest()
+    epoch = _verified_tokens.epoch
+    payload = _verified_tokens.get(key)
+    cached = payload is not None
+    if payload is None:
+        payload = _verify_signature(token, settings.auth_secret_key)
+
+    try:
+        _validate_claims(payload, settings)
+    except ValueError:
+        if cached:
+            _verified_tokens.invalidate(key)
+        raise
+
+    if not cached:
+        remaining = int(payload.get("exp", 0)) - datetime.now(UTC).timestamp()
+        _verified_tokens.put(key, payload, epoch=epoch, ttl_seconds=remaining)
+    return dict(payload)
+
+
+def clear_token_cache() -> None:
+    _verified_tokens.clear()
+
+
+def _verify_signature(token: str, secret_key: str) -> dict:
     try:
         body, signature = token.split(".", 1)
     except ValueError as exc:
         raise ValueError("Invalid token") from exc
 
     expected_signature = hmac.new(
-        settings.auth_secret_key.encode("utf-8"),
+        secret_key.encode("utf-8"),
         body.encode("utf-8"),
         hashlib.sha256,
     ).hexdigest()
@@ -116,7 +155,10 @@ def decode_access_token(token: str) -> dict:
         raise ValueError("Invalid token")
 
     padded_body = body + "=" * (-len(body) % 4)
-    payload = json.loads(base64.urlsafe_b64decode(padded_body.encode("utf-8")).decode("utf-8"))
+    return json.loads(base64.urlsafe_b64decode(padded_body.encode("utf-8")).decode("utf-8"))
+
+
+def _validate_claims(payload: dict, settings: Settings) -> None:
     now = int(datetime.now(UTC).timestamp())
     if int(payload.get("exp", 0)) < now:
         raise ValueError("Token expired")
@@ -126,4 +168,3 @@ def decode_access_token(token: str) -> dict:
         raise ValueError("Invalid token issuer")
     if payload.get("aud") != settings.auth_token_audience:
         raise ValueError("Invalid token audience")
-    return payload
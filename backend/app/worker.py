@@ -1,11 +1,27 @@
 import logging
 import os
 
-from app.services.job_queue import run_worker
+from app.services.worker_pool import run_worker
 
 logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"))
 
 
+def parse_job_type_limits(value: str) -> dict[str, int]:
+    """Parse ``WORKER_JOB_TYPE_LIMITS``, e.g. ``regrade_exam=1,import_students=2``."""
+    limits = {}
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        job_type, separator, limit = item.partition("=")
+        if not separator or not limit.strip().isdigit() or int(limit) < 1:
+            raise ValueError(f"Invalid WORKER_JOB_TYPE_LIMITS entry: {item!r}")
+        limits[job_type.strip()] = int(limit)
+    return limits
+
+
 if __name__ == "__main__":
-    poll_interval = float(os.getenv("WORKER_POLL_INTERVAL_SECONDS", "2"))
-    run_worker(poll_interval=poll_interval)
+    run_worker(
+        slots=int(os.getenv("WORKER_SLOTS", "4")),
+        job_type_limits=parse_job_type_limits(os.getenv("WORKER_JOB_TYPE_LIMITS", "")),
+        prefetch=int(os.getenv("WORKER_PREFETCH", "0")),
+        poll_interval=float(os.getenv("WORKER_POLL_INTERVAL_SECONDS", "2")),
+        notify_fallback_interval=float(os.getenv("WORKER_NOTIFY_FALLBACK_SECONDS", "30")),
+    )
@@ -0,0 +1,18 @@
+"""Stand-alone performance benchmarks.
+
+These are not collected by pytest. Run them from ``backend/``, for example::
+
+    python -m benchmarks.token_decode
+
+Unless ``DATABASE_URL`` is set, the package points the app at a throwaway
+SQLite database. That happens here, before any benchmark module imports
+``app``, because ``app.extensions.db`` binds its engine at import time.
+"""
+
+import os
+import tempfile
+
+if "DATABASE_URL" not in os.environ:
+    _fd, _path = tempfile.mkstemp(suffix=".sqlite")
+    os.environ["DATABASE_URL"] = f"sqlite+pysqlite:///{_path}"
+    os.environ.setdefault("ENVIRONMENT", "testing")
@@ -0,0 +1,127 @@
+"""Seeding helpers shared by the benchmarks."""
+
+import uuid
+
+from sqlalchemy import func, insert, select
+
+from app.extensions.db import SessionLocal, create_all
+from app.models.exam import AttemptAnswer, AttemptStatus, Exam, ExamAssignment, ExamAttempt, ExamQuestion
+from app.models.user import User, UserRole
+from app.utils.security import create_access_token
+
+SEED_BATCH = 5000
+
+# Benchmark users never log in, so a constant placeholder hash keeps seeding fast.
+PLACEHOLDER_HASH = "benchmark$0"
+
+
+def prepare_schema() -> None:
+    create_all()
+
+
+def create_user(role: UserRole = UserRole.student) -> User:
+    username = f"bench_{role.value}_{uuid.uuid4().hex[:10]}"
+    with SessionLocal() as db:
+        user = User(
+            full_name=f"Benchmark {role.value.title()}",
+            username=username,
+            email=f"{username}@example.com",
+            password_hash=PLACEHOLDER_HASH,
+            role=role,
+        )
+        db.add(user)
+        db.commit()
+        db.refresh(user)
+        db.expunge(user)
+        return user
+
+
+def create_students(count: int) -> list[int]:
+    """Insert ``count`` students in one statement and return their ids in order."""
+    prefix = f"bench_student_{uuid.uuid4().hex[:10]}"
+    with SessionLocal() as db:
+        ids = db.scalars(
+            insert(User).returning(User.id, sort_by_parameter_order=True),
+            [
+                {
+                    "full_name": f"Benchmark Student {index}",
+                    "username": f"{prefix}_{index}",
+                    "email": f"{prefix}_{index}@example.com",
+                    "password_hash": PLACEHOLDER_HASH,
+                    "role": UserRole.student,
+                }
+                for index in range(count)
+            ],
+        ).all()
+        db.commit()
+        return list(ids)
+
+
+def auth_headers(user: User) -> dict[str, str]:
+    token = create_access_token(user.id, user.username, user.role.value, user.token_version)
+    return {"Authorization": f"Bearer {token}"}
+
+
+def seed_submitted_attempts(attempt_count: int, question_count: int) -> tuple[int, list[int]]:
+    """Seed one exam with ``attempt_count`` submitted attempts, half its answers right.
+
+    Returns the exam id and its question ids.
+    """
+    # Each assignment needs its own student: (exam, student) pairs are unique.
+    student_ids = create_students(attempt_count)
+    with SessionLocal() as db:
+        exam = Exam(
+            title="Benchmark exam",
+            description="Synthetic exam",
+            duration_minutes=60,
+            questions=[
+                ExamQuestion(
+                    question_text=f"Question {index}",
+                    option_a="A",
+                    option_b="B",
+                    option_c="C",
+                    option_d="D",
+                    correct_option="A",
+                    marks=1,
+                )
+                for index in range(question_count)
+            ],
+        )
+        db.add(exam)
+        db.commit()
+        question_ids = [question.id for question in exam.questions]
+        first_id = (db.scalar(select(func.max(ExamAssignment.id))) or 0) + 1
+        first_attempt = (db.scalar(select(func.max(ExamAttempt.id))) or 0) + 1
+        for start in range(0, attempt_count, SEED_BATCH):
+            offsets = range(start, min(start + SEED_BATCH, attempt_count))
+            db.execute(
+                insert(ExamAssignment),
+                [{"id": first_id + i, "exam_id": exam.id, "student_id": student_ids[i]} for i in offsets],
+            )
+            db.execute(
+                insert(ExamAttempt),
+                [
+                    {
+                        "id": first_attempt + i,
+                        "assignment_id": first_id + i,
+                        "student_id": student_ids[i],
+                        "status": AttemptStatus.submitted,
+                        "total_marks": question_count,
+                    }
+                    for i in offsets
+                ],
+            )
+            db.execute(
+                insert(AttemptAnswer),
+                [
+                    {
+                        "attempt_id": first_attempt + i,
+                        "question_id": question_id,
+                        "selected_option": "AB"[(i + position) % 2],
+                    }
+                    for i in offsets
+                    for position, question_id in enumerate(question_ids)
+                ],
+            )
+            db.commit()
+        return exam.id, question_ids
@@ -0,0 +1,144 @@
+"""``/admin/analytics``: rollup read vs SQL aggregation vs loading every assignment.
+
+Seeds assignments spread over several exams (most with one attempt, some
+retaken, some never started), then times the original ORM implementation,
+``compute_admin_analytics`` and the rollup read the endpoint now serves, and
+reports peak Python memory for each.
+
+Usage:
+    python -m benchmarks.analytics [assignments] [exams]   # default: 200000 50
+"""
+
+import sys
+import tracemalloc
+from time import perf_counter
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import selectinload
+
+from app.models.exam import AttemptStatus, Exam, ExamAssignment, ExamAttempt
+from app.services.analytics import compute_admin_analytics, read_admin_analytics, rebuild_rollups
+from benchmarks._support import SessionLocal, create_students, prepare_schema
+
+SEED_BATCH = 10000
+
+
+def _seed(assignment_count: int, exam_count: int) -> None:
+    # Assignment i pairs exam i % exam_count with student i // exam_count, so
+    # every (exam, student) pair is distinct.
+    student_ids = create_students(-(-assignment_count // exam_count))
+    with SessionLocal() as db:
+        exams = [
+            Exam(title=f"Analytics benchmark {index}", description="Synthetic exam", duration_minutes=60)
+            for index in range(exam_count)
+        ]
+        db.add_all(exams)
+        db.commit()
+        exam_ids = [exam.id for exam in exams]
+        first_assignment = (db.scalar(select(func.max(ExamAssignment.id))) or 0) + 1
+        next_attempt = (db.scalar(select(func.max(ExamAttempt.id))) or 0) + 1
+        for start in range(0, assignment_count, SEED_BATCH):
+            offsets = range(start, min(start + SEED_BATCH, assignment_count))
+            db.execute(
+                insert(ExamAssignment),
+                [
+                    {
+                        "id": first_assignment + i,
+                        "exam_id": exam_ids[i % exam_count],
+                        "student_id": student_ids[i // exam_count],
+                    }
+                    for i in offsets
+                ],
+            )
+            attempts = []
+            for i in offsets:
+                if i % 10 < 2:  # never started
+                    continue
+                statuses = [AttemptStatus.submitted]
+                if i % 10 == 2:
+                    statuses = [AttemptStatus.in_progress]
+                elif i % 10 == 3:  # retaken: an older submitted attempt, then a new one in progress
+                    statuses = [AttemptStatus.submitted, AttemptStatus.in_progress]
+                for attempt_status in statuses:
+                    attempts.append(
+                        {
+                            "id": next_attempt,
+                            "assignment_id": first_assignment + i,
+                            "student_id": student_ids[i // exam_count],
+                            "status": attempt_status,
+                            "percentage": (i * 7) % 101,
+                        }
+                    )
+                    next_attempt += 1
+            db.execute(insert(ExamAttempt), attempts)
+            db.commit()
+
+
+def _legacy_analytics() -> None:
+    """The per-assignment part of the original endpoint, which dominated its cost."""
+    with SessionLocal() as db:
+        assignments = db.scalars(
+            select(ExamAssignment).options(
+                selectinload(ExamAssignment.exam),
+                selectinload(ExamAssignment.attempts),
+            )
+        ).all()
+        scores: list[float] = []
+        per_exam: dict[int, dict] = {}
+        for assignment in assignments:
+            latest = assignment.attempts[-1] if assignment.attempts else None
+            bucket = per_exam.setdefault(
+                assignment.exam_id, {"title": assignment.exam.title, "assignments": 0, "score_sum": 0.0}
+            )
+            bucket["assignments"] += 1
+            if latest is not None and latest.status == AttemptStatus.submitted:
+                scores.append(float(latest.percentage))
+                bucket["score_sum"] += float(latest.percentage)
+
+
+def _aggregated_analytics() -> None:
+    with SessionLocal() as db:
+        compute_admin_analytics(db)
+
+
+def _rollup_analytics() -> None:
+    with SessionLocal() as db:
+        read_admin_analytics(db)
+
+
+def _measure(run) -> tuple[float, float]:
+    tracemalloc.start()
+    started = perf_counter()
+    run()
+    elapsed = perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 1024 / 1024
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = argv if argv is not None else sys.argv[1:]
+    assignment_count = int(args[0]) if args else 200000
+    exam_count = int(args[1]) if len(args) > 1 else 50
+    prepare_schema()
+
+    started = perf_counter()
+    _seed(assignment_count, exam_count)
+    print(f"seeded {assignment_count} assignments over {exam_count} exams in {perf_counter() - started:.1f}s")
+
+    with SessionLocal() as db:
+        rebuild_rollups(db)
+        db.commit()
+
+    print(f"{'':18} {'seconds':>10} {'peak MiB':>10}")
+    for label, run in (
+        ("load assignments", _legacy_analytics),
+        ("SQL aggregation", _aggregated_analytics),
+        ("rollup read", _rollup_analytics),
+    ):
+        seconds, peak_mb = _measure(run)
+        print(f"{label:18} {seconds:10.3f} {peak_mb:10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Attempt reports when a whole class submits: per-job ORM loads vs batched jobs.
+
+Seeds one exam with submitted attempts and queues an ``attempt_report`` job for
+each, as ``submit_attempt`` does. The legacy path reproduces the original
+per-job generator: load the attempt with its student, exam, answers and every
+answer's question, then count in Python. The batched path is the worker's:
+claim up to ``ATTEMPT_REPORT_BATCH_SIZE`` report jobs per task and compute them
+with one aggregate query.
+
+Usage:
+    python -m benchmarks.attempt_reports [attempts] [questions]   # default: 500 50
+"""
+
+import sys
+from time import perf_counter
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import selectinload
+
+from app.models.exam import AttemptAnswer, ExamAssignment, ExamAttempt
+from app.models.job import BackgroundJob
+from app.services.job_queue import ATTEMPT_REPORT_JOB, process_one_job
+from benchmarks._support import SessionLocal, prepare_schema, seed_submitted_attempts
+
+
+def _attempt_ids(exam_id: int) -> list[int]:
+    with SessionLocal() as db:
+        return list(
+            db.scalars(
+                select(ExamAttempt.id)
+                .join(ExamAssignment, ExamAssignment.id == ExamAttempt.assignment_id)
+                .where(ExamAssignment.exam_id == exam_id)
+                .order_by(ExamAttempt.id)
+            )
+        )
+
+
+def _legacy_reports(attempt_ids: list[int]) -> None:
+    for attempt_id in attempt_ids:
+        with SessionLocal() as db:
+            attempt = db.scalar(
+                select(ExamAttempt)
+                .where(ExamAttempt.id == attempt_id)
+                .options(
+                    selectinload(ExamAttempt.student),
+                    selectinload(ExamAttempt.assignment).selectinload(ExamAssignment.exam),
+                    selectinload(ExamAttempt.answers).selectinload(AttemptAnswer.question),
+                )
+            )
+            answered = len([answer for answer in attempt.answers if answer.selected_option])
+            correct = len([answer for answer in attempt.answers if answer.is_correct])
+            assert answered >= correct
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = argv if argv is not None else sys.argv[1:]
+    attempt_count = int(args[0]) if args else 500
+    question_count = int(args[1]) if len(args) > 1 else 50
+    prepare_schema()
+
+    started = perf_counter()
+    exam_id, _ = seed_submitted_attempts(attempt_count, question_count)
+    attempt_ids = _attempt_ids(exam_id)
+    print(f"seeded {attempt_count} attempts x {question_count} answers in {perf_counter() - started:.1f}s")
+
+    started = perf_counter()
+    _legacy_reports(attempt_ids)
+    legacy_seconds = perf_counter() - started
+
+    report_jobs = [
+        {"job_type": ATTEMPT_REPORT_JOB, "payload": {"attempt_id": attempt_id}} for attempt_id in attempt_ids
+    ]
+    with SessionLocal() as db:
+        db.execute(insert(BackgroundJob), report_jobs)
+        db.commit()
+    started = perf_counter()
+    tasks = 0
+    while process_one_job():
+        tasks += 1
+    batched_seconds = perf_counter() - started
+
+    print(f"per-job ORM loads:  {legacy_seconds:8.2f}s ({attempt_count / legacy_seconds:.0f} reports/s)")
+    print(f"batched report jobs: {batched_seconds:7.2f}s ({attempt_count / batched_seconds:.0f} reports/s, "
+          f"{tasks} tasks, queue claims and acks included)")
+    print(f"speed-up:            {legacy_seconds / batched_seconds:7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
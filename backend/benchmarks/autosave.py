@@ -0,0 +1,113 @@
+"""Autosave throughput for one attempt: legacy full-state save vs delta upsert.
+
+The legacy path reproduces the original ``PUT /answers`` handler: load the
+attempt with its exam, questions and answers, merge the full answer map the
+client sends, commit, then reload every answer for the response. The delta
+path is what ``PATCH /answers`` runs: one validation query and one
+``INSERT ... ON CONFLICT`` for the changed answer.
+
+Usage:
+    python -m benchmarks.autosave [questions] [saves]   # default: 100 500
+"""
+
+import sys
+from time import perf_counter
+
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+
+from app.models.exam import AttemptAnswer, Exam, ExamAssignment, ExamAttempt, ExamQuestion
+from app.modules.student.routes import _check_autosave_target
+from app.services.answers import upsert_answers
+from benchmarks._support import SessionLocal, create_user, prepare_schema
+
+
+def _seed_attempt(question_count: int) -> tuple[int, int, list[int]]:
+    student = create_user()
+    with SessionLocal() as db:
+        exam = Exam(
+            title="Autosave benchmark",
+            description="Synthetic exam",
+            duration_minutes=60,
+            questions=[
+                ExamQuestion(
+                    question_text=f"Question {index}",
+                    option_a="A",
+                    option_b="B",
+                    option_c="C",
+                    option_d="D",
+                    correct_option="A",
+                    marks=1,
+                )
+                for index in range(question_count)
+            ],
+        )
+        assignment = ExamAssignment(exam=exam, student_id=student.id)
+        attempt = ExamAttempt(assignment=assignment, student_id=student.id, total_marks=question_count)
+        db.add_all([exam, assignment, attempt])
+        db.commit()
+        return student.id, attempt.id, [question.id for question in exam.questions]
+
+
+def _legacy_save(attempt_id: int, answers: dict[int, str]) -> None:
+    with SessionLocal() as db:
+        attempt = db.scalar(
+            select(ExamAttempt)
+            .where(ExamAttempt.id == attempt_id)
+            .options(
+                selectinload(ExamAttempt.assignment)
+                .selectinload(ExamAssignment.exam)
+                .selectinload(Exam.questions),
+                selectinload(ExamAttempt.answers),
+            )
+        )
+        valid_question_ids = {question.id for question in attempt.assignment.exam.questions}
+        assert set(answers) <= valid_question_ids
+        existing = {answer.question_id: answer for answer in attempt.answers}
+        for question_id, option in answers.items():
+            if question_id in existing:
+                existing[question_id].selected_option = option
+            else:
+                db.add(AttemptAnswer(attempt_id=attempt_id, question_id=question_id, selected_option=option))
+        db.commit()
+        # The legacy handler reloaded and serialised every answer for its response.
+        _ = db.scalar(
+            select(ExamAttempt).where(ExamAttempt.id == attempt_id).options(selectinload(ExamAttempt.answers))
+        ).answers
+
+
+def _delta_save(student_id: int, attempt_id: int, question_id: int, option: str) -> None:
+    with SessionLocal() as db:
+        _check_autosave_target(db, attempt_id, student_id, {question_id})
+        upsert_answers(db, [(attempt_id, question_id, option)])
+        db.commit()
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = argv if argv is not None else sys.argv[1:]
+    question_count = int(args[0]) if args else 100
+    saves = int(args[1]) if len(args) > 1 else 500
+    prepare_schema()
+
+    _, legacy_attempt, question_ids = _seed_attempt(question_count)
+    answers: dict[int, str] = {}
+    started = perf_counter()
+    for index in range(saves):
+        answers[question_ids[index % question_count]] = "ABCD"[index % 4]
+        _legacy_save(legacy_attempt, dict(answers))
+    legacy_seconds = perf_counter() - started
+
+    student_id, delta_attempt, question_ids = _seed_attempt(question_count)
+    started = perf_counter()
+    for index in range(saves):
+        _delta_save(student_id, delta_attempt, question_ids[index % question_count], "ABCD"[index % 4])
+    delta_seconds = perf_counter() - started
+
+    print(f"questions per exam: {question_count}, saves per attempt: {saves}")
+    print(f"legacy full-state save: {saves / legacy_seconds:8.1f} saves/s")
+    print(f"delta upsert save:      {saves / delta_seconds:8.1f} saves/s")
+    print(f"speed-up:               {legacy_seconds / delta_seconds:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Wall time of ``POST /admin/students/bulk`` for synthetic rosters.
+
+Runs the real endpoint in-process against ``DATABASE_URL`` (a throwaway SQLite
+file when unset) and reports total time and the share spent hashing.
+
+Usage:
+    python -m benchmarks.bulk_import [size ...]   # default: 1000 5000 10000
+"""
+
+import sys
+import uuid
+from time import perf_counter
+
+from benchmarks._support import auth_headers, create_user
+
+
+def main(argv: list[str] | None = None) -> None:
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+    from app.models.user import UserRole
+    from app.services.password_hashing import password_hasher
+
+    args = argv if argv is not None else sys.argv[1:]
+    sizes = [int(arg) for arg in args] or [1000, 5000, 10000]
+
+    with TestClient(app) as client:
+        headers = auth_headers(create_user(UserRole.admin))
+        print(f"{'students':>10} {'total s':>10} {'hashing s':>10} {'rows/s':>10}")
+        for size in sizes:
+            batch = uuid.uuid4().hex[:6]
+            users = [
+                {
+                    "full_name": f"Synthetic Student {index}",
+                    "username": f"syn_{batch}_{index}",
+                    "email": f"syn_{batch}_{index}@example.com",
+                    "password": f"SynthPass{index}",
+                }
+                for index in range(size)
+            ]
+            hashing_before = password_hasher.bulk_seconds
+            started = perf_counter()
+            response = client.post(
+                "/api/v1/admin/students/bulk", headers=headers, json={"users": users}
+            )
+            elapsed = perf_counter() - started
+            response.raise_for_status()
+            hashing = password_hasher.bulk_seconds - hashing_before
+            print(f"{size:>10} {elapsed:>10.2f} {hashing:>10.2f} {size / elapsed:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
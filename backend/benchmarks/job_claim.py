@@ -0,0 +1,124 @@
+"""Draining a backlog of email jobs: one-at-a-time claims vs ``claim_jobs``.
+
+Seeds a backlog of ``password_reset_email`` jobs (SMTP is not configured, so
+sending is a no-op and the numbers are pure queue overhead) and drains it with
+the worker's serial loop. The legacy loop claims each job with its own
+``SELECT ... FOR UPDATE``, commit and refresh before sending the batch; it is
+timed on a sample and extrapolated. ``process_one_job`` claims each batch with
+one ``UPDATE ... RETURNING`` and acks it in one commit.
+
+Usage:
+    python -m benchmarks.job_claim [jobs] [legacy_sample]   # default: 100000 2000
+"""
+
+import sys
+from datetime import UTC, datetime
+from time import perf_counter
+
+from sqlalchemy import func, insert, select
+
+from app.config.base import get_settings
+from app.models.job import BackgroundJob, JobStatus
+from app.services.job_queue import (
+    EMAIL_JOB_TYPES,
+    PASSWORD_RESET_EMAIL_JOB,
+    process_email_jobs,
+    process_one_job,
+)
+from benchmarks._support import SessionLocal, prepare_schema
+
+SEED_BATCH = 10000
+
+
+def _seed(count: int) -> None:
+    with SessionLocal() as db:
+        for start in range(0, count, SEED_BATCH):
+            db.execute(
+                insert(BackgroundJob),
+                [
+                    {
+                        "job_type": PASSWORD_RESET_EMAIL_JOB,
+                        "payload": {"recipient_email": f"student{index}@example.com", "reset_token": "token"},
+                    }
+                    for index in range(start, min(start + SEED_BATCH, count))
+                ],
+            )
+        db.commit()
+
+
+def _queued() -> int:
+    with SessionLocal() as db:
+        return db.scalar(
+            select(func.count()).select_from(BackgroundJob).where(BackgroundJob.status == JobStatus.queued)
+        )
+
+
+def _legacy_claim(db) -> BackgroundJob | None:
+    now = datetime.now(UTC)
+    job = db.scalar(
+        select(BackgroundJob)
+        .where(
+            BackgroundJob.status == JobStatus.queued,
+            BackgroundJob.available_at <= now,
+            BackgroundJob.job_type.in_(EMAIL_JOB_TYPES),
+        )
+        .order_by(BackgroundJob.created_at, BackgroundJob.id)
+        .with_for_update(skip_locked=True)
+        .limit(1)
+    )
+    if job is None:
+        return None
+    job.status = JobStatus.running
+    job.attempts += 1
+    job.started_at = now
+    job.error = None
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def _legacy_drain(sample: int) -> int:
+    batch_size = get_settings().smtp_batch_size
+    processed = 0
+    while processed < sample:
+        with SessionLocal() as db:
+            jobs = []
+            while len(jobs) < min(batch_size, sample - processed) and (job := _legacy_claim(db)) is not None:
+                jobs.append(job)
+            if not jobs:
+                break
+            process_email_jobs(db, jobs)
+            processed += len(jobs)
+    return processed
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = argv if argv is not None else sys.argv[1:]
+    job_count = int(args[0]) if args else 100000
+    sample = min(int(args[1]) if len(args) > 1 else 2000, job_count)
+    get_settings().smtp_host = ""
+    prepare_schema()
+
+    started = perf_counter()
+    _seed(job_count)
+    print(f"seeded {job_count} email jobs in {perf_counter() - started:.1f}s")
+
+    started = perf_counter()
+    legacy_processed = _legacy_drain(sample)
+    legacy_rate = legacy_processed / (perf_counter() - started)
+
+    remaining = _queued()
+    started = perf_counter()
+    while process_one_job():
+        pass
+    batch_seconds = perf_counter() - started
+    batch_rate = remaining / batch_seconds
+
+    print(f"one claim per job:  {legacy_rate:8.0f} jobs/s over {legacy_processed} jobs "
+          f"(~{job_count / legacy_rate:.0f}s for {job_count})")
+    print(f"claim_jobs batches: {batch_rate:8.0f} jobs/s over {remaining} jobs ({batch_seconds:.1f}s)")
+    print(f"speed-up:           {batch_rate / legacy_rate:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Re-grading an exam: the ``regrade_exam`` job vs a per-attempt ORM loop.
+
+Seeds one exam with submitted attempts, flips the answer key, then times the
+chunked set-based job over every attempt. The legacy loop (load each attempt
+with its questions and answers, grade in Python, commit) is timed on a sample
+and extrapolated, because running it over every attempt takes far longer.
+
+Usage:
+    python -m benchmarks.regrade [attempts] [questions] [legacy_sample]   # default: 100000 10 1000
+"""
+
+import sys
+from time import perf_counter
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import selectinload
+
+from app.config.base import get_settings
+from app.models.exam import (
+    Exam,
+    ExamAssignment,
+    ExamAttempt,
+    ExamQuestion,
+)
+from app.models.job import BackgroundJob
+from app.services.grading import run_exam_regrade
+from benchmarks._support import SessionLocal, prepare_schema, seed_submitted_attempts
+
+
+def _legacy_regrade(attempt_ids: list[int]) -> None:
+    for attempt_id in attempt_ids:
+        with SessionLocal() as db:
+            attempt = db.scalar(
+                select(ExamAttempt)
+                .where(ExamAttempt.id == attempt_id)
+                .options(
+                    selectinload(ExamAttempt.assignment)
+                    .selectinload(ExamAssignment.exam)
+                    .selectinload(Exam.questions),
+                    selectinload(ExamAttempt.answers),
+                )
+            )
+            question_map = {question.id: question for question in attempt.assignment.exam.questions}
+            score = 0
+            for answer in attempt.answers:
+                question = question_map[answer.question_id]
+                answer.is_correct = answer.selected_option == question.correct_option
+                answer.marks_awarded = question.marks if answer.is_correct else 0
+                score += answer.marks_awarded
+            attempt.score = score
+            attempt.total_marks = sum(question.marks for question in question_map.values())
+            attempt.percentage = round(score / attempt.total_marks * 100, 2)
+            db.commit()
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = argv if argv is not None else sys.argv[1:]
+    attempt_count = int(args[0]) if args else 100000
+    question_count = int(args[1]) if len(args) > 1 else 10
+    sample = min(int(args[2]) if len(args) > 2 else 1000, attempt_count)
+    prepare_schema()
+
+    started = perf_counter()
+    exam_id, question_ids = seed_submitted_attempts(attempt_count, question_count)
+    print(f"seeded {attempt_count} attempts x {question_count} answers in {perf_counter() - started:.1f}s")
+
+    with SessionLocal() as db:
+        db.execute(update(ExamQuestion).where(ExamQuestion.id.in_(question_ids)).values(correct_option="B"))
+        db.commit()
+        attempt_ids = list(
+            db.scalars(
+                select(ExamAttempt.id)
+                .join(ExamAssignment, ExamAssignment.id == ExamAttempt.assignment_id)
+                .where(ExamAssignment.exam_id == exam_id)
+                .order_by(ExamAttempt.id)
+                .limit(sample)
+            )
+        )
+
+    started = perf_counter()
+    _legacy_regrade(attempt_ids)
+    legacy_seconds = perf_counter() - started
+    legacy_estimate = legacy_seconds / sample * attempt_count
+
+    with SessionLocal() as db:
+        job = BackgroundJob(job_type="regrade_exam", payload={"exam_id": exam_id})
+        db.add(job)
+        db.commit()
+        started = perf_counter()
+        result = run_exam_regrade(db, job, chunk_size=get_settings().regrade_chunk_size)
+        job_seconds = perf_counter() - started
+
+    print(f"per-attempt ORM loop:  {legacy_seconds:8.2f}s for {sample} attempts "
+          f"(~{legacy_estimate:.0f}s for {attempt_count})")
+    print(f"regrade_exam job:      {job_seconds:8.2f}s for {result['processed']} attempts "
+          f"({result['processed'] / job_seconds:.0f} attempts/s)")
+    print(f"estimated speed-up:    {legacy_estimate / job_seconds:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
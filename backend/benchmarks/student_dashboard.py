@@ -0,0 +1,106 @@
+"""Student dashboard refresh: legacy queries vs one summary query vs the cache.
+
+A refresh of the student portal fetches ``/student/dashboard`` and
+``/student/assignments``. The legacy path ran three scalar queries plus a load
+of every assignment with all of its attempts; the new path runs one
+window-function query for both, or none when the summary cache is warm.
+
+Usage:
+    python -m benchmarks.student_dashboard [assignments] [refreshes]   # default: 1000 200
+"""
+
+import sys
+from time import perf_counter
+
+from sqlalchemy import desc, func, insert, select
+from sqlalchemy.orm import selectinload
+
+from app.models.exam import AttemptStatus, Exam, ExamAssignment, ExamAttempt
+from app.services.student_summary import StudentSummary, load_student_summary
+from app.utils.cache import TtlLruCache
+from benchmarks._support import SessionLocal, create_user, prepare_schema
+
+
+def _seed(assignment_count: int) -> int:
+    student = create_user()
+    with SessionLocal() as db:
+        exams = [
+            Exam(title=f"Dashboard benchmark {index}", description="Synthetic exam", duration_minutes=60)
+            for index in range(assignment_count)
+        ]
+        db.add_all(exams)
+        db.flush()
+        assignment_ids = db.scalars(
+            insert(ExamAssignment).returning(ExamAssignment.id, sort_by_parameter_order=True),
+            [{"exam_id": exam.id, "student_id": student.id} for exam in exams],
+        ).all()
+        attempts = []
+        for index, assignment_id in enumerate(assignment_ids):
+            if index % 4 == 0:  # not started yet
+                continue
+            if index % 4 == 1:  # an abandoned first attempt before the submitted one
+                attempts.append({"assignment_id": assignment_id, "status": AttemptStatus.in_progress})
+            attempts.append(
+                {"assignment_id": assignment_id, "status": AttemptStatus.submitted, "percentage": index % 101}
+            )
+        db.execute(
+            insert(ExamAttempt),
+            [{"student_id": student.id, "total_marks": 10, **attempt} for attempt in attempts],
+        )
+        db.commit()
+    return student.id
+
+
+def _legacy_refresh(student_id: int) -> None:
+    with SessionLocal() as db:
+        db.scalar(select(func.count(ExamAssignment.id)).where(ExamAssignment.student_id == student_id))
+        submitted = (ExamAttempt.student_id == student_id, ExamAttempt.status == AttemptStatus.submitted)
+        db.scalar(select(func.count(ExamAttempt.id)).where(*submitted))
+        db.scalar(select(func.avg(ExamAttempt.percentage)).where(*submitted))
+        assignments = db.scalars(
+            select(ExamAssignment)
+            .where(ExamAssignment.student_id == student_id)
+            .options(selectinload(ExamAssignment.exam), selectinload(ExamAssignment.attempts))
+            .order_by(desc(ExamAssignment.id))
+        ).all()
+        for assignment in assignments:
+            _ = max(assignment.attempts, key=lambda item: item.id) if assignment.attempts else None
+
+
+def _summary_refresh(student_id: int) -> None:
+    with SessionLocal() as db:
+        load_student_summary(db, student_id)
+
+
+def _cached_refresh(cache: TtlLruCache[int, StudentSummary], student_id: int) -> None:
+    summary = cache.get(student_id)
+    if summary is None:
+        epoch = cache.epoch
+        with SessionLocal() as db:
+            summary = load_student_summary(db, student_id)
+        cache.put(student_id, summary, epoch=epoch)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = argv if argv is not None else sys.argv[1:]
+    assignment_count = int(args[0]) if args else 1000
+    refreshes = int(args[1]) if len(args) > 1 else 200
+    prepare_schema()
+    student_id = _seed(assignment_count)
+    cache: TtlLruCache[int, StudentSummary] = TtlLruCache(max_entries=100, ttl_seconds=60)
+
+    print(f"assignments per student: {assignment_count}, refreshes: {refreshes}")
+    for label, run in (
+        ("legacy queries", lambda: _legacy_refresh(student_id)),
+        ("one summary query", lambda: _summary_refresh(student_id)),
+        ("summary cache", lambda: _cached_refresh(cache, student_id)),
+    ):
+        started = perf_counter()
+        for _ in range(refreshes):
+            run()
+        elapsed = perf_counter() - started
+        print(f"{label:18} {elapsed / refreshes * 1000:9.2f} ms/refresh")
+
+
+if __name__ == "__main__":
+    main()
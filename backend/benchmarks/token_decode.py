@@ -0,0 +1,38 @@
+"""Per-request cost of ``decode_access_token`` with and without the memo cache.
+
+Usage:
+    python -m benchmarks.token_decode [iterations]
+"""
+
+import sys
+import timeit
+
+from app.utils.security import clear_token_cache, create_access_token, decode_access_token
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = argv if argv is not None else sys.argv[1:]
+    iterations = int(args[0]) if args else 50_000
+    token = create_access_token(1, "benchmark_user", "student", token_version=0)
+
+    def cold() -> None:
+        clear_token_cache()
+        decode_access_token(token)
+
+    def warm() -> None:
+        decode_access_token(token)
+
+    decode_access_token(token)
+    cold_seconds = min(timeit.repeat(cold, number=iterations, repeat=3))
+    warm_seconds = min(timeit.repeat(warm, number=iterations, repeat=3))
+
+    cold_us = cold_seconds / iterations * 1e6
+    warm_us = warm_seconds / iterations * 1e6
+    print(f"iterations:            {iterations}")
+    print(f"verify + decode (us):  {cold_us:8.2f}")
+    print(f"cached decode (us):    {warm_us:8.2f}")
+    print(f"saving per request:    {cold_us - warm_us:8.2f} us ({cold_us / warm_us:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
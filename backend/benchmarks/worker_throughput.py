@@ -0,0 +1,85 @@
+"""Worker throughput: jobs per second with 1, 4 and 16 worker slots.
+
+Queues ``import_students`` jobs whose body is replaced by a fixed sleep
+standing in for the I/O a real job waits on (SMTP round trips, slow queries),
+then times a ``WorkerPool`` draining them. The worker runs that type one job
+per task, so every job takes a slot. Claiming, result writes and commits are
+the real ones, so the numbers include the queue overhead per job.
+
+Usage:
+    python -m benchmarks.worker_throughput [jobs] [latency_seconds]   # default: 400 0.02
+"""
+
+import sys
+import threading
+import time
+from time import perf_counter
+
+from sqlalchemy import func, insert, select
+
+from app.models.job import BackgroundJob, JobStatus
+from app.services import job_queue
+from app.services.worker_pool import WorkerPool
+from benchmarks._support import SessionLocal, prepare_schema
+
+SLOT_COUNTS = (1, 4, 16)
+
+
+def _queue_jobs(count: int) -> list[int]:
+    with SessionLocal() as db:
+        ids = db.scalars(
+            insert(BackgroundJob).returning(BackgroundJob.id, sort_by_parameter_order=True),
+            [{"job_type": job_queue.IMPORT_STUDENTS_JOB, "payload": {"upload_id": ""}} for _ in range(count)],
+        ).all()
+        db.commit()
+        return list(ids)
+
+
+def _outstanding(job_ids: list[int]) -> int:
+    with SessionLocal() as db:
+        return db.scalar(
+            select(func.count())
+            .select_from(BackgroundJob)
+            .where(
+                BackgroundJob.id.in_(job_ids),
+                BackgroundJob.status.in_([JobStatus.queued, JobStatus.running]),
+            )
+        )
+
+
+def _drain(slots: int, job_ids: list[int]) -> float:
+    pool = WorkerPool(slots=slots, poll_interval=0.01)
+    thread = threading.Thread(target=pool.run, daemon=True)
+    started = perf_counter()
+    thread.start()
+    while _outstanding(job_ids):
+        time.sleep(0.01)
+    seconds = perf_counter() - started
+    pool.stop()
+    thread.join()
+    return seconds
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = argv if argv is not None else sys.argv[1:]
+    job_count = int(args[0]) if args else 400
+    latency = float(args[1]) if len(args) > 1 else 0.02
+    prepare_schema()
+
+    def simulated_job(db, job, chunk_size):
+        time.sleep(latency)
+        return {"upload_id": job.payload["upload_id"]}
+
+    job_queue.run_student_import = simulated_job
+
+    print(f"{job_count} jobs, {latency * 1000:.0f} ms simulated I/O each")
+    baseline = None
+    for slots in SLOT_COUNTS:
+        seconds = _drain(slots, _queue_jobs(job_count))
+        rate = job_count / seconds
+        baseline = baseline or rate
+        print(f"{slots:>2} slots: {seconds:7.2f}s  {rate:7.0f} jobs/s  ({rate / baseline:4.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
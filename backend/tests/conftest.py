@@ -12,6 +12,9 @@ os.environ.setdefault("ENVIRONMENT", "testing")
 os.environ.setdefault(
     "AUTH_SECRET_KEY", "test-secret-key-that-is-definitely-long-enough-000"
 )
+# Hash inline rather than in process pools; the pools themselves have their own tests.
+os.environ.setdefault("PASSWORD_HASH_WORKERS", "0")
+os.environ.setdefault("PASSWORD_HASH_BULK_WORKERS", "0")
 
 _db_fd, _db_path = tempfile.mkstemp(suffix=".sqlite")
 os.environ["DATABASE_URL"] = f"sqlite+pysqlite:///{_db_path}"
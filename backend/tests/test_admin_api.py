@@ -4,29 +4,30 @@ import uuid
 
 
 def _admin_headers(client):
-    """Create an admin directly and return an Authorization header for it."""
+    """Create an admin directly and return an Authorization header for it.
+
+    The token is minted directly rather than via ``/auth/login`` so the many
+    admin-driven tests do not eat into the login rate limit.
+    """
     from app.extensions.db import SessionLocal
     from app.models.user import AuthProvider, User, UserRole
-    from app.utils.security import hash_password
+    from app.utils.security import create_access_token, hash_password
 
     username = f"admin_{uuid.uuid4().hex[:8]}"
     password = "AdminPass123"
     with SessionLocal() as db:
-        db.add(
-            User(
-                full_name="Portal Admin",
-                username=username,
-                email=f"{username}@example.com",
-                password_hash=hash_password(password),
-                role=UserRole.admin,
-                auth_provider=AuthProvider.password,
-            )
+        admin = User(
+            full_name="Portal Admin",
+            username=username,
+            email=f"{username}@example.com",
+            password_hash=hash_password(password),
+            role=UserRole.admin,
+            auth_provider=AuthProvider.password,
         )
+        db.add(admin)
         db.commit()
+        token = create_access_token(admin.id, admin.username, admin.role.value, admin.token_version)
 
-    token = client.post(
-        "/api/v1/auth/login", json={"username": username, "password": password}
-    ).json()["access_token"]
     return {"Authorization": f"Bearer {token}"}
 
 
@@ -90,6 +91,37 @@ def test_admin_can_create_and_delete_exam(client):
     assert client.delete(f"/api/v1/admin/exams/{exam_id}", headers=headers).status_code == 404
 
 
+def test_exam_list_is_a_summary_and_detail_supports_etag(client):
+    from app.extensions.db import SessionLocal
+    from app.services.exam_paper_cache import bump_exam_version
+
+    headers = _admin_headers(client)
+    created = client.post("/api/v1/admin/exams", headers=headers, json=_exam_payload("Summary Exam"))
+    exam_id = created.json()["id"]
+
+    listed = client.get("/api/v1/admin/exams", headers=headers, params={"limit": 500}).json()
+    summary = next(exam for exam in listed if exam["id"] == exam_id)
+    assert "questions" not in summary
+    assert (summary["question_count"], summary["total_marks"]) == (1, 2)
+
+    detail = client.get(f"/api/v1/admin/exams/{exam_id}", headers=headers)
+    assert detail.status_code == 200
+    assert [question["correct_option"] for question in detail.json()["questions"]] == ["B"]
+    etag = detail.headers["ETag"]
+
+    cached = client.get(f"/api/v1/admin/exams/{exam_id}", headers={**headers, "If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["ETag"] == etag
+
+    with SessionLocal() as db:
+        bump_exam_version(db, exam_id)
+        db.commit()
+    changed = client.get(f"/api/v1/admin/exams/{exam_id}", headers={**headers, "If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert client.get("/api/v1/admin/exams/999999", headers=headers).status_code == 404
+
+
 def test_delete_endpoints_require_admin(client):
     # A student token must not be able to delete anything.
     suffix = uuid.uuid4().hex[:8]
@@ -164,3 +196,314 @@ def test_analytics_and_audit_require_admin(client):
 
     assert client.get("/api/v1/admin/analytics", headers=headers).status_code == 403
     assert client.get("/api/v1/admin/audit-events", headers=headers).status_code == 403
+
+
+def test_deleted_student_token_is_rejected_and_metrics_reported(client):
+    headers = _admin_headers(client)
+    suffix = uuid.uuid4().hex[:8]
+    token = client.post(
+        "/api/v1/auth/register",
+        json={
+            "full_name": "Cached Student",
+            "username": f"cached_{suffix}",
+            "email": f"cached_{suffix}@example.com",
+            "password": "StudentPass1",
+        },
+    ).json()["access_token"]
+    student_headers = {"Authorization": f"Bearer {token}"}
+    me = client.get("/api/v1/auth/me", headers=student_headers)
+    assert me.status_code == 200
+
+    deleted = client.delete(f"/api/v1/admin/students/{me.json()['id']}", headers=headers)
+    assert deleted.status_code == 204
+    assert client.get("/api/v1/auth/me", headers=student_headers).status_code == 401
+
+    metrics = client.get("/api/v1/admin/metrics", headers=headers)
+    assert metrics.status_code == 200
+    assert metrics.json()["principal_cache"]["hits"] >= 1
+
+
+def test_bulk_student_import_returns_created_rows_in_order(client):
+    from sqlalchemy import select
+
+    from app.extensions.db import SessionLocal
+    from app.models.user import User
+    from app.utils.security import verify_password
+
+    headers = _admin_headers(client)
+    suffix = uuid.uuid4().hex[:6]
+    users = [
+        {
+            "full_name": f"Bulk Student {index}",
+            "username": f"bulk_{suffix}_{index}",
+            "email": f"bulk_{suffix}_{index}@example.com",
+            "password": f"BulkPass{index}",
+        }
+        for index in range(3)
+    ]
+
+    resp = client.post("/api/v1/admin/students/bulk", headers=headers, json={"users": users})
+    assert resp.status_code == 201, resp.text
+    created = resp.json()
+    assert [row["username"] for row in created] == [user["username"] for user in users]
+    assert all(row["id"] and row["created_at"] and row["role"] == "student" for row in created)
+
+    with SessionLocal() as db:
+        stored = db.scalar(select(User.password_hash).where(User.username == users[1]["username"]))
+    assert verify_password("BulkPass1", stored)
+
+
+def _drain_jobs():
+    from app.services.job_queue import process_one_job
+
+    while process_one_job():
+        pass
+
+
+def test_streamed_csv_roster_import_runs_as_chunked_job(client, monkeypatch):
+    from app.config.base import get_settings
+
+    monkeypatch.setattr(get_settings(), "student_import_chunk_size", 2)
+    headers = _admin_headers(client)
+    suffix = uuid.uuid4().hex[:6]
+    csv_body = "\n".join(
+        [
+            "full_name,username,email,password",
+            f"Row One,imp_{suffix}_1,imp_{suffix}_1@example.com,ImportPass1",
+            f"Row Two,imp_{suffix}_2,imp_{suffix}_2@example.com,ImportPass2",
+            f"Row Dup,imp_{suffix}_1,imp_{suffix}_dup@example.com,ImportPass3",
+            f"Row Bad,imp_{suffix}_4,not-an-email,ImportPass4",
+            f"Row Five,imp_{suffix}_5,imp_{suffix}_5@example.com,ImportPass5",
+        ]
+    )
+
+    queued = client.post(
+        "/api/v1/admin/students/import",
+        headers={**headers, "Content-Type": "text/csv"},
+        content=csv_body.encode(),
+    )
+    assert queued.status_code == 202, queued.text
+    job_id = queued.json()["id"]
+    assert queued.json()["job_type"] == "import_students"
+
+    _drain_jobs()
+
+    job = next(j for j in client.get("/api/v1/admin/jobs", headers=headers).json() if j["id"] == job_id)
+    assert job["status"] == "completed"
+    assert job["result"]["processed"] == 5
+    assert job["result"]["created"] == 3
+    assert [error["line"] for error in job["result"]["errors"]] == [4, 5]
+
+    usernames = {s["username"] for s in client.get("/api/v1/admin/students", headers=headers).json()}
+    assert {f"imp_{suffix}_1", f"imp_{suffix}_2", f"imp_{suffix}_5"} <= usernames
+
+
+def test_roster_import_that_fails_for_good_discards_staged_rows(client, monkeypatch):
+    from datetime import UTC, datetime, timedelta
+
+    from sqlalchemy import func, select, update
+
+    from app.extensions.db import SessionLocal
+    from app.models.job import BackgroundJob, StudentImportRow
+    from app.services import job_queue, roster_import
+
+    headers = {**_admin_headers(client), "Content-Type": "text/csv"}
+    suffix = uuid.uuid4().hex[:6]
+
+    def upload(name):
+        username = f"{name}_{suffix}"
+        body = f"full_name,username,email,password\n{name},{username},{username}@example.com,ImportPass1"
+        queued = client.post("/api/v1/admin/students/import", headers=headers, content=body.encode())
+        assert queued.status_code == 202, queued.text
+        return queued.json()["id"]
+
+    def staged_rows():
+        with SessionLocal() as db:
+            return db.scalar(select(func.count()).select_from(StudentImportRow))
+
+    _drain_jobs()
+    failing_id = upload("failing")
+    with SessionLocal() as db:
+        db.execute(update(BackgroundJob).where(BackgroundJob.id == failing_id).values(max_attempts=1))
+        db.commit()
+
+    def broken_chunk(db, rows):
+        raise RuntimeError("import blew up")
+
+    monkeypatch.setattr(roster_import, "_import_chunk", broken_chunk)
+    _drain_jobs()
+    with SessionLocal() as db:
+        assert db.get(BackgroundJob, failing_id).status.value == "failed"
+    assert staged_rows() == 0
+
+    crashed_id = upload("crashed")
+    with SessionLocal() as db:
+        job_queue.claim_jobs(db, 1, [job_queue.IMPORT_STUDENTS_JOB])
+        db.execute(
+            update(BackgroundJob)
+            .where(BackgroundJob.id == crashed_id)
+            .values(max_attempts=1, lease_expires_at=datetime.now(UTC) - timedelta(seconds=1))
+        )
+        db.commit()
+        assert staged_rows() == 1
+        assert job_queue.requeue_expired_jobs(db) == 1
+    assert staged_rows() == 0
+
+
+def test_roster_import_rejects_unknown_format_and_bad_header(client):
+    headers = _admin_headers(client)
+
+    wrong_type = client.post(
+        "/api/v1/admin/students/import",
+        headers={**headers, "Content-Type": "application/json"},
+        content=b"{}",
+    )
+    assert wrong_type.status_code == 415
+
+    bad_header = client.post(
+        "/api/v1/admin/students/import",
+        headers={**headers, "Content-Type": "text/csv"},
+        content=b"name,email\nA,a@example.com\n",
+    )
+    assert bad_header.status_code == 400
+    assert "username" in bad_header.json()["detail"]
+
+
+def test_bulk_student_import_reports_conflicts_per_row(client):
+    headers = _admin_headers(client)
+    suffix = uuid.uuid4().hex[:6]
+    existing = client.post(
+        "/api/v1/admin/students",
+        headers=headers,
+        json={
+            "full_name": "Existing Student",
+            "username": f"exist_{suffix}",
+            "email": f"exist_{suffix}@example.com",
+            "password": "StudentPass1",
+        },
+    )
+    assert existing.status_code == 201
+
+    def row(username, email):
+        return {"full_name": "Bulk Row", "username": username, "email": email, "password": "BulkPass1"}
+
+    resp = client.post(
+        "/api/v1/admin/students/bulk",
+        headers=headers,
+        json={
+            "users": [
+                row(f"fresh_{suffix}", f"fresh_{suffix}@example.com"),
+                row(f"fresh_{suffix}", f"other_{suffix}@example.com"),
+                row(f"exist_{suffix}", f"new_{suffix}@example.com"),
+            ]
+        },
+    )
+    assert resp.status_code == 409
+    body = resp.json()
+    assert isinstance(body["detail"], str)
+    assert body["conflicts"] == [
+        {
+            "row": 1,
+            "field": "username",
+            "value": f"fresh_{suffix}",
+            "reason": "duplicate_in_batch",
+            "first_row": 0,
+        },
+        {
+            "row": 2,
+            "field": "username",
+            "value": f"exist_{suffix}",
+            "reason": "already_exists",
+            "first_row": None,
+        },
+    ]
+
+
+def test_conflict_lookup_via_temp_table_matches_chunked_lookup(client):
+    from app.extensions.db import SessionLocal
+    from app.services.bulk_validation import find_student_conflicts
+
+    headers = _admin_headers(client)
+    suffix = uuid.uuid4().hex[:6]
+    client.post(
+        "/api/v1/admin/students",
+        headers=headers,
+        json={
+            "full_name": "Temp Table Student",
+            "username": f"tmp_{suffix}",
+            "email": f"tmp_{suffix}@example.com",
+            "password": "StudentPass1",
+        },
+    )
+    rows = [(0, f"tmp_{suffix}", f"x_{suffix}@example.com"), (1, f"y_{suffix}", f"tmp_{suffix}@example.com")]
+
+    with SessionLocal() as db:
+        chunked = find_student_conflicts(db, rows)
+        joined = find_student_conflicts(db, rows, temp_table_threshold=0)
+
+    assert chunked == joined
+    assert [(c.row, c.field, c.reason) for c in joined] == [
+        (0, "username", "already_exists"),
+        (1, "email", "already_exists"),
+    ]
+
+
+def _all_pages(client, path, headers, page_size):
+    """Follow ``X-Next-Cursor`` through a list endpoint, returning each page."""
+    pages = []
+    cursor = None
+    while True:
+        params = {"limit": page_size, **({"after": cursor} if cursor else {})}
+        response = client.get(path, headers=headers, params=params)
+        assert response.status_code == 200, response.text
+        pages.append(response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            return pages
+
+
+def test_admin_lists_are_keyset_paginated_and_filtered(client):
+    from app.utils.pagination import encode_cursor
+
+    headers = _admin_headers(client)
+    suffix = uuid.uuid4().hex[:8]
+    for index in range(5):
+        created = client.post(
+            "/api/v1/admin/students",
+            headers=headers,
+            json={
+                "full_name": f"Paged Student {index}",
+                "username": f"paged_{suffix}_{index}",
+                "email": f"paged_{suffix}_{index}@example.com",
+                "password": "StudentPass1",
+            },
+        )
+        assert created.status_code == 201, created.text
+
+    everything = client.get("/api/v1/admin/students", headers=headers, params={"limit": 500}).json()
+    pages = _all_pages(client, "/api/v1/admin/students", headers, page_size=2)
+    assert all(len(page) == 2 for page in pages[:-1])
+    paged_ids = [student["id"] for page in pages for student in page]
+    assert paged_ids == [student["id"] for student in everything]
+    assert paged_ids == sorted(paged_ids, reverse=True)
+
+    audit_pages = _all_pages(client, "/api/v1/admin/audit-events", headers, page_size=3)
+    actions = {event["action"] for page in audit_pages for event in page}
+    assert "student.create" in actions
+    filtered = client.get("/api/v1/admin/audit-events", headers=headers, params={"action": "student.create"})
+    assert {event["action"] for event in filtered.json()} == {"student.create"}
+    future = {"since": "2999-01-01T00:00:00"}
+    assert client.get("/api/v1/admin/audit-events", headers=headers, params=future).json() == []
+
+    invalid = client.get("/api/v1/admin/students", headers=headers, params={"after": "not-a-cursor"})
+    assert invalid.status_code == 400
+    assert invalid.json()["detail"] == "Invalid cursor"
+    for tampered in (["abc"], [True], [1.5], [None]):
+        cursor = encode_cursor(tampered)
+        response = client.get("/api/v1/admin/students", headers=headers, params={"after": cursor})
+        assert response.status_code == 400, tampered
+    bad_date = encode_cursor([12, 3])
+    response = client.get("/api/v1/admin/security-incidents", headers=headers, params={"after": bad_date})
+    assert response.status_code == 400
+    too_large = client.get("/api/v1/admin/students", headers=headers, params={"limit": 10000})
+    assert too_large.status_code == 422
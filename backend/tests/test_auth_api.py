@@ -132,3 +132,40 @@ def test_google_account_cannot_be_password_logged_in(client):
     )
     assert resp.status_code == 401
     assert stored_hash is not None
+
+
+def test_repeat_requests_hit_principal_cache_and_logout_invalidates(client):
+    from app.services.principal_cache import principal_cache
+
+    token = _register(
+        client, username="cacheuser", email="cacheuser@example.com"
+    ).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    assert client.get("/api/v1/auth/me", headers=headers).status_code == 200
+    hits_before = principal_cache.hits
+    me = client.get("/api/v1/auth/me", headers=headers)
+    assert me.status_code == 200
+    assert me.json()["username"] == "cacheuser"
+    assert principal_cache.hits == hits_before + 1
+
+    # Logout goes through the cached principal and must still persist the bump.
+    assert client.post("/api/v1/auth/logout", headers=headers).status_code == 200
+    assert client.get("/api/v1/auth/me", headers=headers).status_code == 401
+
+
+def test_login_returns_503_when_hashing_is_saturated(client, monkeypatch):
+    from app.services.password_hashing import PasswordHashingBusyError, password_hasher
+
+    _register(client, username="busyuser", email="busy@example.com")
+
+    def busy(*_args):
+        raise PasswordHashingBusyError("Password hashing capacity exhausted")
+
+    monkeypatch.setattr(password_hasher, "verify", busy)
+    resp = client.post(
+        "/api/v1/auth/login", json={"username": "busyuser", "password": "Str0ngPass"}
+    )
+    assert resp.status_code == 503
+    assert resp.headers["Retry-After"] == "1"
+    assert resp.json()["detail"] == "The server is busy, please retry shortly."
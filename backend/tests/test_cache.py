@@ -0,0 +1,53 @@
+def test_ttl_lru_cache_expires_evicts_and_guards_epoch(monkeypatch):
+    from app.utils import cache as cache_module
+    from app.utils.cache import TtlLruCache
+
+    now = [100.0]
+    monkeypatch.setattr(cache_module, "monotonic", lambda: now[0])
+    cache: TtlLruCache[int, str] = TtlLruCache(max_entries=2, ttl_seconds=10)
+
+    cache.put(1, "one", epoch=cache.epoch)
+    cache.put(2, "two", epoch=cache.epoch)
+    assert cache.get(1) == "one"  # now most recently used
+    cache.put(3, "three", epoch=cache.epoch)
+    assert (cache.get(2), cache.get(1), cache.get(3)) == (None, "one", "three")
+    assert cache.get(3, valid=lambda value: value == "other") is None
+
+    # A value loaded before an invalidation is not stored after it.
+    epoch = cache.epoch
+    cache.invalidate(1)
+    cache.put(1, "stale", epoch=epoch)
+    assert cache.get(1) is None
+
+    now[0] += 10
+    assert cache.get(3) is None
+    assert cache.stats() == {
+        "size": 0,
+        "max_entries": 2,
+        "hits": 3,
+        "misses": 4,
+        "hit_ratio": 0.4286,
+        "evictions": 1,
+        "invalidations": 1,
+    }
+
+    forever: TtlLruCache[int, str] = TtlLruCache(max_entries=1)
+    forever.put(1, "one", epoch=forever.epoch)
+    now[0] += 10**6
+    assert forever.get(1) == "one"
+
+
+def test_ttl_lru_cache_per_entry_ttl_and_sweep_on_put(monkeypatch):
+    from app.utils import cache as cache_module
+    from app.utils.cache import TtlLruCache
+
+    now = [100.0]
+    monkeypatch.setattr(cache_module, "monotonic", lambda: now[0])
+    cache: TtlLruCache[int, str] = TtlLruCache(max_entries=10)
+
+    cache.put(1, "short", epoch=cache.epoch, ttl_seconds=5)
+    now[0] += 5
+    cache.put(2, "two", epoch=cache.epoch)
+    assert cache.stats()["size"] == 1  # the expired entry was swept, not evicted
+    assert cache.stats()["evictions"] == 0
+    assert cache.get(2) == "two"
@@ -0,0 +1,254 @@
+"""SMTP delivery against a local stub server: connection reuse, batching, reconnects."""
+
+import socketserver
+import threading
+
+import pytest
+
+REJECTED_RECIPIENT = "reject@example.com"
+
+
+class _StubSmtpHandler(socketserver.StreamRequestHandler):
+    """Just enough SMTP for ``smtplib``: EHLO, AUTH PLAIN, MAIL/RCPT/DATA, QUIT."""
+
+    def _reply(self, line: str) -> None:
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self) -> None:
+        server = self.server
+        server.connections += 1
+        self._reply("220 stub ESMTP")
+        recipients: list[str] = []
+        while line := self.rfile.readline():
+            command = line.decode().strip()
+            verb = command.split(" ", 1)[0].upper()
+            if verb == "EHLO":
+                self._reply("250-stub")
+                self._reply("250 AUTH PLAIN")
+            elif verb == "AUTH":
+                self._reply("235 authenticated")
+            elif verb == "MAIL":
+                recipients = []
+                self._reply("250 ok")
+            elif verb == "RCPT":
+                if REJECTED_RECIPIENT in command:
+                    self._reply("550 no such user")
+                else:
+                    recipients.append(command.split(":", 1)[1].strip("<> "))
+                    self._reply("250 ok")
+            elif verb == "DATA":
+                self._reply("354 go ahead")
+                while self.rfile.readline().rstrip(b"\r\n") != b".":
+                    pass
+                server.delivered.extend(recipients)
+                self._reply("250 queued")
+                if server.drop_after and len(server.delivered) % server.drop_after == 0:
+                    return  # hang up, like a server closing an idle or overused session
+            elif verb == "QUIT":
+                self._reply("221 bye")
+                return
+            else:  # RSET, NOOP
+                self._reply("250 ok")
+
+
+@pytest.fixture
+def smtp_server(monkeypatch):
+    from app.config.base import get_settings
+    from app.extensions import mail
+    from app.services import job_queue
+
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), _StubSmtpHandler)
+    server.daemon_threads = True
+    server.connections = 0
+    server.delivered = []
+    server.drop_after = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    settings = get_settings()
+    for name, value in {
+        "smtp_host": "127.0.0.1",
+        "smtp_port": server.server_address[1],
+        "smtp_username": "mailer",
+        "smtp_password": "secret",
+        "smtp_use_tls": False,
+    }.items():
+        monkeypatch.setattr(settings, name, value)
+    session = mail.SmtpSession()
+    monkeypatch.setattr(mail, "smtp_session", session)
+    monkeypatch.setattr(job_queue, "smtp_session", session)
+    yield server
+    session.close()
+    server.shutdown()
+    server.server_close()
+
+
+def _queue_reset_emails(recipients):
+    from app.extensions.db import SessionLocal
+    from app.services.job_queue import enqueue_password_reset_email
+
+    with SessionLocal() as db:
+        ids = [
+            enqueue_password_reset_email(db, recipient_email=recipient, reset_token="token").id
+            for recipient in recipients
+        ]
+        db.commit()
+    return ids
+
+
+def _jobs(job_ids):
+    from app.extensions.db import SessionLocal
+    from app.models.job import BackgroundJob
+
+    with SessionLocal() as db:
+        return [db.get(BackgroundJob, job_id) for job_id in job_ids]
+
+
+@pytest.fixture(autouse=True)
+def _empty_queue(client):
+    # Jobs left by other tests would otherwise join the batch under test.
+    from tests.test_admin_api import _drain_jobs
+
+    _drain_jobs()
+
+
+def test_worker_drains_queued_emails_over_one_connection(smtp_server):
+    from app.services import job_queue
+
+    recipients = [f"student{index}@example.com" for index in range(5)]
+    job_ids = _queue_reset_emails(recipients)
+
+    assert job_queue.process_one_job()
+    assert smtp_server.delivered == recipients
+    assert smtp_server.connections == 1
+    assert all(job.status == "completed" and job.result["batch_size"] == 5 for job in _jobs(job_ids))
+
+    # The session stays open for the next batch.
+    more = _queue_reset_emails(["late@example.com"])
+    assert job_queue.process_one_job()
+    assert smtp_server.connections == 1
+    assert _jobs(more)[0].status == "completed"
+    stats = job_queue.smtp_session.stats()
+    assert (stats["batches"], stats["messages_sent"], stats["connected"]) == (2, 6, 1)
+
+
+def test_dropped_connection_is_reopened_and_message_retried(smtp_server):
+    from app.services import job_queue
+
+    smtp_server.drop_after = 2
+    recipients = [f"retry{index}@example.com" for index in range(5)]
+    job_ids = _queue_reset_emails(recipients)
+
+    assert job_queue.process_one_job()
+    assert smtp_server.delivered == recipients
+    assert smtp_server.connections == 3
+    assert all(job.status == "completed" for job in _jobs(job_ids))
+    assert job_queue.smtp_session.stats()["reconnects"] == 2
+
+
+def test_rejected_recipient_fails_only_its_own_job(smtp_server):
+    from app.services import job_queue
+
+    job_ids = _queue_reset_emails(["first@example.com", REJECTED_RECIPIENT, "third@example.com"])
+
+    assert job_queue.process_one_job()
+    first, rejected, third = _jobs(job_ids)
+    assert (first.status, third.status) == ("completed", "completed")
+    assert rejected.status == "queued"  # retried later, up to max_attempts
+    assert "no such user" in rejected.error
+    assert smtp_server.delivered == ["first@example.com", "third@example.com"]
+
+
+def test_assignment_email_retry_only_resends_failed_recipients(client, smtp_server):
+    import uuid
+
+    from sqlalchemy import update
+
+    from app.extensions.db import SessionLocal
+    from app.models.job import BackgroundJob
+    from app.services import job_queue
+    from tests.test_admin_api import _drain_jobs
+    from tests.test_student_api import _assigned_student
+
+    _, _, exam, admin_headers = _assigned_student(client)
+    _drain_jobs()
+    smtp_server.delivered.clear()
+    suffix = uuid.uuid4().hex[:8]
+    emails = [f"{suffix}a@example.com", f"{suffix}{REJECTED_RECIPIENT}", f"{suffix}c@example.com"]
+    student_ids = [
+        client.post(
+            "/api/v1/admin/students",
+            headers=admin_headers,
+            json={
+                "full_name": f"Mail Student {index}",
+                "username": f"mail_{suffix}_{index}",
+                "email": email,
+                "password": "StudentPass1",
+            },
+        ).json()["id"]
+        for index, email in enumerate(emails)
+    ]
+    result = client.post(
+        "/api/v1/admin/assignments/bulk",
+        headers=admin_headers,
+        json={"exam_ids": [exam["id"]], "student_ids": student_ids},
+    ).json()
+    (job_id,) = result["email_job_ids"]
+    (first_try,) = _jobs([job_id])
+
+    assert job_queue.process_one_job()
+    assert smtp_server.delivered == [emails[0], emails[2]]
+    (job,) = _jobs([job_id])
+    assert job.status == "queued"
+    assert job.payload["assignment_ids"] == [first_try.payload["assignment_ids"][1]]
+
+    with SessionLocal() as db:
+        db.execute(
+            update(BackgroundJob).where(BackgroundJob.id == job_id).values(available_at=job.created_at)
+        )
+        db.commit()
+    assert job_queue.process_one_job()
+    assert smtp_server.delivered == [emails[0], emails[2]]  # nobody was emailed twice
+    assert _jobs([job_id])[0].attempts == 2
+
+
+def test_sending_threads_each_use_their_own_connection(smtp_server):
+    from app.extensions.mail import build_assignment_email
+    from app.services import job_queue
+
+    session = job_queue.smtp_session
+    started = threading.Barrier(2)
+    reports = []
+
+    def send(index):
+        started.wait()
+        batch = [build_assignment_email(f"thread{index}_{n}@example.com", "A", "Quiz") for n in range(3)]
+        reports.append(session.send_batch(batch))
+
+    threads = [threading.Thread(target=send, args=(index,)) for index in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Each thread gets the report for its own batch, not whichever finished last.
+    assert [(report.messages, report.sent, report.errors) for report in reports] == [(3, 3, [None] * 3)] * 2
+    assert len(smtp_server.delivered) == 6
+    assert smtp_server.connections == 2
+    assert session.stats()["connected"] == 2
+    session.close()
+    assert session.stats()["connected"] == 0
+
+
+def test_reset_link_is_logged_when_smtp_is_not_configured(caplog):
+    from app.extensions.mail import build_assignment_email, build_password_reset_email, smtp_session
+
+    caplog.set_level("INFO", logger="app.extensions.mail")
+    smtp_session.send_batch(
+        [
+            build_password_reset_email("reset@example.com", "tok123"),
+            build_assignment_email("a@example.com", "A", "Quiz"),
+        ]
+    )
+    assert "/reset-password?token=tok123" in caplog.text
+    assert "Subject=New exam assigned: Quiz" in caplog.text
@@ -66,3 +66,128 @@ def test_generated_password_is_strong_and_unguessable():
     pwd = generate_random_password()
     assert len(pwd) >= 32
     assert generate_random_password() != generate_random_password()
+
+
+def test_repeat_decode_skips_signature_check_but_keeps_claim_checks(monkeypatch):
+    from app.config.base import get_settings
+    from app.utils import security
+
+    token = create_access_token(9, "carol", "student")
+    assert decode_access_token(token)["sub"] == 9
+
+    def fail(*_args):
+        raise AssertionError("cached token was re-verified")
+
+    monkeypatch.setattr(security, "_verify_signature", fail)
+    assert decode_access_token(token)["username"] == "carol"
+
+    monkeypatch.setattr(get_settings(), "auth_token_audience", "another-audience")
+    with pytest.raises(ValueError, match="audience"):
+        decode_access_token(token)
+
+
+def test_expired_token_is_rejected_even_when_cached(monkeypatch):
+    from app.utils import security
+
+    token = create_access_token(10, "dave", "student")
+    decode_access_token(token)
+
+    later = security.datetime.now(security.UTC) + security.timedelta(days=2)
+    monkeypatch.setattr(
+        security, "datetime", type("FrozenDatetime", (), {"now": staticmethod(lambda tz: later)})
+    )
+    with pytest.raises(ValueError, match="expired"):
+        decode_access_token(token)
+
+
+def test_token_cache_sweeps_expired_entries_and_is_keyed_by_secret(monkeypatch):
+    from app.config.base import get_settings
+    from app.utils import cache, security
+
+    security.clear_token_cache()
+    stale = create_access_token(11, "erin", "student")
+    decode_access_token(stale)
+    two_days = 2 * 24 * 3600
+    later = security.datetime.now(security.UTC) + security.timedelta(seconds=two_days)
+    monotonic_later = cache.monotonic() + two_days
+    with monkeypatch.context() as frozen:
+        frozen.setattr(
+            security, "datetime", type("FrozenDatetime", (), {"now": staticmethod(lambda tz: later)})
+        )
+        frozen.setattr(cache, "monotonic", lambda: monotonic_later)
+        frozen.setattr(get_settings(), "access_token_expire_minutes", 60 * 24 * 3)
+        fresh = create_access_token(12, "frank", "student")
+        decode_access_token(fresh)
+        assert security._verified_tokens.stats()["size"] == 1  # the expired token was swept on insert
+
+    monkeypatch.setattr(get_settings(), "auth_secret_key", "rotated-secret-key")
+    with pytest.raises(ValueError, match="Invalid token"):
+        decode_access_token(fresh)
+
+
+def test_password_hasher_process_pool_roundtrip():
+    from app.services.password_hashing import PasswordHasher
+
+    hasher = PasswordHasher(workers=1, queue_size=1, timeout_seconds=30)
+    try:
+        hashed = hasher.hash("Sup3rSecret")
+        assert hasher.verify("Sup3rSecret", hashed)
+        assert not hasher.verify("wrong", hashed)
+        assert hasher.stats()["completed"] == 3
+    finally:
+        hasher.shutdown()
+
+
+def test_password_hasher_rejects_when_saturated():
+    from app.services.password_hashing import PasswordHasher, PasswordHashingBusyError
+
+    hasher = PasswordHasher(workers=0, queue_size=0, timeout_seconds=30)
+    assert hasher._slots.acquire(blocking=False)
+    with pytest.raises(PasswordHashingBusyError):
+        hasher.hash("Sup3rSecret")
+    assert hasher.stats()["rejected"] == 1
+
+
+def test_password_hasher_keeps_slot_until_timed_out_hash_finishes():
+    import time
+
+    from app.services.password_hashing import PasswordHasher, PasswordHashingBusyError
+
+    hasher = PasswordHasher(workers=1, queue_size=0, timeout_seconds=0.05)
+    try:
+        with pytest.raises(PasswordHashingBusyError, match="timed out"):
+            hasher._run(time.sleep, 0.5)
+        stats = hasher.stats()
+        assert (stats["timed_out"], stats["completed"], stats["in_flight"]) == (1, 0, 1)
+        with pytest.raises(PasswordHashingBusyError, match="capacity"):
+            hasher.hash("Sup3rSecret")
+    finally:
+        hasher.shutdown()
+    assert hasher.stats()["in_flight"] == 0
+
+
+def test_password_hasher_hash_many_uses_bulk_pool_outside_login_limit():
+    from app.services.password_hashing import PasswordHasher
+
+    hasher = PasswordHasher(workers=1, queue_size=0, timeout_seconds=30, bulk_workers=2)
+    try:
+        # Every login slot is taken, yet the import still runs on its own pool.
+        assert hasher._slots.acquire(blocking=False)
+        passwords = ["Sup3rSecret", "0therSecret", "Thr33Secret"]
+        hashes = hasher.hash_many(passwords)
+        assert all(map(verify_password, passwords, hashes))
+        assert hasher._executor is None
+        assert hasher._bulk_executor is not None
+        stats = hasher.stats()
+        assert (stats["bulk_workers"], stats["bulk_hashed"], stats["rejected"]) == (2, 3, 0)
+    finally:
+        hasher.shutdown()
+    assert hasher._bulk_executor is None
+
+
+def test_password_hasher_bulk_workers_default_to_cpu_count(monkeypatch):
+    from app.services import password_hashing
+
+    monkeypatch.setattr(password_hashing.os, "cpu_count", lambda: 6)
+    hasher = password_hashing.PasswordHasher(workers=2, queue_size=0, timeout_seconds=30)
+    assert hasher.bulk_workers == 6
@@ -0,0 +1,743 @@
+"""Student exam flows: starting, autosaving, and submitting an attempt."""
+
+import uuid
+
+from tests.test_admin_api import _admin_headers
+
+
+def _exam_payload(title):
+    return {
+        "title": title,
+        "description": "A two-question exam used in tests.",
+        "duration_minutes": 30,
+        "questions": [
+            {
+                "question_text": "What is 2 + 2?",
+                "option_a": "3",
+                "option_b": "4",
+                "option_c": "5",
+                "option_d": "6",
+                "correct_option": "B",
+                "marks": 2,
+            },
+            {
+                "question_text": "What is 3 + 3?",
+                "option_a": "6",
+                "option_b": "7",
+                "option_c": "8",
+                "option_d": "9",
+                "correct_option": "A",
+                "marks": 3,
+            },
+        ],
+    }
+
+
+def _assigned_student(client):
+    """Create an exam and a student assigned to it.
+
+    Returns ``(student_headers, assignment_id, exam, admin_headers)``. The
+    student token is minted directly to stay clear of the login rate limit.
+    """
+    from app.utils.security import create_access_token
+
+    admin_headers = _admin_headers(client)
+    suffix = uuid.uuid4().hex[:8]
+    student = client.post(
+        "/api/v1/admin/students",
+        headers=admin_headers,
+        json={
+            "full_name": "Exam Taker",
+            "username": f"taker_{suffix}",
+            "email": f"taker_{suffix}@example.com",
+            "password": "StudentPass1",
+        },
+    ).json()
+    exam = client.post(
+        "/api/v1/admin/exams", headers=admin_headers, json=_exam_payload(f"Student Exam {suffix}")
+    ).json()
+    assignment = client.post(
+        "/api/v1/admin/assignments",
+        headers=admin_headers,
+        json={"exam_id": exam["id"], "student_id": student["id"]},
+    ).json()
+    token = create_access_token(student["id"], student["username"], "student", 0)
+    return {"Authorization": f"Bearer {token}"}, assignment["id"], exam, admin_headers
+
+
+def test_start_exam_serves_cached_paper_and_resumes_attempt(client):
+    from app.services.exam_paper_cache import exam_paper_cache
+
+    headers, assignment_id, exam, _ = _assigned_student(client)
+
+    started = client.post(f"/api/v1/student/assignments/{assignment_id}/start", headers=headers)
+    assert started.status_code == 200, started.text
+    body = started.json()
+    assert body["question_count"] == 2
+    assert all("correct_option" not in question for question in body["questions"])
+    question_ids = [question["id"] for question in body["questions"]]
+    assert question_ids == sorted(question["id"] for question in exam["questions"])
+
+    saved = client.put(
+        f"/api/v1/student/attempts/{body['attempt_id']}/answers",
+        headers=headers,
+        json={"answers": [{"question_id": question_ids[0], "selected_option": "B"}]},
+    )
+    assert saved.status_code == 200, saved.text
+
+    hits_before = exam_paper_cache.hits
+    resumed = client.post(f"/api/v1/student/assignments/{assignment_id}/start", headers=headers).json()
+    assert exam_paper_cache.hits == hits_before + 1
+    assert resumed["attempt_id"] == body["attempt_id"]
+    assert resumed["current_question_index"] == 1
+    assert resumed["saved_answers"] == [{"question_id": question_ids[0], "selected_option": "B"}]
+
+
+def test_submit_attempt_grades_answers(client):
+    headers, assignment_id, exam, _ = _assigned_student(client)
+    attempt = client.post(f"/api/v1/student/assignments/{assignment_id}/start", headers=headers).json()
+    first, second = (question["id"] for question in attempt["questions"])
+
+    result = client.post(
+        f"/api/v1/student/attempts/{attempt['attempt_id']}/submit",
+        headers=headers,
+        json={
+            "answers": [
+                {"question_id": first, "selected_option": "B"},
+                {"question_id": second, "selected_option": "D"},
+            ]
+        },
+    )
+    assert result.status_code == 200, result.text
+    data = result.json()
+    assert (data["score"], data["total_marks"], data["percentage"]) == (2, 5, 40.0)
+    assert data["status"] == "submitted"
+
+    again = client.post(f"/api/v1/student/assignments/{assignment_id}/start", headers=headers)
+    assert again.status_code == 409
+
+
+def test_submit_keeps_the_last_answer_for_a_repeated_question(client, monkeypatch):
+    from app.modules.student import routes
+
+    headers, assignment_id, _, _ = _assigned_student(client)
+    attempt = client.post(f"/api/v1/student/assignments/{assignment_id}/start", headers=headers).json()
+    first, second = (question["id"] for question in attempt["questions"])
+    upsert_answers = routes.upsert_answers
+    sent = []
+
+    def recording_upsert(db, answers):
+        rows = list(answers)
+        sent.append(rows)
+        return upsert_answers(db, rows)
+
+    monkeypatch.setattr(routes, "upsert_answers", recording_upsert)
+    result = client.post(
+        f"/api/v1/student/attempts/{attempt['attempt_id']}/submit",
+        headers=headers,
+        json={
+            "answers": [
+                {"question_id": first, "selected_option": "A"},
+                {"question_id": second, "selected_option": "D"},
+                {"question_id": first, "selected_option": "B"},
+            ]
+        },
+    )
+    assert result.status_code == 200, result.text
+    # PostgreSQL rejects an upsert that touches the same row twice.
+    assert sent == [[(attempt["attempt_id"], first, "B"), (attempt["attempt_id"], second, "D")]]
+    assert result.json()["score"] == 2
+
+
+def test_concurrent_submit_is_counted_once(client, monkeypatch):
+    from sqlalchemy import select, update
+
+    from app.extensions.db import SessionLocal
+    from app.models.analytics import ExamRollup
+    from app.models.exam import ExamAttempt
+    from app.models.job import BackgroundJob
+    from app.modules.student import routes
+
+    headers, assignment_id, exam, _ = _assigned_student(client)
+    attempt = client.post(f"/api/v1/student/assignments/{assignment_id}/start", headers=headers).json()
+    attempt_id = attempt["attempt_id"]
+
+    def rollup_and_reports():
+        with SessionLocal() as db:
+            rollup = db.get(ExamRollup, exam["id"])
+            reports = [
+                job.payload["attempt_id"]
+                for job in db.scalars(select(BackgroundJob).where(BackgroundJob.job_type == "attempt_report"))
+            ]
+            return (rollup.in_progress, rollup.submitted), reports.count(attempt_id)
+
+    before = rollup_and_reports()
+    real_upsert = routes.upsert_answers
+
+    def submitted_meanwhile(db, rows):
+        # Another request submits the attempt after this one checked its status.
+        with SessionLocal() as other:
+            other.execute(update(ExamAttempt).where(ExamAttempt.id == attempt_id).values(status="submitted"))
+            other.commit()
+        return real_upsert(db, rows)
+
+    monkeypatch.setattr(routes, "upsert_answers", submitted_meanwhile)
+    question_id = attempt["questions"][0]["id"]
+    late = client.post(
+        f"/api/v1/student/attempts/{attempt_id}/submit",
+        headers=headers,
+        json={"answers": [{"question_id": question_id, "selected_option": "B"}]},
+    )
+    assert late.status_code == 409, late.text
+    assert rollup_and_reports() == before
+
+
+def test_delta_autosave_upserts_and_acknowledges(client):
+    headers, assignment_id, _, _ = _assigned_student(client)
+    attempt = client.post(f"/api/v1/student/assignments/{assignment_id}/start", headers=headers).json()
+    attempt_id = attempt["attempt_id"]
+    first, second = (question["id"] for question in attempt["questions"])
+    url = f"/api/v1/student/attempts/{attempt_id}/answers"
+
+    def answer(question_id, option):
+        return {"answers": [{"question_id": question_id, "selected_option": option}]}
+
+    ack = client.patch(url, headers=headers, json=answer(first, "A"))
+    assert ack.status_code == 200, ack.text
+    assert ack.json() == {"attempt_id": attempt_id, "saved": 1}
+
+    # Re-answering the same question updates the row instead of adding another.
+    client.patch(url, headers=headers, json=answer(first, "C"))
+    client.patch(url, headers=headers, json=answer(second, "A"))
+    resumed = client.post(f"/api/v1/student/assignments/{assignment_id}/start", headers=headers).json()
+    assert resumed["saved_answers"] == [
+        {"question_id": first, "selected_option": "C"},
+        {"question_id": second, "selected_option": "A"},
+    ]
+
+    foreign = client.patch(url, headers=headers, json=answer(10**9, "A"))
+    assert foreign.status_code == 400
+
+    client.post(f"/api/v1/student/attempts/{attempt_id}/submit", headers=headers, json={"answers": []})
+    closed = client.patch(url, headers=headers, json=answer(first, "B"))
+    assert closed.status_code == 409
+
+
+def _stored_answers(attempt_id):
+    from sqlalchemy import select
+
+    from app.extensions.db import SessionLocal
+    from app.models.exam import AttemptAnswer
+
+    with SessionLocal() as db:
+        return dict(
+            db.execute(
+                select(AttemptAnswer.question_id, AttemptAnswer.selected_option).where(
+                    AttemptAnswer.attempt_id == attempt_id
+                )
+            ).all()
+        )
+
+
+def test_write_behind_autosave_buffers_until_flush_and_submit(client, monkeypatch, tmp_path):
+    from app.services.autosave_buffer import SqliteAnswerStore, autosave_buffer
+
+    monkeypatch.setattr(autosave_buffer, "enabled", True)
+    monkeypatch.setattr(autosave_buffer, "store", SqliteAnswerStore(str(tmp_path / "autosave.db")))
+    headers, assignment_id, _, admin_headers = _assigned_student(client)
+    attempt = client.post(f"/api/v1/student/assignments/{assignment_id}/start", headers=headers).json()
+    attempt_id = attempt["attempt_id"]
+    first, second = (question["id"] for question in attempt["questions"])
+    url = f"/api/v1/student/attempts/{attempt_id}/answers"
+
+    def answer(question_id, option):
+        return {"answers": [{"question_id": question_id, "selected_option": option}]}
+
+    ack = client.patch(url, headers=headers, json=answer(first, "B"))
+    assert ack.json() == {"attempt_id": attempt_id, "saved": 1}
+    assert _stored_answers(attempt_id) == {}
+    full = client.put(url, headers=headers, json=answer(second, "C"))
+    assert full.json() == [
+        {"question_id": first, "selected_option": "B"},
+        {"question_id": second, "selected_option": "C"},
+    ]
+    metrics = client.get("/api/v1/admin/metrics", headers=admin_headers).json()["autosave_buffer"]
+    assert metrics["enabled"] is True
+    assert metrics["buffered"] >= 2
+
+    # Submitting flushes the attempt first, so the buffered answers are graded.
+    submit_url = f"/api/v1/student/attempts/{attempt_id}/submit"
+    result = client.post(submit_url, headers=headers, json={"answers": []})
+    assert result.json()["score"] == 2
+    assert _stored_answers(attempt_id) == {first: "B", second: "C"}
+    assert autosave_buffer.pending_answers(attempt_id) == {}
+
+
+def test_sqlite_autosave_store_survives_restart(client, tmp_path):
+    from app.services.autosave_buffer import AutosaveBuffer, SqliteAnswerStore
+
+    headers, assignment_id, _, _ = _assigned_student(client)
+    attempt = client.post(f"/api/v1/student/assignments/{assignment_id}/start", headers=headers).json()
+    attempt_id = attempt["attempt_id"]
+    first, second = (question["id"] for question in attempt["questions"])
+    path = str(tmp_path / "autosave.db")
+
+    SqliteAnswerStore(path).add(attempt_id, {first: "A", second: "D"})
+
+    # A new process opening the same file recovers and flushes the answers.
+    recovered = AutosaveBuffer(SqliteAnswerStore(path), enabled=True, flush_interval=60)
+    assert recovered.stats()["buffered"] == 2
+    assert recovered.flush() == 2
+    assert _stored_answers(attempt_id) == {first: "A", second: "D"}
+    assert recovered.stats()["buffered"] == 0
+
+
+def test_autosave_buffers_sharing_a_store_never_flush_the_same_entries(client, tmp_path):
+    import threading
+
+    from app.extensions.db import SessionLocal
+    from app.services.autosave_buffer import AutosaveBuffer, SqliteAnswerStore
+
+    headers, assignment_id, _, _ = _assigned_student(client)
+    attempt = client.post(f"/api/v1/student/assignments/{assignment_id}/start", headers=headers).json()
+    attempt_id = attempt["attempt_id"]
+    first, second = (question["id"] for question in attempt["questions"])
+    path = str(tmp_path / "autosave.db")
+    other = AutosaveBuffer(SqliteAnswerStore(path), enabled=True, flush_interval=60)
+    waiting = threading.Thread(target=other.flush, args=(attempt_id,))
+
+    def session_mid_flush():
+        # The first buffer holds its claim here: the second finds nothing to
+        # write, and a flush for this attempt waits until the claim is acked.
+        assert other.flush() == 0
+        waiting.start()
+        waiting.join(timeout=0.2)
+        assert waiting.is_alive()
+        return SessionLocal()
+
+    buffer = AutosaveBuffer(
+        SqliteAnswerStore(path), enabled=True, flush_interval=60, session_factory=session_mid_flush
+    )
+    buffer.add(attempt_id, {first: "B", second: "C"})
+    assert buffer.flush() == 2
+    waiting.join(timeout=5)
+    assert not waiting.is_alive()
+    assert (buffer.stats()["flushes"], other.stats()["flushes"]) == (1, 0)
+    assert _stored_answers(attempt_id) == {first: "B", second: "C"}
+    assert other.stats()["buffered"] == 0
+
+
+def test_write_behind_autosave_requires_a_shared_buffer_store(tmp_path):
+    import pytest
+    from pydantic import ValidationError
+
+    from app.config.base import Settings
+
+    with pytest.raises(ValidationError, match="AUTOSAVE_BUFFER_PATH"):
+        Settings(autosave_write_behind=True, autosave_buffer_path="")
+    path = str(tmp_path / "autosave.db")
+    assert Settings(autosave_write_behind=True, autosave_buffer_path=path).autosave_buffer_path == path
+
+
+def test_autosave_store_keeps_answers_overwritten_during_flush(tmp_path):
+    from app.services.autosave_buffer import MemoryAnswerStore, SqliteAnswerStore
+
+    for store in (MemoryAnswerStore(), SqliteAnswerStore(str(tmp_path / "autosave.db"))):
+        store.add(1, {10: "A", 11: "B"})
+        claim, flushed = store.claim()
+        store.add(1, {10: "C"})
+        # The newer value waits for the flush holding the older one to finish.
+        assert store.claim()[1] == []
+        store.ack(claim, flushed)
+        assert [entry[:3] for entry in store.pending()] == [(1, 10, "C")]
+
+        # A deleted entry written again still gets a newer seq than any before it.
+        claim, flushed = store.claim()
+        store.add(1, {11: "D"})
+        store.ack(claim, flushed)
+        assert store.pending()[0][3] > flushed[0][3]
+
+
+def test_grade_attempts_regrades_after_answer_key_change(client):
+    from sqlalchemy import select, update
+
+    from app.extensions.db import SessionLocal
+    from app.models.exam import AttemptAnswer, ExamAttempt, ExamQuestion
+    from app.services.grading import grade_attempts
+
+    headers, assignment_id, _, _ = _assigned_student(client)
+    attempt = client.post(f"/api/v1/student/assignments/{assignment_id}/start", headers=headers).json()
+    attempt_id = attempt["attempt_id"]
+    first, second = (question["id"] for question in attempt["questions"])
+    client.post(
+        f"/api/v1/student/attempts/{attempt_id}/submit",
+        headers=headers,
+        json={
+            "answers": [
+                {"question_id": first, "selected_option": "B"},
+                {"question_id": second, "selected_option": "D"},
+            ]
+        },
+    )
+
+    with SessionLocal() as db:
+        db.execute(update(ExamQuestion).where(ExamQuestion.id == second).values(correct_option="D", marks=5))
+        (graded,) = grade_attempts(db, [attempt_id])
+        db.commit()
+        assert (graded.score, graded.total_marks, graded.percentage) == (7, 7, 100.0)
+        stored = db.get(ExamAttempt, attempt_id)
+        assert (stored.score, stored.total_marks, float(stored.percentage)) == (7, 7, 100.0)
+        marks = dict(
+            db.execute(
+                select(AttemptAnswer.question_id, AttemptAnswer.marks_awarded).where(
+                    AttemptAnswer.attempt_id == attempt_id
+                )
+            ).all()
+        )
+        assert marks == {first: 2, second: 5}
+
+
+def test_regrade_exam_job_rescores_submitted_attempts(client, monkeypatch):
+    from sqlalchemy import update
+
+    from app.config.base import get_settings
+    from app.extensions.db import SessionLocal
+    from app.models.exam import ExamQuestion
+    from tests.test_admin_api import _drain_jobs
+
+    monkeypatch.setattr(get_settings(), "regrade_chunk_size", 1)
+    headers, assignment_id, exam, admin_headers = _assigned_student(client)
+    attempt = client.post(f"/api/v1/student/assignments/{assignment_id}/start", headers=headers).json()
+    first, second = (question["id"] for question in attempt["questions"])
+    client.post(
+        f"/api/v1/student/attempts/{attempt['attempt_id']}/submit",
+        headers=headers,
+        json={"answers": [{"question_id": second, "selected_option": "B"}]},
+    )
+    _drain_jobs()  # the attempt's report is stored with the original score
+    with SessionLocal() as db:
+        db.execute(update(ExamQuestion).where(ExamQuestion.id == second).values(correct_option="B"))
+        db.commit()
+
+    queued = client.post(f"/api/v1/admin/exams/{exam['id']}/regrade", headers=admin_headers)
+    assert queued.status_code == 202, queued.text
+    assert queued.json()["job_type"] == "regrade_exam"
+    _drain_jobs()
+
+    jobs = client.get("/api/v1/admin/jobs", headers=admin_headers).json()
+    job = next(job for job in jobs if job["id"] == queued.json()["id"])
+    assert job["status"] == "completed"
+    assert job["result"]["total_attempts"] == 1
+    assert (job["result"]["processed"], job["result"]["rescored"]) == (1, 1)
+    history = client.get("/api/v1/student/attempts/history", headers=headers).json()
+    assert (history[0]["score"], history[0]["percentage"]) == (3, 60.0)
+    reports = client.get("/api/v1/admin/reports", headers=admin_headers, params={"exam_id": exam["id"]})
+    (report,) = reports.json()
+    assert (report["score"], report["percentage"], report["correct_answers"]) == (3, 60.0, 1)
+
+    missing = client.post("/api/v1/admin/exams/999999/regrade", headers=admin_headers)
+    assert missing.status_code == 404
+
+
+def test_analytics_counts_each_assignment_by_its_latest_attempt(client):
+    from app.cli import main as cli
+    from app.extensions.db import SessionLocal
+    from app.models.exam import AttemptStatus, ExamAssignment, ExamAttempt
+    from app.models.user import User, UserRole
+    from app.services.analytics import compute_admin_analytics
+
+    _, _, exam, admin_headers = _assigned_student(client)
+    with SessionLocal() as db:
+        before = compute_admin_analytics(db)
+        suffix = uuid.uuid4().hex[:8]
+        students = [
+            User(
+                full_name=f"Analytics Student {index}",
+                username=f"analytics_{suffix}_{index}",
+                email=f"analytics_{suffix}_{index}@example.com",
+                password_hash="unused",
+                role=UserRole.student,
+            )
+            for index in range(3)
+        ]
+        db.add_all(students)
+        db.flush()
+        retaken, submitted, _pending = (
+            ExamAssignment(exam_id=exam["id"], student_id=student.id) for student in students
+        )
+        db.add_all([retaken, submitted, _pending])
+        db.flush()
+        db.add_all(
+            [
+                ExamAttempt(
+                    assignment_id=retaken.id,
+                    student_id=retaken.student_id,
+                    status=AttemptStatus.submitted,
+                    percentage=90,
+                ),
+                ExamAttempt(
+                    assignment_id=submitted.id,
+                    student_id=submitted.student_id,
+                    status=AttemptStatus.submitted,
+                    percentage=40,
+                ),
+            ]
+        )
+        db.flush()
+        # The newest attempt of a retaken assignment decides its status.
+        db.add(
+            ExamAttempt(
+                assignment_id=retaken.id, student_id=retaken.student_id, status=AttemptStatus.in_progress
+            )
+        )
+        db.commit()
+        after = compute_admin_analytics(db)
+
+    delta = {key: getattr(after.assignments, key) - value for key, value in before.assignments}
+    assert delta == {"total": 3, "pending": 1, "in_progress": 1, "submitted": 1}
+    assert after.results.submitted_attempts == before.results.submitted_attempts + 1
+    assert after.results.lowest_score <= 40
+
+    # Rows written behind the API's back only reach the rollups through a rebuild.
+    assert cli(["rebuild-analytics"]) == 0
+    served = client.get("/api/v1/admin/analytics", headers=admin_headers).json()
+    assert served == after.model_dump()
+
+
+def test_analytics_rollups_track_api_changes(client):
+    from app.cli import main as cli
+    from app.extensions.db import SessionLocal
+    from app.services.analytics import compute_admin_analytics
+
+    assert cli(["rebuild-analytics"]) == 0
+    headers, assignment_id, exam, admin_headers = _assigned_student(client)
+    attempt = client.post(f"/api/v1/student/assignments/{assignment_id}/start", headers=headers).json()
+    first = attempt["questions"][0]["id"]
+    client.post(
+        f"/api/v1/student/attempts/{attempt['attempt_id']}/security-incidents",
+        headers=headers,
+        json={"incident_type": "tab_switch", "detail": "Left the exam tab"},
+    )
+    client.post(
+        f"/api/v1/student/attempts/{attempt['attempt_id']}/submit",
+        headers=headers,
+        json={"answers": [{"question_id": first, "selected_option": "B"}]},
+    )
+    other_headers, other_assignment, _, _ = _assigned_student(client)
+    client.post(f"/api/v1/student/assignments/{other_assignment}/start", headers=other_headers)
+    _, dropped_assignment, _, _ = _assigned_student(client)
+    client.delete(f"/api/v1/admin/assignments/{dropped_assignment}", headers=admin_headers)
+
+    served = client.get("/api/v1/admin/analytics", headers=admin_headers).json()
+    with SessionLocal() as db:
+        assert served == compute_admin_analytics(db).model_dump()
+    dashboard = client.get("/api/v1/admin/dashboard", headers=admin_headers).json()
+    assert dashboard["total_assignments"] == served["assignments"]["total"]
+    assert dashboard["completed_attempts"] == served["results"]["submitted_attempts"]
+
+
+def test_student_summary_is_cached_and_invalidated_on_start_and_submit(client, monkeypatch):
+    from app.services.student_summary import student_summary_cache
+
+    monkeypatch.setattr(student_summary_cache, "max_entries", 100)
+    headers, assignment_id, exam, _ = _assigned_student(client)
+
+    dashboard = client.get("/api/v1/student/dashboard", headers=headers).json()
+    assert dashboard == {"assigned_exams": 1, "completed_exams": 0, "pending_exams": 1, "average_score": 0}
+    hits = student_summary_cache.hits
+    (assignment,) = client.get("/api/v1/student/assignments", headers=headers).json()
+    assert student_summary_cache.hits == hits + 1
+    assert (assignment["assignment_id"], assignment["exam_id"]) == (assignment_id, exam["id"])
+    assert assignment["status"] is None
+
+    attempt = client.post(f"/api/v1/student/assignments/{assignment_id}/start", headers=headers).json()
+    (assignment,) = client.get("/api/v1/student/assignments", headers=headers).json()
+    assert (assignment["attempt_id"], assignment["status"]) == (attempt["attempt_id"], "in_progress")
+
+    first = attempt["questions"][0]["id"]
+    client.post(
+        f"/api/v1/student/attempts/{attempt['attempt_id']}/submit",
+        headers=headers,
+        json={"answers": [{"question_id": first, "selected_option": "B"}]},
+    )
+    dashboard = client.get("/api/v1/student/dashboard", headers=headers).json()
+    assert dashboard == {"assigned_exams": 1, "completed_exams": 1, "pending_exams": 0, "average_score": 40.0}
+
+
+def test_assignment_and_incident_lists_filter_by_exam_and_status(client):
+    headers, assignment_id, exam, admin_headers = _assigned_student(client)
+    exam_filter = {"exam_id": exam["id"]}
+
+    pending = client.get(
+        "/api/v1/admin/assignments", headers=admin_headers, params={**exam_filter, "status": "pending"}
+    ).json()
+    assert [item["id"] for item in pending] == [assignment_id]
+
+    attempt_id = client.post(f"/api/v1/student/assignments/{assignment_id}/start", headers=headers).json()[
+        "attempt_id"
+    ]
+    for incident_type in ("tab_switch", "copy_attempt", "tab_switch"):
+        logged = client.post(
+            f"/api/v1/student/attempts/{attempt_id}/security-incidents",
+            headers=headers,
+            json={"incident_type": incident_type},
+        )
+        assert logged.status_code in (200, 201), logged.text
+
+    for status, expected in (("pending", []), ("in_progress", [assignment_id]), ("submitted", [])):
+        listed = client.get(
+            "/api/v1/admin/assignments", headers=admin_headers, params={**exam_filter, "status": status}
+        ).json()
+        assert [item["id"] for item in listed] == expected, status
+
+    first = client.get(
+        "/api/v1/admin/security-incidents", headers=admin_headers, params={**exam_filter, "limit": 2}
+    )
+    assert len(first.json()) == 2
+    rest = client.get(
+        "/api/v1/admin/security-incidents",
+        headers=admin_headers,
+        params={**exam_filter, "limit": 2, "after": first.headers["X-Next-Cursor"]},
+    )
+    assert "X-Next-Cursor" not in rest.headers
+    incident_ids = [item["id"] for item in first.json() + rest.json()]
+    assert len(set(incident_ids)) == 3
+    tab_switches = client.get(
+        "/api/v1/admin/security-incidents",
+        headers=admin_headers,
+        params={**exam_filter, "incident_type": "tab_switch"},
+    ).json()
+    assert len(tab_switches) == 2
+
+    history = client.get("/api/v1/student/attempts/history", headers=headers, params=exam_filter).json()
+    assert [item["attempt_id"] for item in history] == [attempt_id]
+
+
+def test_bulk_assignment_skips_existing_pairs_and_batches_emails(client, monkeypatch):
+    from sqlalchemy import select
+
+    from app.config.base import get_settings
+    from app.extensions.db import SessionLocal
+    from app.models.analytics import ExamRollup
+    from app.models.audit import AuditEvent
+    from tests.test_admin_api import _drain_jobs
+
+    monkeypatch.setattr(get_settings(), "assignment_email_batch_size", 2)
+    _, assignment_id, exam, admin_headers = _assigned_student(client)
+    suffix = uuid.uuid4().hex[:8]
+    student_ids = [
+        client.post(
+            "/api/v1/admin/students",
+            headers=admin_headers,
+            json={
+                "full_name": f"Cohort Student {index}",
+                "username": f"cohort_{suffix}_{index}",
+                "email": f"cohort_{suffix}_{index}@example.com",
+                "password": "StudentPass1",
+            },
+        ).json()["id"]
+        for index in range(3)
+    ]
+    existing = client.get("/api/v1/admin/assignments", headers=admin_headers, params={"exam_id": exam["id"]})
+    already_assigned = existing.json()[0]["student_id"]
+
+    response = client.post(
+        "/api/v1/admin/assignments/bulk",
+        headers=admin_headers,
+        json={"exam_ids": [exam["id"]], "student_ids": [*student_ids, already_assigned, student_ids[0]]},
+    )
+    assert response.status_code == 201, response.text
+    result = response.json()
+    assert (result["created"], result["skipped"]) == (3, 1)
+    assert len(result["email_job_ids"]) == 2
+
+    again = client.post(
+        "/api/v1/admin/assignments/bulk",
+        headers=admin_headers,
+        json={"exam_ids": [exam["id"]], "student_ids": student_ids},
+    ).json()
+    assert (again["created"], again["skipped"], again["email_job_ids"]) == (0, 3, [])
+
+    listed = client.get("/api/v1/admin/assignments", headers=admin_headers, params={"exam_id": exam["id"]})
+    assert sorted(item["student_id"] for item in listed.json()) == sorted([already_assigned, *student_ids])
+    with SessionLocal() as db:
+        assert db.get(ExamRollup, exam["id"]).assignments == 4
+        audits = db.scalars(
+            select(AuditEvent).where(AuditEvent.action == "assignment.bulk_create").order_by(AuditEvent.id)
+        ).all()
+        assert audits[-2].detail["created"] == 3
+
+    _drain_jobs()
+    jobs = {job["id"]: job for job in client.get("/api/v1/admin/jobs", headers=admin_headers).json()}
+    assert sum(jobs[job_id]["result"]["sent"] for job_id in result["email_job_ids"]) == 3
+
+    missing = client.post(
+        "/api/v1/admin/assignments/bulk",
+        headers=admin_headers,
+        json={"exam_ids": [exam["id"]], "student_ids": [999999]},
+    )
+    assert missing.status_code == 404
+    assert assignment_id in {item["id"] for item in listed.json()}
+
+
+def test_attempt_reports_are_generated_together_and_listed(client, monkeypatch):
+    from app.extensions.db import SessionLocal
+    from app.models.job import BackgroundJob, JobStatus
+    from app.services import job_queue
+    from app.services.attempt_reports import build_attempt_reports
+    from tests.test_admin_api import _drain_jobs
+
+    _drain_jobs()
+    submitted = []
+    for selections in (("B", "A"), ("C",)):
+        headers, assignment_id, exam, admin_headers = _assigned_student(client)
+        attempt = client.post(f"/api/v1/student/assignments/{assignment_id}/start", headers=headers).json()
+        answers = [
+            {"question_id": question["id"], "selected_option": option}
+            for question, option in zip(attempt["questions"], selections, strict=False)
+        ]
+        response = client.post(
+            f"/api/v1/student/attempts/{attempt['attempt_id']}/submit",
+            headers=headers,
+            json={"answers": answers},
+        )
+        assert response.status_code == 200, response.text
+        submitted.append((attempt["attempt_id"], exam))
+    with SessionLocal() as db:
+        missing_job_id = job_queue.enqueue_attempt_report(db, attempt_id=0).id
+        db.commit()
+    batches = []
+
+    def spy(db, attempt_ids):
+        batches.append(sorted(attempt_ids))
+        return build_attempt_reports(db, attempt_ids)
+
+    monkeypatch.setattr(job_queue, "build_attempt_reports", spy)
+    _drain_jobs()
+    assert batches == [sorted([0, *(attempt_id for attempt_id, _ in submitted)])]
+
+    (full_id, full_exam), (partial_id, partial_exam) = submitted
+    with SessionLocal() as db:
+        assert db.get(BackgroundJob, missing_job_id).status == JobStatus.queued  # retried later
+
+    listed = client.get("/api/v1/admin/reports", headers=admin_headers, params={"limit": 1})
+    assert listed.status_code == 200, listed.text
+    assert [report["attempt_id"] for report in listed.json()] == [partial_id]  # newest first
+    assert listed.headers["X-Next-Cursor"]
+
+    full = client.get(
+        "/api/v1/admin/reports", headers=admin_headers, params={"exam_id": full_exam["id"]}
+    ).json()
+    assert len(full) == 1
+    assert full[0]["attempt_id"] == full_id
+    assert full[0]["exam_title"] == full_exam["title"]
+    assert (full[0]["score"], full[0]["percentage"]) == (5, 100.0)
+    assert (full[0]["answered_questions"], full[0]["correct_answers"]) == (2, 2)
+
+    partial_student_id = listed.json()[0]["student_id"]
+    partial = client.get(
+        "/api/v1/admin/reports", headers=admin_headers, params={"student_id": partial_student_id}
+    ).json()
+    assert len(partial) == 1
+    assert partial[0]["exam_id"] == partial_exam["id"]
+    assert (partial[0]["answered_questions"], partial[0]["correct_answers"]) == (1, 0)
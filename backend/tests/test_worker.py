@@ -0,0 +1,307 @@
+"""Background worker: wake-up on enqueue, the polling fallback and the worker pool."""
+
+import threading
+import time
+from collections import Counter
+
+import pytest
+
+
+def test_job_wakeup_listens_only_on_postgresql():
+    from app.services.job_notify import JobWakeup
+
+    wakeup = JobWakeup("postgresql+psycopg://portal:s3cret@db:5432/portal?sslmode=require")
+    assert wakeup.listening
+    assert wakeup._conninfo == "postgresql://portal:s3cret@db:5432/portal?sslmode=require"
+
+    polling = JobWakeup("sqlite+pysqlite:///./portal.db")
+    assert not polling.listening
+    started = time.perf_counter()
+    assert polling.wait(0.05) is False
+    assert time.perf_counter() - started >= 0.05
+
+
+def _queue_jobs(job_type, count):
+    from app.extensions.db import SessionLocal
+    from app.services.job_queue import enqueue_job
+
+    with SessionLocal() as db:
+        payloads = [{"attempt_id": index, "exam_id": index} for index in range(count)]
+        ids = [enqueue_job(db, job_type, payload).id for payload in payloads]
+        db.commit()
+    return ids
+
+
+def _job_states(job_ids):
+    from app.extensions.db import SessionLocal
+    from app.models.job import BackgroundJob
+
+    with SessionLocal() as db:
+        jobs = [db.get(BackgroundJob, job_id) for job_id in job_ids]
+        return [(job.status.value, job.attempts) for job in jobs]
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+class _ConcurrencyProbe:
+    """Stands in for a job body: records how many copies run at once."""
+
+    def __init__(self, seconds=0.05, gate=None):
+        self.seconds = seconds
+        self.gate = gate
+        self.lock = threading.Lock()
+        self.active = Counter()
+        self.peak = Counter()
+
+    def __call__(self, job_type):
+        with self.lock:
+            self.active[job_type] += 1
+            self.active["all"] += 1
+            for key in (job_type, "all"):
+                self.peak[key] = max(self.peak[key], self.active[key])
+        if self.gate is not None:
+            self.gate.wait(5)
+        time.sleep(self.seconds)
+        with self.lock:
+            self.active[job_type] -= 1
+            self.active["all"] -= 1
+        return {"ok": True}
+
+
+@pytest.fixture
+def probe(client, monkeypatch):
+    from app.config.base import get_settings
+    from app.services import job_queue
+    from tests.test_admin_api import _drain_jobs
+
+    _drain_jobs()
+    monkeypatch.setattr(get_settings(), "job_archive_interval_seconds", 0)
+    probe = _ConcurrencyProbe()
+    monkeypatch.setattr(job_queue, "run_student_import", lambda db, job, chunk_size: probe("import_students"))
+    monkeypatch.setattr(job_queue, "run_exam_regrade", lambda db, job, chunk_size: probe("regrade_exam"))
+    return probe
+
+
+def _start(pool):
+    thread = threading.Thread(target=pool.run, daemon=True)
+    thread.start()
+    return thread
+
+
+def test_pool_runs_jobs_concurrently_within_type_limits(probe):
+    from app.services.worker_pool import WorkerPool
+
+    job_ids = _queue_jobs("regrade_exam", 4) + _queue_jobs("import_students", 8)
+    pool = WorkerPool(slots=4, job_type_limits={"regrade_exam": 1}, poll_interval=0.01)
+    thread = _start(pool)
+    _wait_for(lambda: all(status == "completed" for status, _ in _job_states(job_ids)))
+    pool.stop()
+    thread.join(5)
+
+    assert not thread.is_alive()
+    assert probe.peak["regrade_exam"] == 1
+    assert probe.peak["all"] > 1
+    assert pool.tasks_completed == 12
+
+
+def test_stop_finishes_in_flight_jobs_and_releases_prefetched(probe):
+    from app.services.worker_pool import WorkerPool
+
+    probe.gate = threading.Event()
+    job_ids = _queue_jobs("import_students", 3)
+    pool = WorkerPool(slots=1, prefetch=2, poll_interval=0.01)
+    thread = _start(pool)
+    _wait_for(lambda: all(status == "running" for status, _ in _job_states(job_ids)))
+    pool.stop()
+    probe.gate.set()
+    thread.join(5)
+
+    assert not thread.is_alive()
+    assert _job_states(job_ids) == [("completed", 1), ("queued", 0), ("queued", 0)]
+    assert probe.peak["all"] == 1
+
+
+def test_job_type_limits_are_parsed_from_the_environment():
+    from app.worker import parse_job_type_limits
+
+    assert parse_job_type_limits("") == {}
+    limits = parse_job_type_limits(" regrade_exam=1, import_students=2 ")
+    assert limits == {"regrade_exam": 1, "import_students": 2}
+    with pytest.raises(ValueError):
+        parse_job_type_limits("regrade_exam")
+
+
+def test_claim_jobs_claims_a_batch_oldest_first(client):
+    from sqlalchemy import event
+
+    from app.extensions.db import SessionLocal, engine
+    from app.services.job_queue import claim_jobs, claim_tasks
+    from tests.test_admin_api import _drain_jobs
+
+    _drain_jobs()
+    reports = _queue_jobs("attempt_report", 3)
+    emails = _queue_jobs("password_reset_email", 4)
+
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement.split(None, 1)[0])
+
+    with SessionLocal() as db:
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            claimed = claim_jobs(db, 2, ["attempt_report"])
+            assert [job.id for job in claimed] == reports[:2]
+            assert all(job.status.value == "running" and job.attempts == 1 for job in claimed)
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+        assert statements == ["UPDATE"]  # one round trip claims and loads the batch
+
+        # The email batch is topped up past the requested unit count.
+        tasks = claim_tasks(db, 2)
+        assert [[job.id for job in task] for task in tasks] == [reports[2:], emails]
+        assert claim_jobs(db, 10) == []
+    assert _job_states(reports + emails) == [("running", 1)] * 7
+
+
+def test_archive_job_moves_old_finished_jobs_out_of_the_queue(client, monkeypatch):
+    from datetime import UTC, datetime, timedelta
+
+    from app.config.base import get_settings
+    from app.extensions.db import SessionLocal
+    from app.models.job import ArchivedBackgroundJob, BackgroundJob, JobStatus
+    from app.services.job_queue import schedule_job_archive
+    from tests.test_admin_api import _drain_jobs
+
+    _drain_jobs()
+    monkeypatch.setattr(get_settings(), "job_archive_batch_size", 2)
+    long_ago = datetime.now(UTC) - timedelta(days=30)
+
+    def job(status, updated_at=long_ago, job_type="import_students"):
+        return BackgroundJob(job_type=job_type, status=status, payload={"n": 1}, updated_at=updated_at)
+
+    with SessionLocal() as db:
+        old = [job(JobStatus.completed) for _ in range(4)] + [job(JobStatus.failed) for _ in range(2)]
+        kept = [job(JobStatus.completed, updated_at=datetime.now(UTC)), job(JobStatus.running)]
+        db.add_all(old + kept)
+        scheduled = schedule_job_archive(db)
+        assert schedule_job_archive(db) is None  # one run at a time
+        db.commit()
+        old_ids, kept_ids, archive_id = [row.id for row in old], [row.id for row in kept], scheduled.id
+
+    _drain_jobs()
+
+    with SessionLocal() as db:
+        assert db.get(BackgroundJob, archive_id).result == {"archived": 6, "batches": 3, "retention_days": 14}
+        archived = db.query(ArchivedBackgroundJob).filter(ArchivedBackgroundJob.id.in_(old_ids)).all()
+        assert sorted(row.id for row in archived) == old_ids
+        assert [row.status for row in archived].count(JobStatus.failed) == 2
+        assert all(row.payload == {"n": 1} for row in archived)
+        remaining = db.query(BackgroundJob.id).filter(BackgroundJob.id.in_(old_ids + kept_ids)).all()
+        # Recent and unfinished jobs stay in the queue table.
+        assert sorted(row.id for row in remaining) == kept_ids
+
+
+def test_failed_job_retries_after_jittered_exponential_backoff(client, monkeypatch):
+    from datetime import UTC, datetime, timedelta
+
+    from app.config.base import get_settings
+    from app.extensions.db import SessionLocal
+    from app.models.job import BackgroundJob
+    from app.services import job_queue
+    from tests.test_admin_api import _drain_jobs
+
+    _drain_jobs()
+    settings = get_settings()
+    monkeypatch.setattr(settings, "job_retry_base_seconds", 10)
+    monkeypatch.setattr(settings, "job_retry_max_seconds", 30)
+    assert all(5 <= job_queue.retry_delay(1) <= 10 for _ in range(50))
+    assert all(10 <= job_queue.retry_delay(2) <= 20 for _ in range(50))
+    assert all(15 <= job_queue.retry_delay(9) <= 30 for _ in range(50))
+
+    def unavailable(db, job, chunk_size):
+        raise ConnectionError("mail server down")
+
+    monkeypatch.setattr(job_queue, "run_exam_regrade", unavailable)
+    (job_id,) = _queue_jobs("regrade_exam", 1)
+    before = datetime.now(UTC)
+    assert job_queue.process_one_job()
+    # Not due yet, so the worker does not hot-loop on it.
+    assert not job_queue.process_one_job()
+
+    with SessionLocal() as db:
+        job = db.get(BackgroundJob, job_id)
+        assert (job.status.value, job.attempts, job.lease_expires_at) == ("queued", 1, None)
+        available_at = job.available_at.replace(tzinfo=UTC)
+        assert before + timedelta(seconds=5) <= available_at <= datetime.now(UTC) + timedelta(seconds=10)
+
+
+def test_failed_job_rolls_back_its_uncommitted_writes(client, monkeypatch):
+    import uuid
+
+    from sqlalchemy import select
+
+    from app.extensions.db import SessionLocal
+    from app.models.job import BackgroundJob
+    from app.models.user import User
+    from app.services import job_queue
+    from tests.test_admin_api import _drain_jobs
+
+    _drain_jobs()
+    username = f"half_{uuid.uuid4().hex[:8]}"
+
+    def half_applied(db, job, chunk_size):
+        for prefix in ("", "dup_"):
+            # The second insert reuses the username, and the database error
+            # leaves the session needing a rollback.
+            email = f"{prefix}{username}@example.com"
+            db.add(User(full_name="Half", username=username, email=email, password_hash="x"))
+            db.flush()
+
+    monkeypatch.setattr(job_queue, "run_exam_regrade", half_applied)
+    (job_id,) = _queue_jobs("regrade_exam", 1)
+    assert job_queue.process_one_job()
+
+    with SessionLocal() as db:
+        job = db.get(BackgroundJob, job_id)
+        assert (job.status.value, job.attempts, job.lease_expires_at) == ("queued", 1, None)
+        assert "portal_users" in job.error
+        assert db.scalar(select(User).where(User.username == username)) is None
+
+
+def test_reaper_requeues_jobs_whose_lease_expired(client):
+    from datetime import UTC, datetime, timedelta
+
+    from sqlalchemy import update
+
+    from app.extensions.db import SessionLocal
+    from app.models.job import BackgroundJob
+    from app.services.job_queue import claim_jobs, renew_leases, requeue_expired_jobs
+    from tests.test_admin_api import _drain_jobs
+
+    _drain_jobs()
+    crashed, exhausted, alive = _queue_jobs("attempt_report", 3)
+    with SessionLocal() as db:
+        claimed = claim_jobs(db, 3, ["attempt_report"])
+        assert all(job.lease_expires_at is not None for job in claimed)
+        db.execute(update(BackgroundJob).where(BackgroundJob.id == exhausted).values(max_attempts=1))
+        db.execute(
+            update(BackgroundJob)
+            .where(BackgroundJob.id.in_([crashed, exhausted, alive]))
+            .values(lease_expires_at=datetime.now(UTC) - timedelta(seconds=1))
+        )
+        db.commit()
+        renew_leases(db, [alive])
+
+        assert requeue_expired_jobs(db) == 2
+
+    assert _job_states([crashed, exhausted, alive]) == [("queued", 1), ("failed", 1), ("running", 1)]
+    with SessionLocal() as db:
+        assert "Lease expired" in db.get(BackgroundJob, crashed).error
+        db.execute(update(BackgroundJob).where(BackgroundJob.id == alive).values(status="completed"))
+        db.commit()
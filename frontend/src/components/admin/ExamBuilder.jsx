@@ -205,7 +205,7 @@ export default function ExamBuilder({
               <div className="table-row exam-row" key={exam.id}>
                 <strong>{exam.title}</strong>
                 <span>{exam.duration_minutes} min</span>
-                <span>{exam.questions?.length ?? 0}</span>
+                <span>{exam.question_count}</span>
                 <span>
                   <button
                     type="button"
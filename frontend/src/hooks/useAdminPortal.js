@@ -1,5 +1,6 @@
 import { useCallback, useEffect, useState } from 'react'
 
+import { fetchAllPages } from '../lib/api.js'
 import { defaultQuestion, emptyExamForm, emptyStudentForm, examBulkTemplate, userBulkTemplate } from '../lib/constants.js'
 
 /**
@@ -26,9 +27,9 @@ export function useAdminPortal(api, setMessage) {
       const [statsData, studentsData, examsData, assignmentData, incidentData, analyticsData, auditData] =
         await Promise.all([
           api('/api/v1/admin/dashboard'),
-          api('/api/v1/admin/students'),
-          api('/api/v1/admin/exams'),
-          api('/api/v1/admin/assignments'),
+          fetchAllPages(api, '/api/v1/admin/students'),
+          fetchAllPages(api, '/api/v1/admin/exams'),
+          fetchAllPages(api, '/api/v1/admin/assignments'),
           api('/api/v1/admin/security-incidents'),
           api('/api/v1/admin/analytics'),
           api('/api/v1/admin/audit-events'),
@@ -1,5 +1,6 @@
 import { useCallback, useEffect, useState } from 'react'
 
+import { fetchAllPages } from '../lib/api.js'
 import { useExamGuard } from './useExamGuard.js'
 
 /**
@@ -25,7 +26,7 @@ export function useStudentPortal(api, setMessage, { onEnterExam, onExitToReports
       const [statsData, assignmentData, historyData] = await Promise.all([
         api('/api/v1/student/dashboard'),
         api('/api/v1/student/assignments'),
-        api('/api/v1/student/attempts/history'),
+        fetchAllPages(api, '/api/v1/student/attempts/history'),
       ])
       setStudentStats(statsData)
       setStudentAssignments(assignmentData)
@@ -133,13 +134,11 @@ export function useStudentPortal(api, setMessage, { onEnterExam, onExitToReports
     setAnswers(nextAnswers)
     setAutosaveState('Saving...')
     try {
+      // Send only the changed answer; the server upserts it and acknowledges.
       await api(`/api/v1/student/attempts/${liveExam.attempt_id}/answers`, {
-        method: 'PUT',
+        method: 'PATCH',
         body: JSON.stringify({
-          answers: Object.entries(nextAnswers).map(([savedQuestionId, savedOption]) => ({
-            question_id: Number(savedQuestionId),
-            selected_option: savedOption,
-          })),
+          answers: [{ question_id: Number(questionId), selected_option: selectedOption }],
         }),
       })
       setAutosaveState('All answers saved')
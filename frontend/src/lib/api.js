@@ -18,12 +18,16 @@ export function buildUrl(base, path) {
   return `${trimmed}${path}`
 }
 
+export const NEXT_CURSOR_HEADER = 'X-Next-Cursor'
+
 /**
  * Build an API client bound to a token getter. The getter is read on every
  * request so the client always sends the current session's bearer token.
+ * With `{ withCursor: true }` a list request resolves to `{ items, nextCursor }`
+ * instead of the bare array.
  */
 export function createApiClient(getToken) {
-  return async function apiRequest(path, options = {}) {
+  return async function apiRequest(path, { withCursor = false, ...options } = {}) {
     const token = typeof getToken === 'function' ? getToken() : getToken
     const response = await fetch(buildUrl(API_BASE_URL, path), {
       ...options,
@@ -42,6 +46,26 @@ export function createApiClient(getToken) {
     if (!response.ok) {
       throw new Error(data.detail || 'Request failed')
     }
+    if (withCursor) {
+      return { items: data, nextCursor: response.headers.get(NEXT_CURSOR_HEADER) }
+    }
     return data
   }
 }
+
+/**
+ * Fetch every page of a keyset-paginated list endpoint by following the
+ * `X-Next-Cursor` header until the server stops sending one.
+ */
+export async function fetchAllPages(api, path, { pageSize = 500 } = {}) {
+  const separator = path.includes('?') ? '&' : '?'
+  const items = []
+  let cursor = null
+  do {
+    const query = `limit=${pageSize}${cursor ? `&after=${encodeURIComponent(cursor)}` : ''}`
+    const page = await api(`${path}${separator}${query}`, { withCursor: true })
+    items.push(...page.items)
+    cursor = page.nextCursor
+  } while (cursor)
+  return items
+}